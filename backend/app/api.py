@@ -1,16 +1,39 @@
 import os
 import time
+from contextlib import asynccontextmanager
 from typing import Annotated
 
 from fastapi import FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
 
+from .models.compression import CompressionMiddleware, PrecompressedStaticFiles
+from .modules.application import change_listener, operating_company_snapshot
+from .modules.database import database_read_only, database_read_write
 from .modules.router import router as ApplicationRouter
 from .modules.errors import exceptionToHTTPResponse
 
-app = FastAPI(prefix = None)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the connection pools within the event loop, connections are established in the background
+    await database_read_only.openPool()
+    await database_read_write.openPool()
+
+    # Served from the database until loaded, and from then on only while change_listener keeps it current
+    await operating_company_snapshot.load()
+
+    # Evict models cached by this replica when any replica writes them
+    change_listener.start()
+
+    yield
+
+    await change_listener.stop()
+
+    # Close every pooled connection on shutdown
+    await database_read_only.closePool()
+    await database_read_write.closePool()
+
+app = FastAPI(prefix = None, lifespan = lifespan)
 
 origins = [
     "http://localhost",
@@ -25,6 +48,17 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Listings repeat the same keys and links on every row, so compress well. Exports are compressed as they stream
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024)),
+    levels = {
+        "gzip": int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6)),
+        "br": int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4)),
+        "zstd": int(os.environ.get("COMPRESSION_ZSTD_LEVEL", 3)),
+    }
+)
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
@@ -46,4 +80,5 @@ async def read_root(accept: Annotated[str | None, Header()] = "application/json"
 
 app.include_router(ApplicationRouter)
 
-app.mount("/", StaticFiles(directory="app/public"), name="public")
+# Static files are served from their .zst, .br or .gz siblings (when present) to clients accepting them
+app.mount("/", PrecompressedStaticFiles(directory="app/public"), name="public")
@@ -1,5 +1,10 @@
+import datetime
 from pydantic import BaseModel
 
+from .patch import Patch
+from .query import Column, QueryDefinition
+from .serialise import LinkTemplate, ModelSerialiser
+
 class BaseAccount(BaseModel):
     id: int = None
     uuid: str = None
@@ -18,19 +23,26 @@ class BaseNewAccount(BaseModel):
     disabled: bool | None = False
 
 class Account:
+    # Held in slots without a __del__, listings of accounts build one per row
+    __slots__ = (
+            "id", "uuid", "role", "username", "name", "password_hash", "password_last_modified", "disabled", "created_at",
+            "last_modified", "version",
+        )
+
     # On initialisation of class instance
     def __init__(
             self,
-            role: str,
-            username: str,
-            name: str,
-            password_hash: str,
-            disabled: bool,
+            role: str | None = None,
+            username: str | None = None,
+            name: str | None = None,
+            password_hash: str | None = None,
+            disabled: bool | None = None,
             password_last_modified: int | None = None,
             created_at: int | None = None,
             last_modified: int | None = None,
             id: int | None = None,
             uuid: str | None = None,
+            version: str | None = None,
         ):
         self.id = id
         self.uuid = uuid
@@ -42,10 +54,7 @@ class Account:
         self.disabled = disabled
         self.created_at = created_at
         self.last_modified = last_modified
-
-    # On destruction of class instance
-    def __del__(self):
-        pass
+        self.version = version
 
     def serialise(self):
         return {
@@ -71,3 +80,48 @@ class Account:
             })
 
         return links
+
+# Compiled equivalent of serialise() and hypermediaLinks(), used to build responses, see ./serialise.py
+account_serialiser = ModelSerialiser(
+    Account,
+    fields = [
+        "id", "uuid", "role", "username", "name", "password_last_modified", "disabled", "created_at", "last_modified"
+    ],
+    links = [
+        LinkTemplate("self", "/api/v1/account/", "id"),
+    ]
+)
+
+# Columns exposed to the listing engine, see ./query.py
+account_query = QueryDefinition(
+    table = "account",
+    key = "id",
+    model = Account,
+    path = "/api/v1/account/",
+    columns = [
+        Column("id", int),
+        Column("uuid", str, filterable = True),
+        Column("role", str, filterable = True),
+        Column("username", str, filterable = True),
+        Column("name", str),
+        # Don't allow sort by (or filter on) password_hash
+        Column("password_hash", str, sortable = False, projectable = False),
+        Column("password_last_modified", datetime.datetime, range = True),
+        Column("disabled", bool, filterable = True),
+        Column("created_at", datetime.datetime, range = True),
+        Column("last_modified", datetime.datetime, range = True),
+    ]
+)
+
+# Columns which may be updated by PATCH, see ./patch.py
+account_patch = Patch(
+    table = "account",
+    key = "id",
+    columns = ["role", "username", "name", "password_hash", "disabled"],
+    returning = ["id", "uuid", "role", "username", "name", "password_hash", "password_last_modified", "disabled", "created_at", "last_modified"],
+    model = Account,
+    stamps = {
+        "password_last_modified": "password_hash",
+        "last_modified": None,
+    }
+)
@@ -1,325 +1,521 @@
-from typing import Annotated, List
-import bcrypt
-from psycopg.errors import ForeignKeyViolation, InterfaceError, UniqueViolation
+from typing import Annotated, Any, AsyncIterator, Iterator, List
+from psycopg.errors import ForeignKeyViolation, InterfaceError, UndefinedTable, UniqueViolation
 from fastapi.responses import JSONResponse
 
-from ..models.account import Account
+from ..models.account import Account, account_patch, account_query
 from ..models.authorisation import AuthorisationAdapter
-from ..models.database import DatabaseAdapter
-from ..models.errors import BadRequest, Conflict, Locked, NotFound
-from ..models.operating_company import OperatingCompany
-from ..models.vehicle import Vehicle
-
+from ..models.bulk import BulkImport, Upsert
+from ..models.cache import AccountSessionCache, EntityCache
+from ..models.conditional import TABLE_VERSION, Validator, representationTag, versionStatement
+from ..models.count import CountProvider
+from ..models.database import AsyncDatabaseAdapter, Commit, DatabaseAdapter, Operation, Statement
+from ..models.errors import BadRequest, Conflict, Locked, NotFound, PreconditionFailed
+from ..models.patch import Patch
+from ..models.export import ExportEncoder
+from ..models.notify import changeStatement
+from ..models.operating_company import OperatingCompany, operating_company_import, operating_company_patch, operating_company_query, operating_company_upsert
+from ..models.query import LINKS_FIELD, ROW_VERSION, ListQuery, QueryDefinition
+from ..models.serialise import SERIALISERS
+from ..models.snapshot import Snapshot
+from ..models.vehicle import Vehicle, vehicle_import, vehicle_query, vehicle_upsert
+
+# Fields each cached model may be looked up by, the first being the primary key it is invalidated by
+CACHED_LOOKUPS = {
+    "account": ("id", "uuid", "username"),
+    "operating_company": ("id",),
+    "vehicle": ("fleet_no",),
+}
+
+# Database operations are returned directly when backed by a DatabaseAdapter, or as an awaitable
+# when backed by an AsyncDatabaseAdapter (as used by the API routers)
 class Application:
     # On initialisation of class instance
     def __init__(
             self,
-            database_adapter: Annotated[DatabaseAdapter | None, "An instantiated database adapter"],
-            write_enabled: Annotated[bool, "Whether to accept write operations when using this application instance"] = False
+            database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "An instantiated database adapter"],
+            write_enabled: Annotated[bool, "Whether to accept write operations when using this application instance"] = False,
+            count_provider: Annotated[CountProvider | None, "Count provider, share one between instances so writes invalidate cached counts"] = None,
+            entity_cache: Annotated[EntityCache | None, "Entity cache, share one between instances so writes invalidate cached models"] = None,
+            snapshots: Annotated[list | None, "Snapshots of tables to serve reads of from memory while they are current"] = None,
+            account_sessions: Annotated[AccountSessionCache | None, "Account session cache, share one between instances so writes invalidate held accounts"] = None,
+            batch_max_size: Annotated[int, "Maximum number of keys accepted by a single batch lookup"] = 500,
+            export_chunk_size: Annotated[int, "Rows fetched (and encoded) at a time when streaming an export"] = 1000,
+            bulk_max_size: Annotated[int, "Maximum number of rows accepted by a single bulk import"] = 10000
         ):
         self.__set_database_adapter__(database_adapter = database_adapter)
         self.__set_write_enabled__(write_enabled)
+        self.__count_provider__ = count_provider or CountProvider()
+        self.__entity_cache__ = entity_cache or EntityCache()
+        self.__snapshots__ = {snapshot.definition.table: snapshot for snapshot in snapshots or []}
+        self.__account_sessions__ = account_sessions or AccountSessionCache()
+        self.__batch_max_size__ = batch_max_size
+        self.__export_chunk_size__ = export_chunk_size
+        self.__bulk_max_size__ = bulk_max_size
 
     # On destruction of class instance
     def __del__(self):
         pass
 
-    def __set_database_adapter__(self, database_adapter: Annotated[DatabaseAdapter, "An instantiated database adapter"]):
+    def __set_database_adapter__(self, database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter, "An instantiated database adapter"]):
         self.database_adapter = database_adapter
 
-    def __get_database_adapter__(self) -> DatabaseAdapter:
+    def __get_database_adapter__(self) -> DatabaseAdapter | AsyncDatabaseAdapter:
         if not self.database_adapter:
             raise Exception("No database connection has been stored!")
-        
+
         return self.database_adapter
-    
+
     def __set_write_enabled__(self, write_enabled: Annotated[bool, "Whether to accept write operations when using this application instance"] = False):
         self.__write_enabled__ = write_enabled
 
     def __get_write_enabled__(self) -> bool:
         return self.__write_enabled__
-    
-    def __get_account_with_params__(
-            self,
-            limit: int,
-            offset: int,
-            order_by: str,
-            order_by_direction: str,
-            database_adapter
-        ) -> dict:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
-
-        # Offset cannot be negative so reset to 0
-        if offset < 0:
-            offset = 0
-
-        # Ensure only allowed values make it into the non-prepared statement
-        if not order_by_direction == "ASC" and not order_by_direction == "DESC":
-            order_by_direction = "ASC"
-
-        # Ensure filter is limited only to allowed fields
-        order_by_int = 1
-
-        match order_by:
-            case 'uuid':
-                order_by_int = 2
-            case 'role':
-                order_by_int = 3
-            case 'username':
-                order_by_int = 4
-            case 'name':
-                order_by_int = 5
-            # Don't allow sort by password_hash
-            case 'password_last_modified':
-                order_by_int = 7
-            case 'disabled':
-                order_by_int = 8
-            case 'created_at':
-                order_by_int = 9
-            case 'last_modified':
-                order_by_int = 10
-            case _: # id field as default (fallback)
-                order_by_int = 1
-        
-        data = []
-        final = []
-
-        if limit > 1:
-            try:
-                data = cursor.execute("""
-                        SELECT
-                            id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified, count(*) OVER() AS full_count
-                        FROM
-                            account
-                        ORDER BY
-                            {0} {1}
-                        LIMIT
-                            %s
-                        OFFSET
-                            %s
-                    ;""".format(order_by_int, order_by_direction), (int(limit),int(offset),)).fetchall()
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
-        
-        elif limit < 1 or len(data) < 1:
-            try:
-                data = cursor.execute("""
-                        SELECT
-                            count(*) OVER() AS full_count
-                        FROM
-                            account
-                        ORDER BY
-                            %s {0}
-                        LIMIT
-                            1
-                    ;""".format(order_by_direction), (str(order_by),)).fetchall()
-                
-                cursor.close()
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
-            
-            return {
-                    "result": final,
-                    "meta": {
-                        "max": data[0][0] if len(data) > 0 else 0,
-                        "limit": limit,
-                        "offset": offset,
-                        "orderBy": order_by,
-                        "orderByDirection": order_by_direction
-                    }
+
+    def __get_count_provider__(self) -> CountProvider:
+        return self.__count_provider__
+
+    def __get_entity_cache__(self) -> EntityCache:
+        return self.__entity_cache__
+
+    def __invalidate__(self, table: str, keys: Annotated[list | None, "Primary keys written, None for any"]) -> None:
+        # Evicts written models from everything holding them, once the write is committed
+        for key in keys if keys is not None else [None]:
+            self.__get_entity_cache__().invalidate(table, key)
+
+            if table == "account":
+                self.__account_sessions__.invalidate(key)
+
+        # The snapshot isn't served again until it has read the write back, rather than waiting for the write's NOTIFY, so
+        # this replica's own writes are never read stale from it
+        if table in self.__snapshots__:
+            self.__snapshots__[table].written(keys)
+
+    def __get_snapshot__(self, table: str, cached: bool = True) -> Snapshot | None:
+        snapshot = self.__snapshots__.get(table)
+
+        return snapshot if cached and snapshot and snapshot.isCurrent() else None
+
+    def __cached__(self, table: str, key: str, value: int | str, operation: Operation, cached: bool = True, store: bool = True) -> Operation:
+        cache = self.__get_entity_cache__()
+        snapshot = self.__get_snapshot__(table, cached)
+
+        # Anything missing from a current snapshot is left for the operation to report
+        if snapshot and snapshot.isIndexed(key):
+            model = snapshot.find(key, snapshot.definition.getColumn(key).parse(str(value)))
+
+            if model is not None:
+                return model
+
+        if cached:
+            model = cache.get(table, key, value)
+
+            # Returning before anything is yielded means no connection is borrowed
+            if model is not None:
+                return model
+
+        generation = cache.generation(table)
+        model = yield from operation
+
+        if store:
+            cache.put(table, getattr(model, CACHED_LOOKUPS[table][0]), {lookup: getattr(model, lookup) for lookup in CACHED_LOOKUPS[table]}, model, generation)
+
+        return model
+
+    def __check_batch_size__(self, keys: list):
+        if len(keys) > self.__batch_max_size__:
+            raise BadRequest(f"No more than {self.__batch_max_size__} keys may be requested at once!")
+
+    def __parse_import__(self, bulk: BulkImport, body: bytes, format: str) -> tuple[list, list]:
+        rows, rejected = bulk.parse(body, format)
+
+        if len(rows) + len(rejected) > self.__bulk_max_size__:
+            raise BadRequest(f"No more than {self.__bulk_max_size__} rows may be imported at once!")
+
+        return (rows, rejected)
+
+    def __run__(self, operation: Operation, database_adapter: DatabaseAdapter | AsyncDatabaseAdapter | None = None):
+        return (database_adapter or self.__get_database_adapter__()).runOperation(operation)
+
+    def __bulk_import__(self, bulk: BulkImport, rows: list, rejected: list, atomic: bool = False) -> Operation[JSONResponse]:
+        conflicts = list(rejected)
+        inserted = []
+
+        # In all-or-nothing mode there is nothing to do if any row was already rejected
+        if rows and not (atomic and conflicts):
+            yield bulk.stagingStatement()
+            yield bulk.copyStatement(rows)
+
+            conflicts.extend({"line": line, "key": key, "reason": reason} for line, key, reason in (yield bulk.conflictStatement()))
+
+            if not (atomic and conflicts):
+                try:
+                    inserted = [data[0] for data in (yield bulk.mergeStatement([conflict["line"] for conflict in conflicts]))]
+                except ForeignKeyViolation:
+                    raise Conflict("A referenced record was removed during the import, please try again!")
+
+                # Anything neither reported nor inserted was written by someone else since the conflicts were found
+                reported = {conflict["line"] for conflict in conflicts}
+                merged = set(inserted)
+
+                conflicts.extend(
+                        {"line": row[0], "key": bulk.keyOf(row), "reason": "Duplicate value written concurrently"}
+                        for row in rows if row[0] not in reported and bulk.keyOf(row) not in merged
+                    )
+
+        conflicts.sort(key = lambda conflict: conflict["line"])
+        failed = atomic and len(conflicts) > 0
+
+        # Nothing is committed when failed, the staging table and any merged rows are rolled back with the connection
+        if inserted and not failed:
+            keys = inserted if bulk.key == CACHED_LOOKUPS[bulk.table][0] else None
+
+            yield changeStatement(bulk.table, keys)
+            yield Commit()
+
+            self.__get_count_provider__().invalidate(bulk.table)
+            self.__invalidate__(bulk.table, keys)
+
+        return JSONResponse(status_code = 409 if failed else 200, content = {
+                "message": "No rows were imported as some conflicted, please resolve them and try again..." if failed
+                    else f"This operation has imported {len(inserted)} record(s)!",
+                "result": {
+                    "received": len(rows) + len(rejected),
+                    "inserted": 0 if failed else len(inserted),
+                    "conflicts": conflicts,
                 }
-        
-        cursor.close()
-        
-        for item in data:
-            final.append(Account(id = item[0], uuid = item[1], role = item[2], username = item[3], name = item[4], password_hash = item[5], password_last_modified = item[6], disabled = item[7], created_at = item[8], last_modified = item[9]))
+            })
+
+    def __missing__(self, table: str, key: str, value: int | str, version: str | None, message: str) -> Operation:
+        # Nothing matched a conditional write, either the row doesn't exist or it has been written since the version was read
+        if version and (yield Statement("SELECT 1 FROM {0} WHERE {1} = %s;".format(table, key), (value,), fetch = "one")):
+            raise PreconditionFailed("The resource has been modified since the version provided, please fetch it and try again!")
+
+        raise NotFound(message)
+
+    def __patch__(self, patch: Patch, key: int | str, values: dict, message: str, version: str | None = None) -> Operation:
+        try:
+            data = yield patch.statement(key, values, version)
+        except UniqueViolation:
+            raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
+
+        if not data:
+            yield from self.__missing__(patch.table, patch.key, key, version, message)
+
+        yield changeStatement(patch.table, [key])
+        yield Commit()
+
+        self.__invalidate__(patch.table, [key])
+
+        return patch.response(data)
+
+    def __upsert__(self, upsert: Upsert, rows: list) -> Operation[dict]:
+        keys = [upsert.keyOf(row) for row in rows]
+
+        # A row may only be affected once by a single INSERT ... ON CONFLICT
+        if len(set(keys)) != len(keys):
+            raise BadRequest(f"Duplicate {upsert.key} provided, each may only be upserted once per request!")
+
+        written = {}
+
+        if rows:
+            try:
+                data = yield upsert.statement(rows)
+            except UniqueViolation:
+                raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
+            except ForeignKeyViolation:
+                raise Conflict("A referenced record does not exist, please ensure it has been created first!")
+
+            for row in data:
+                written[row[upsert.returning.index(upsert.key)]] = (upsert.response(row[:-1]), "inserted" if row[-1] else "updated")
+
+        if written:
+            yield changeStatement(upsert.table, [getattr(model, CACHED_LOOKUPS[upsert.table][0]) for model, _ in written.values()])
+            yield Commit()
+
+            if any(outcome == "inserted" for _, outcome in written.values()):
+                self.__get_count_provider__().invalidate(upsert.table)
+
+            self.__invalidate__(upsert.table, [getattr(model, CACHED_LOOKUPS[upsert.table][0]) for model, _ in written.values()])
+
+        # Rows which wouldn't have changed were skipped by the upsert, so are read as they are
+        unchanged = [key for key in keys if key not in written]
+
+        if unchanged:
+            for row in (yield upsert.selectStatement(unchanged)):
+                written[row[upsert.returning.index(upsert.key)]] = (upsert.response(row), "unchanged")
+
+        final = [(key, *written[key]) for key in keys if key in written]
 
         return {
+                "result": [model for _, model, _ in final],
+                "outcomes": [{"key": key, "outcome": outcome} for key, _, outcome in final],
+                "meta": {
+                    outcome: sum(1 for _, _, result in final if result == outcome)
+                    for outcome in ("inserted", "updated", "unchanged")
+                }
+            }
+
+    def __export__(self, query: ListQuery, format: str, database_adapter: DatabaseAdapter | AsyncDatabaseAdapter | None = None):
+        encoder = ExportEncoder(format, query.exportColumns())
+        chunks = (database_adapter or self.__get_database_adapter__()).streamStatement(query.exportStatement(), chunk_size = self.__export_chunk_size__)
+
+        # Streamed asynchronously when backed by an AsyncDatabaseAdapter, as with __run__()
+        if hasattr(chunks, "__aiter__"):
+            async def stream():
+                yield encoder.header()
+
+                async for rows in chunks:
+                    yield encoder.encode(rows)
+        else:
+            def stream():
+                yield encoder.header()
+
+                for rows in chunks:
+                    yield encoder.encode(rows)
+
+        return (stream(), encoder)
+
+    def __list_snapshot__(self, query: ListQuery, snapshot: Snapshot) -> Operation[dict]:
+        rows = snapshot.rows()
+
+        # Equality on the key or an indexed column narrows the rows to (at most) one
+        for _, column, comparison, value, _ in query.filters:
+            if comparison == "=" and snapshot.isIndexed(column.name):
+                rows = snapshot.rows(column.name, value)
+                break
+
+        data, matched = query.evaluate(rows)
+        full_count = None if query.count == "none" else matched
+
+        response = query.response(data if query.limit > 0 else [], full_count)
+
+        if query.expansions:
+            response["included"] = yield from self.__expand__(query.expansions, response["result"])
+
+        return response
+
+    def __list__(self, query: ListQuery) -> Operation[dict]:
+        snapshot = self.__get_snapshot__(query.definition.table)
+
+        if snapshot:
+            return (yield from self.__list_snapshot__(query, snapshot))
+
+        # The total is provided separately (and may be cached or estimated) rather than counted alongside every row
+        full_count = yield from self.__get_count_provider__().count(query.definition.table, query.count, *query.filterCondition())
+
+        # No rows were requested, only the total
+        if query.limit < 1:
+            return query.response([], full_count)
+
+        data = yield query.selectStatement()
+
+        response = query.response(data, full_count)
+
+        if query.expansions:
+            response["included"] = yield from self.__expand__(query.expansions, response["result"])
+
+        return response
+
+    def __validated_list__(self, query: ListQuery, identity: str) -> Operation[tuple[dict, Validator | None]]:
+        # Read on the listing's connection, and before its results, so the validator is never newer than them
+        validator = yield from self.__get_table_validator__([query.definition.table, *[expansion.definition.table for expansion in query.expansions]], identity)
+
+        return (yield from self.__list__(query)), validator
+
+    def __expand__(self, expansions: list, results: list) -> Operation[dict]:
+        included = {}
+
+        for expansion in expansions:
+            # Each related row is fetched (and serialised) once, however many results reference it
+            values = list(dict.fromkeys(getattr(x, expansion.column) for x in results if getattr(x, expansion.column, None) is not None))
+            snapshot = self.__get_snapshot__(expansion.definition.table)
+
+            if snapshot:
+                included[expansion.name] = [model for model in (snapshot.get(value) for value in sorted(values)) if model is not None]
+            else:
+                included[expansion.name] = (yield expansion.selectStatement(values)) if values else []
+
+        return included
+
+    def __get_batch__(self, definition: QueryDefinition, keys: list, fields: list | None, expansions: list) -> Operation[dict]:
+        key = definition.getColumn(definition.key)
+
+        # Keys are parsed (and deduplicated) up front, an invalid key fails the batch as it would a single lookup
+        values = list(dict.fromkeys(key.parse(str(value)) for value in keys))
+        columns = definition.selectColumns(fields, required = [definition.key, *[expansion.column for expansion in expansions]])
+
+        # Every key is resolved by a single query, then put back into the requested order
+        data = (yield definition.batchStatement(values, columns)) if values else []
+        found = {getattr(model, definition.key): model for model in data}
+        final = [found[value] for value in values if value in found]
+
+        response = {
                 "result": final,
+                "missing": [value for value in values if value not in found],
                 "meta": {
-                    "max": data[0][10] if len(data) > 0 else 0,
-                    "limit": limit,
-                    "offset": offset,
-                    "orderBy": order_by,
-                    "orderByDirection": order_by_direction
+                    "requested": len(values),
+                    "found": len(final)
                 }
             }
 
-    def __get_vehicle_by_fleet_no__(self, fleet_no: str, database_adapter) -> Vehicle:
-        database_adapter = database_adapter or self.__get_database_adapter__()
+        if expansions:
+            response["included"] = yield from self.__expand__(expansions, final)
+
+        return response
+
+    def __get_expanded__(self, operation: Operation, expansions: list) -> Operation[dict]:
+        result = yield from operation
+
+        return {
+                "result": result,
+                "included": (yield from self.__expand__(expansions, [result]))
+            }
+
+    def __get_table_validator__(self, tables: list, identity: str) -> Operation[Validator | None]:
+        snapshots = [self.__get_snapshot__(table) for table in tables]
+
+        # Representations served from snapshots are validated by the snapshots' content
+        if all(snapshots):
+            return Validator.fromVersions(identity, [snapshot.getVersion() for snapshot in snapshots])
+
+        try:
+            data = yield versionStatement(tables)
+        except UndefinedTable:
+            # Databases initialised before versions were tracked are never validated
+            return None
+
+        if len(data) < len(set(tables)):
+            return None
+
+        return Validator.fromVersions(identity, data)
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
+    def __get_entity_validator__(self, definition: QueryDefinition, key: str, value: str, expansions: list, fields: list | None = None) -> Operation[Validator | None]:
+        tables = [definition.table, *[expansion.definition.table for expansion in expansions]]
+        snapshots = [self.__get_snapshot__(table) for table in tables]
 
+        if all(snapshots):
+            model = snapshots[0].find(key, definition.getColumn(key).parse(str(value)))
+
+            if model is None:
+                return None
+
+            validator = Validator.fromVersions(representationTag(model.version, fields), [snapshot.getVersion() for snapshot in snapshots])
+
+            if not expansions:
+                validator.etag = representationTag(model.version, fields)
+
+            return validator
+
+        # Only the row's version is read, alongside those of the tables its expansions come from
         try:
-            data = cursor.execute("""
+            data = yield Statement("""
                     SELECT
-                        fleet_no, opco_id
+                        {0}.{1}, {2}.name, {2}.version, {2}.last_modified
                     FROM
-                        vehicle
+                        {0}
+                    JOIN
+                        {2} ON {2}.name = ANY(%s)
                     WHERE
-                        vehicle.fleet_no = %s
-                    LIMIT
-                        1
-                ;""", (str(fleet_no),)).fetchone()
-            
-            cursor.close()
-            
-            if not data:
-                raise NotFound("No vehicle matching specified fleet number...")
-            
-            # if less than 1, error (error 404 no vehicle by that fleet_no)
-        except Exception as e:
-            connection.rollback()
-            raise e
+                        {0}.{3} = %s
+                    ORDER BY
+                        {2}.name
+                ;""".format(definition.table, ROW_VERSION, TABLE_VERSION, key), (tables, definition.getColumn(key).parse(str(value))))
+        except UndefinedTable:
+            return None
+
+        # Missing rows are left for the main query to report
+        if len(data) < len(set(tables)):
+            return None
+
+        validator = Validator.fromVersions(representationTag(data[0][0], fields), [row[1:] for row in data])
+
+        # Unexpanded the row version (and projection) identifies the representation, as the ETag set_etag() sends
+        if not expansions:
+            validator.etag = representationTag(data[0][0], fields)
+
+        return validator
 
-        return Vehicle(fleet_no = data[0], opco_id = data[1])
+    def __get_account_session__(self, id: str) -> Operation[Account]:
+        sessions = self.__account_sessions__
+        session = sessions.get(id)
 
-    def __new_vehicle__(self, vehicle: Vehicle, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
+        # Returning before anything is yielded means no connection is borrowed
+        if session:
+            return Account(id = int(id), **dict(zip(("uuid", "name", "role", "disabled"), session)))
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
+        generation = sessions.generation()
+        fields = ["uuid", "name", "role", "disabled"]
+        account = yield from self.__cached__("account", "id", id, self.__get_projection__(account_query, "id", id, fields, "No account matching specified id..."), store = False)
 
+        sessions.put(account.id, tuple(getattr(account, field) for field in fields), generation)
+
+        return account
+
+    def __get_projection__(self, definition: QueryDefinition, key: str, value: str, fields: list | None, message: str, required: list = ()) -> Operation:
+        # Only the requested fields (and the key) are read, see QueryDefinition.selectColumns()
+        columns = definition.selectColumns(fields, required = [definition.key, *required])
+
+        data = yield Statement("""
+                SELECT
+                    {0}, {3}
+                FROM
+                    {1}
+                WHERE
+                    {2} = %s
+                LIMIT
+                    1
+            ;""".format(", ".join(columns), definition.table, key, ROW_VERSION), (definition.getColumn(key).parse(str(value)),), fetch = "one", row_factory = definition.rowFactory([*columns, "version"]))
+
+        if not data:
+            raise NotFound(message)
+
+        return data
+
+    def __get_vehicle_by_fleet_no__(self, fleet_no: str) -> Operation[Vehicle]:
+        data = yield Statement("""
+                SELECT
+                    fleet_no, opco_id, xmin::text
+                FROM
+                    vehicle
+                WHERE
+                    vehicle.fleet_no = %s
+                LIMIT
+                    1
+            ;""", (str(fleet_no),), fetch = "one")
+
+        # if less than 1, error (error 404 no vehicle by that fleet_no)
+        if not data:
+            raise NotFound("No vehicle matching specified fleet number...")
+
+        return Vehicle(fleet_no = data[0], opco_id = data[1], version = data[2])
+
+    def __new_vehicle__(self, vehicle: Vehicle) -> Operation[Vehicle]:
         try:
-            data = cursor.execute("""
+            data = yield Statement("""
                     INSERT INTO
                         vehicle
                         (fleet_no, opco_id)
                     VALUES
                         (%s, %s)
                     RETURNING
-                        fleet_no, opco_id
-                ;""", (int(vehicle.fleet_no),int(vehicle.opco_id),)).fetchone()
-            
-            if not data:
-                raise NotFound("No operating company matching specified id...")
-            
-            cursor.close()
-            connection.commit()
-            
+                        fleet_no, opco_id, xmin::text
+                ;""", (int(vehicle.fleet_no),int(vehicle.opco_id),), fetch = "one")
         except UniqueViolation:
-            connection.rollback()
             raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
-        except Exception as e:
-            connection.rollback()
-            raise e
 
-        return Vehicle(fleet_no = data[0], opco_id = data[1])
+        if not data:
+            raise NotFound("No operating company matching specified id...")
 
-    def __get_vehicle_with_params__(
-            self,
-            limit: int,
-            offset: int,
-            order_by: str,
-            order_by_direction: str,
-            database_adapter
-        ) -> dict:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
-
-        # Offset cannot be negative so reset to 0
-        if offset < 0:
-            offset = 0
-
-        # Ensure only allowed values make it into the non-prepared statement
-        if not order_by_direction == "ASC" and not order_by_direction == "DESC":
-            order_by_direction = "ASC"
-
-        # Ensure filter is limited only to allowed fields
-        order_by_int = 1
-
-        match order_by:
-            case 'opco_id':
-                order_by_int = 2
-            case _: # fleet_no field as default (fallback)
-                order_by_int = 1
-        
-        data = []
-        final = []
-
-        if limit > 1:
-            try:
-                data = cursor.execute("""
-                        SELECT
-                            fleet_no, opco_id, count(*) OVER() AS full_count
-                        FROM
-                            vehicle
-                        ORDER BY
-                            {0} {1}
-                        LIMIT
-                            %s
-                        OFFSET
-                            %s
-                    ;""".format(order_by_int, order_by_direction), (int(limit),int(offset),)).fetchall()
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
-        
-        elif limit < 1 or len(data) < 1:
-            try:
-                data = cursor.execute("""
-                        SELECT
-                            count(*) OVER() AS full_count
-                        FROM
-                            vehicle
-                        ORDER BY
-                            %s {0}
-                        LIMIT
-                            1
-                    ;""".format(order_by_direction), (str(order_by),)).fetchall()
-                
-                cursor.close()
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
-            
-            return {
-                    "result": final,
-                    "meta": {
-                        "max": data[0][0] if len(data) > 0 else 0,
-                        "limit": limit,
-                        "offset": offset,
-                        "orderBy": order_by,
-                        "orderByDirection": order_by_direction
-                    }
-                }
-        
-        cursor.close()
-        
-        for item in data:
-            final.append(Vehicle(fleet_no = item[0], opco_id = item[1]))
+        yield changeStatement("vehicle", [data[0]])
+        yield Commit()
 
-        return {
-                "result": final,
-                "meta": {
-                    "max": data[0][2] if len(data) > 0 else 0,
-                    "limit": limit,
-                    "offset": offset,
-                    "orderBy": order_by,
-                    "orderByDirection": order_by_direction
-                }
-            }
-    
-    def __set_operating_company_by_id__(self, id: int, operating_company: OperatingCompany, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
+        self.__get_count_provider__().invalidate("vehicle")
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
+        return Vehicle(fleet_no = data[0], opco_id = data[1], version = data[2])
 
+    def __set_operating_company_by_id__(self, id: int, operating_company: OperatingCompany, version: str | None = None) -> Operation[OperatingCompany]:
         try:
-            data = cursor.execute("""
+            data = yield Statement("""
                     UPDATE
                         operating_company
                     SET
@@ -327,245 +523,112 @@ class Application:
                         short_code = %s,
                         name = %s
                     WHERE
-                        id = %s
+                        id = %s{0}
                     RETURNING
-                        id, noc, short_code, name
-                ;""", (str(operating_company.noc),str(operating_company.short_code),str(operating_company.name),int(operating_company.id),)).fetchone()
-            
-            if not data:
-                raise NotFound("No operating company matching specified id...")
-            
-            cursor.close()
-            connection.commit()
-        
+                        id, noc, short_code, name, xmin::text
+                ;""".format(" AND xmin = %s::xid" if version else ""), (str(operating_company.noc),str(operating_company.short_code),str(operating_company.name),int(operating_company.id),*([version] if version else [])), fetch = "one")
         except UniqueViolation:
-            connection.rollback()
             raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
-        except Exception as e:
-            connection.rollback()
-            raise e
 
-        return OperatingCompany(id = data[0], noc = data[1], short_code = data[2], name = data[3])
-    
-    def __new_operating_company__(self, operating_company: OperatingCompany, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
+        if not data:
+            yield from self.__missing__("operating_company", "id", int(operating_company.id), version, "No operating company matching specified id...")
+
+        yield changeStatement("operating_company", [data[0]])
+        yield Commit()
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
+        self.__invalidate__("operating_company", [data[0]])
 
+        return OperatingCompany(id = data[0], noc = data[1], short_code = data[2], name = data[3], version = data[4])
+
+    def __new_operating_company__(self, operating_company: OperatingCompany) -> Operation[OperatingCompany]:
         try:
-            data = cursor.execute("""
+            data = yield Statement("""
                     INSERT INTO
                         operating_company
                         (noc, short_code, name)
                     VALUES
                         (%s, %s, %s)
                     RETURNING
-                        id, noc, short_code, name
-                ;""", (str(operating_company.noc),str(operating_company.short_code),str(operating_company.name),)).fetchone()
-            
-            if not data:
-                raise NotFound("No operating company matching specified id...")
-            
-            cursor.close()
-            connection.commit()
-            
+                        id, noc, short_code, name, xmin::text
+                ;""", (str(operating_company.noc),str(operating_company.short_code),str(operating_company.name),), fetch = "one")
         except UniqueViolation:
-            connection.rollback()
             raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
-        except Exception as e:
-            connection.rollback()
-            raise e
 
-        return OperatingCompany(id = data[0], noc = data[1], short_code = data[2], name = data[3])
-    
-    def __delete_operating_company__(self, id: int | str, database_adapter, confirmed: bool = False) -> dict:
-        database_adapter = database_adapter or self.__get_database_adapter__()
+        if not data:
+            raise NotFound("No operating company matching specified id...")
+
+        yield changeStatement("operating_company", [data[0]])
+        yield Commit()
+
+        self.__get_count_provider__().invalidate("operating_company")
+        self.__invalidate__("operating_company", [data[0]])
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
+        return OperatingCompany(id = data[0], noc = data[1], short_code = data[2], name = data[3], version = data[4])
 
+    def __delete_operating_company__(self, id: int | str, confirmed: bool = False, version: str | None = None) -> Operation[JSONResponse]:
         try:
-            data = cursor.execute("""
+            records = yield Statement("""
                     DELETE FROM
                         operating_company
                     WHERE
-                        id = %s
+                        id = %s{0}
                     RETURNING
                         id, noc, short_code, name
-                ;""", (int(id),)).fetchall()
-            
-            if len(data) < 1:
-                raise NotFound("No operating company matching specified id...")
-            
-            cursor.close()
-
-            if confirmed:
-                connection.commit()
-        
-        except Exception as e:
-            connection.rollback()
-            raise e
-
-        return data
-    
-    def __get_operating_company_with_params__(
-            self,
-            limit: int,
-            offset: int,
-            order_by: str,
-            order_by_direction: str,
-            database_adapter
-        ) -> dict:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
-
-        # Offset cannot be negative so reset to 0
-        if offset < 0:
-            offset = 0
-
-        # Ensure only allowed values make it into the non-prepared statement
-        if not order_by_direction == "ASC" and not order_by_direction == "DESC":
-            order_by_direction = "ASC"
-
-        # Ensure filter is limited only to allowed fields
-        order_by_int = 1
-
-        match order_by:
-            case 'noc':
-                order_by_int = 2
-            case 'short_code':
-                order_by_int = 3
-            case 'name':
-                order_by_int = 4
-            case _: # id field as default (fallback)
-                order_by_int = 1
-
-        data = []
-        final = []
-
-        if limit > 1:
-            try:
-                data = cursor.execute("""
-                        SELECT
-                            id, noc, short_code, name, count(*) OVER() AS full_count
-                        FROM
-                            operating_company
-                        ORDER BY
-                            {0} {1}
-                        LIMIT
-                            %s
-                        OFFSET
-                            %s
-                    ;""".format(order_by_int, order_by_direction), (int(limit),int(offset),)).fetchall()
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
-            
-        elif limit < 1 or len(data) < 1:
-            try:
-                data = cursor.execute("""
-                        SELECT
-                            count(*) OVER() AS full_count
-                        FROM
-                            operating_company
-                        ORDER BY
-                            %s {0}
-                        LIMIT
-                            1
-                    ;""".format(order_by_direction), (str(order_by),)).fetchall()
-                
-                cursor.close()
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
-            
-            return {
-                    "result": final,
-                    "meta": {
-                        "max": data[0][0] if len(data) > 0 else 0,
-                        "limit": limit,
-                        "offset": offset,
-                        "orderBy": order_by,
-                        "orderByDirection": order_by_direction
-                    }
-                }
-        
-        cursor.close()
-        
-        for item in data:
-            final.append(OperatingCompany(id = item[0], noc = item[1], short_code = item[2], name = item[3]))
+                ;""".format(" AND xmin = %s::xid" if version else ""), (int(id),*([version] if version else [])))
+        except ForeignKeyViolation:
+            raise Conflict("Vehicles have been assigned to this operating company so it may not be deleted! You may still edit details...")
 
-        return {
-                "result": final,
-                "meta": {
-                    "max": data[0][4] if len(data) > 0 else 0,
-                    "limit": limit,
-                    "offset": offset,
-                    "orderBy": order_by,
-                    "orderByDirection": order_by_direction
-                }
-            }
-    
-    def __get_operating_company_by_id__(self, id: int, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
+        if len(records) < 1:
+            yield from self.__missing__("operating_company", "id", int(id), version, "No operating company matching specified id...")
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
+        # Unconfirmed deletions are rolled back once the connection is returned
+        if confirmed:
+            yield changeStatement("operating_company", [record[0] for record in records])
+            yield Commit()
 
-        try:
-            data = cursor.execute("""
-                    SELECT
-                        id, noc, short_code, name
-                    FROM
-                        operating_company
-                    WHERE
-                        operating_company.id = %s
-                    LIMIT
-                        1
-                ;""", (str(id),)).fetchone()
-            
-            cursor.close()
-            
-            if not data:
-                raise NotFound("No operating company matching specified id...")
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
+            self.__get_count_provider__().invalidate("operating_company")
+            self.__invalidate__("operating_company", [record[0] for record in records])
 
-        return OperatingCompany(id = data[0], noc = data[1], short_code = data[2], name = data[3])
-    
-    def __get_account_by_id__(self, id: int, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
-
-        try:
-            account_data = cursor.execute("""
-                    SELECT
-                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified
-                    FROM
-                        account
-                    WHERE
-                        account.id = %s
-                    LIMIT
-                        1
-                ;""", (str(id),)).fetchone()
-            
-            cursor.close()
-            
-            if not account_data:
-                raise NotFound("No account matching specified id...")
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
+        return JSONResponse(content = {
+                "message": f"This operation has deleted {len(records)} record(s)!" if confirmed
+                    else f"This operation will delete {len(records)} item(s), please confirm...",
+                "result": {
+                    "rows": records,
+                    "length": len(records),
+                }
+            })
+
+    def __get_operating_company_by_id__(self, id: int) -> Operation[OperatingCompany]:
+        data = yield Statement("""
+                SELECT
+                    id, noc, short_code, name, xmin::text
+                FROM
+                    operating_company
+                WHERE
+                    operating_company.id = %s
+                LIMIT
+                    1
+            ;""", (str(id),), fetch = "one")
+
+        if not data:
+            raise NotFound("No operating company matching specified id...")
+
+        return OperatingCompany(id = data[0], noc = data[1], short_code = data[2], name = data[3], version = data[4])
+
+    def __get_account_by_id__(self, id: int) -> Operation[Account]:
+        account_data = yield Statement("""
+                SELECT
+                    id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified, xmin::text
+                FROM
+                    account
+                WHERE
+                    account.id = %s
+                LIMIT
+                    1
+            ;""", (str(id),), fetch = "one")
+
+        if not account_data:
+            raise NotFound("No account matching specified id...")
 
         return Account(
                 id = account_data[0],
@@ -578,34 +641,23 @@ class Application:
                 disabled = account_data[7],
                 created_at = account_data[8],
                 last_modified = account_data[9],
+                version = account_data[10],
             )
-    
-    def __get_account_by_uuid__(self, uuid: str, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
 
-        try:
-            account_data = cursor.execute("""
-                    SELECT
-                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified
-                    FROM
-                        account
-                    WHERE
-                        account.uuid = %s
-                    LIMIT
-                        1
-                ;""", (str(uuid),)).fetchone()
-            
-            cursor.close()
-            
-            if not account_data:
-                raise NotFound("No account matching specified uuid...")
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
+    def __get_account_by_uuid__(self, uuid: str) -> Operation[Account]:
+        account_data = yield Statement("""
+                SELECT
+                    id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified, xmin::text
+                FROM
+                    account
+                WHERE
+                    account.uuid = %s
+                LIMIT
+                    1
+            ;""", (str(uuid),), fetch = "one")
+
+        if not account_data:
+            raise NotFound("No account matching specified uuid...")
 
         return Account(
                 id = account_data[0],
@@ -618,34 +670,23 @@ class Application:
                 disabled = account_data[7],
                 created_at = account_data[8],
                 last_modified = account_data[9],
+                version = account_data[10],
             )
-    
-    def __get_account_by_username__(self, username: str, database_adapter) -> OperatingCompany:
-        database_adapter = database_adapter or self.__get_database_adapter__()
 
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
-
-        try:
-            account_data = cursor.execute("""
-                    SELECT
-                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified
-                    FROM
-                        account
-                    WHERE
-                        account.username = %s
-                    LIMIT
-                        1
-                ;""", (str(username),)).fetchone()
-            
-            cursor.close()
-            
-            if not account_data:
-                raise NotFound("No account matching specified username...")
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
+    def __get_account_by_username__(self, username: str) -> Operation[Account]:
+        account_data = yield Statement("""
+                SELECT
+                    id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified, xmin::text
+                FROM
+                    account
+                WHERE
+                    account.username = %s
+                LIMIT
+                    1
+            ;""", (str(username),), fetch = "one")
+
+        if not account_data:
+            raise NotFound("No account matching specified username...")
 
         return Account(
                 id = account_data[0],
@@ -658,37 +699,30 @@ class Application:
                 disabled = account_data[7],
                 created_at = account_data[8],
                 last_modified = account_data[9],
+                version = account_data[10],
             )
-    
-    def __new_account__(self, account: Account, database_adapter) -> Account:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
 
+    def __new_account__(self, account: Account) -> Operation[Account]:
         try:
-            account_data = cursor.execute("""
+            account_data = yield Statement("""
                     INSERT INTO
                         account
                         (username, name, role, disabled, password_hash)
                     VALUES
                         (%s, %s, %s, %s, %s)
                     RETURNING
-                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified
-                ;""", (str(account.username),str(account.name),str(account.role),bool(account.disabled),str(account.password_hash),)).fetchone()
-            
-            if not account_data:
-                raise NotFound("No account matching specified id...")
-            
-            cursor.close()
-            connection.commit()
-            
+                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified, xmin::text
+                ;""", (str(account.username),str(account.name),str(account.role),bool(account.disabled),str(account.password_hash),), fetch = "one")
         except UniqueViolation:
-            connection.rollback()
             raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
-        except Exception as e:
-            connection.rollback()
-            raise e
+
+        if not account_data:
+            raise NotFound("No account matching specified id...")
+
+        yield changeStatement("account", [account_data[0]])
+        yield Commit()
+
+        self.__get_count_provider__().invalidate("account")
 
         return Account(
                 id = account_data[0],
@@ -701,16 +735,12 @@ class Application:
                 disabled = account_data[7],
                 created_at = account_data[8],
                 last_modified = account_data[9],
+                version = account_data[10],
             )
-    
-    def __set_account_by_id__(self, id: int, account: Account, database_adapter) -> Account:
-        database_adapter = database_adapter or self.__get_database_adapter__()
-
-        connection = self.database_adapter.getConnection(forceNew = True)
-        cursor = self.database_adapter.getCursor(connection = connection)
 
+    def __set_account_by_id__(self, id: int, account: Account, version: str | None = None) -> Operation[Account]:
         try:
-            account_data = cursor.execute("""
+            account_data = yield Statement("""
                     UPDATE
                         account
                     SET
@@ -724,23 +754,20 @@ class Application:
                         created_at = %s,
                         last_modified = %s
                     WHERE
-                        id = %s
+                        id = %s{0}
                     RETURNING
-                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified
-                ;""", (str(account.uuid),str(account.role),str(account.username),str(account.name),str(account.password_hash),str(account.password_last_modified),bool(account.disabled),str(account.created_at),str(account.last_modified),int(account.id))).fetchone()
-            
-            if not account_data:
-                raise NotFound("No account matching specified id...")
-            
-            cursor.close()
-            connection.commit()
-        
+                        id, uuid, role, username, name, password_hash, password_last_modified, disabled, created_at, last_modified, xmin::text
+                ;""".format(" AND xmin = %s::xid" if version else ""), (str(account.uuid),str(account.role),str(account.username),str(account.name),str(account.password_hash),str(account.password_last_modified),bool(account.disabled),str(account.created_at),str(account.last_modified),int(account.id),*([version] if version else [])), fetch = "one")
         except UniqueViolation:
-            connection.rollback()
             raise Conflict("Duplicate value for a unique field, please ensure necessary field(s) are unique!")
-        except Exception as e:
-            connection.rollback()
-            raise e
+
+        if not account_data:
+            yield from self.__missing__("account", "id", int(account.id), version, "No account matching specified id...")
+
+        yield changeStatement("account", [account_data[0]])
+        yield Commit()
+
+        self.__invalidate__("account", [account_data[0]])
 
         return Account(
                 id = account_data[0],
@@ -753,234 +780,535 @@ class Application:
                 disabled = account_data[7],
                 created_at = account_data[8],
                 last_modified = account_data[9],
+                version = account_data[10],
             )
 
+    def __test_database_connection__(self, test_value: str | int | bool = 1) -> Operation[bool]:
+        try:
+            received_value = (yield Statement("SELECT %s;", (test_value,), fetch = "one"))[0]
+        except Exception as e:
+            return False
+        else:
+            if received_value != test_value:
+                return False
+
+            return True
+
     def setDatabaseConnection(
             self,
-            database_adapter: Annotated[DatabaseAdapter, "A database adpater to use as the default instatiation held adapter"],
+            database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter, "A database adpater to use as the default instatiation held adapter"],
             write_enabled: Annotated[bool, "Whether to accept write operations when using this application instance"] = False
         ):
         if not database_adapter:
             raise Exception("Database connection was not provided!")
-        
+
         if database_adapter.closed is True:
             raise InterfaceError("Database connection is already closed!")
-        
+
         self.__set_database_adapter__(database_adapter)
         self.__set_write_enabled__(write_enabled)
 
     def testDatabaseConnection(self, test_value: str | int | bool = 1) -> bool:
-        try:
-            received_value = self.__get_database_adapter__().execute("SELECT %s;", (test_value,)).fetchone()[0]
-        except Exception as e:
-            return False
-        else:
-            if received_value is not test_value:
-                return False
-            
-            return True
-        
+        return self.__run__(self.__test_database_connection__(test_value = test_value))
+
+    def getDatabaseStats(self) -> dict:
+        return self.__get_database_adapter__().getPoolStats()
+
+    def getCacheStats(self) -> dict:
+        return self.__get_entity_cache__().getStats()
+
+    def getSnapshotStats(self) -> dict:
+        return {table: snapshot.getStats() for table, snapshot in self.__snapshots__.items()}
+
     def getAccounts(
         self,
         limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
         offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
-        order_by: Annotated[str, "The field for results to be ordered by"] = "id",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
         order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
-    ) -> dict:
-        return self.__get_account_with_params__(
-                limit = limit,
-                offset = offset,
+        cursor: Annotated[str | None, "Opaque cursor from a previous page, used in lieu of the offset"] = None,
+        count: Annotated[str, "How the total should be counted ('exact', 'estimated' or 'none')"] = "exact",
+        filters: Annotated[dict | None, "Field (or field.operator, e.g. created_at.gte) to value filters"] = None,
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        expand: Annotated[list | None, "Related models to include with the results, see QueryDefinition.expansions"] = None,
+        identity: Annotated[str | None, "What else the listing depends on, if provided its validator is read alongside the results and returned with them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict | tuple[dict, Validator | None]:
+        query = ListQuery(
+            account_query,
+            limit = limit,
+            offset = offset,
+            order_by = order_by,
+            order_by_direction = order_by_direction,
+            cursor = cursor,
+            count = count,
+            filters = filters,
+            fields = fields,
+            expand = expand
+        )
+
+        return self.__run__(self.__validated_list__(query, identity) if identity is not None else self.__list__(query), database_adapter)
+
+    def getAccountsValidator(
+        self,
+        identity: Annotated[str, "What else the listing depends on, i.e. the request path and query"],
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Validator | None:
+        return self.__run__(self.__get_table_validator__([account_query.table], identity), database_adapter)
+
+    def exportAccounts(
+        self,
+        format: Annotated[str, "Format to export in ('ndjson' or 'csv')"] = "ndjson",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
+        order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
+        filters: Annotated[dict | None, "Field (or field.operator, e.g. created_at.gte) to value filters"] = None,
+        fields: Annotated[list | None, "Fields to export, None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> tuple[Iterator[bytes] | AsyncIterator[bytes], ExportEncoder]:
+        return self.__export__(ListQuery(
+                account_query,
                 order_by = order_by,
                 order_by_direction = order_by_direction,
-                database_adapter = database_adapter
-            )
-    
+                filters = filters,
+                fields = fields
+            ), format, database_adapter)
+
     def newAccount(
         self,
         account: Account,
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
-    ) -> OperatingCompany:
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Account:
         if account.id:
             raise BadRequest("ID should not be specified for new account!")
 
-        return self.__new_account__(account = account, database_adapter = database_adapter)
-    
+        return self.__run__(self.__new_account__(account = account), database_adapter)
+
     def setAccount(
         self,
         account: Account,
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        version: Annotated[str | None, "Version the account must still be at (from If-Match), None for any"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
     ) -> Account:
         if not account.id:
             raise BadRequest("Operating company ID not provided!")
 
-        return self.__set_account_by_id__(id = id, account = account, database_adapter = database_adapter)
-        
+        return self.__run__(self.__set_account_by_id__(id = account.id, account = account, version = version), database_adapter)
+
+    def patchAccount(
+        self,
+        id: Annotated[int, "The ID of the account to update"],
+        values: Annotated[dict, "Field to value updates, fields not provided (or None) are left as they are"],
+        version: Annotated[str | None, "Version the account must still be at (from If-Match), None for any"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Account:
+        if not id:
+            raise BadRequest("Account ID not provided!")
+
+        return self.__run__(self.__patch__(account_patch, int(id), values, "No account matching specified id...", version), database_adapter)
+
     def getVehicles(
         self,
         limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
         offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
-        order_by: Annotated[str, "The field for results to be ordered by"] = "id",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
         order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
-    ) -> dict:
-        return self.__get_vehicle_with_params__(
-                limit = limit,
-                offset = offset,
+        cursor: Annotated[str | None, "Opaque cursor from a previous page, used in lieu of the offset"] = None,
+        count: Annotated[str, "How the total should be counted ('exact', 'estimated' or 'none')"] = "exact",
+        filters: Annotated[dict | None, "Field (or field.operator, e.g. created_at.gte) to value filters"] = None,
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        expand: Annotated[list | None, "Related models to include with the results, see QueryDefinition.expansions"] = None,
+        identity: Annotated[str | None, "What else the listing depends on, if provided its validator is read alongside the results and returned with them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict | tuple[dict, Validator | None]:
+        query = ListQuery(
+            vehicle_query,
+            limit = limit,
+            offset = offset,
+            order_by = order_by,
+            order_by_direction = order_by_direction,
+            cursor = cursor,
+            count = count,
+            filters = filters,
+            fields = fields,
+            expand = expand
+        )
+
+        return self.__run__(self.__validated_list__(query, identity) if identity is not None else self.__list__(query), database_adapter)
+
+    def getVehiclesValidator(
+        self,
+        identity: Annotated[str, "What else the listing depends on, i.e. the request path and query"],
+        expand: Annotated[list | None, "Related models included with the results"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Validator | None:
+        tables = [vehicle_query.table, *[expansion.definition.table for expansion in vehicle_query.getExpansions(expand)]]
+
+        return self.__run__(self.__get_table_validator__(tables, identity), database_adapter)
+
+    def exportVehicles(
+        self,
+        format: Annotated[str, "Format to export in ('ndjson' or 'csv')"] = "ndjson",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
+        order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
+        filters: Annotated[dict | None, "Field (or field.operator, e.g. created_at.gte) to value filters"] = None,
+        fields: Annotated[list | None, "Fields to export, None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> tuple[Iterator[bytes] | AsyncIterator[bytes], ExportEncoder]:
+        return self.__export__(ListQuery(
+                vehicle_query,
                 order_by = order_by,
                 order_by_direction = order_by_direction,
-                database_adapter = database_adapter
-            )
+                filters = filters,
+                fields = fields
+            ), format, database_adapter)
 
     def getVehicle(
         self,
         fleet_no: Annotated[str, "The fleet number of the desired vehicle"],
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
-    ) -> Vehicle:
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None,
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        expand: Annotated[list | None, "Related models to include (i.e. 'operatingCompany')"] = None,
+        cached: Annotated[bool, "Whether a cached vehicle may be returned (i.e. False for Cache-Control: no-cache)"] = True
+    ) -> Vehicle | dict:
         if not fleet_no:
             raise BadRequest("Fleet number not provided!")
 
-        return self.__get_vehicle_by_fleet_no__(fleet_no = fleet_no, database_adapter = database_adapter)
-    
+        expansions = vehicle_query.getExpansions(expand)
+
+        # A cached vehicle has every field, so also serves projections, but projections are never cached themselves
+        if fields is not None:
+            operation = self.__cached__("vehicle", "fleet_no", fleet_no, self.__get_projection__(vehicle_query, "fleet_no", fleet_no, fields, "No vehicle matching specified fleet number...", required = [expansion.column for expansion in expansions]), cached, store = False)
+        else:
+            operation = self.__cached__("vehicle", "fleet_no", fleet_no, self.__get_vehicle_by_fleet_no__(fleet_no = fleet_no), cached)
+
+        # Expanded results are returned alongside the related models, as a listing would be
+        if expansions:
+            operation = self.__get_expanded__(operation, expansions)
+
+        return self.__run__(operation, database_adapter)
+
+    def getVehicleValidator(
+        self,
+        fleet_no: Annotated[str, "The fleet number of the desired vehicle"],
+        expand: Annotated[list | None, "Related models included with the vehicle"] = None,
+        fields: Annotated[list | None, "Fields returned, None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Validator | None:
+        if not fleet_no:
+            raise BadRequest("Fleet number not provided!")
+
+        return self.__run__(self.__get_entity_validator__(vehicle_query, "fleet_no", fleet_no, vehicle_query.getExpansions(expand), fields), database_adapter)
+
+    def importVehicles(
+        self,
+        body: Annotated[bytes, "NDJSON or CSV (with a header row) of vehicles"],
+        format: Annotated[str, "Format of the body ('ndjson' or 'csv')"] = "ndjson",
+        atomic: Annotated[bool, "Whether to import nothing if any row conflicts"] = False,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> JSONResponse:
+        return self.__run__(self.__bulk_import__(vehicle_import, *self.__parse_import__(vehicle_import, body, format), atomic = atomic), database_adapter)
+
+    def upsertVehicles(
+        self,
+        vehicles: Annotated[List[Vehicle], "Vehicles to insert, or update where the fleet number exists"],
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict:
+        self.__check_batch_size__(vehicles)
+
+        if any(not vehicle.fleet_no for vehicle in vehicles):
+            raise BadRequest("Fleet number not provided!")
+
+        return self.__run__(self.__upsert__(vehicle_upsert, [
+                (str(vehicle.fleet_no), int(vehicle.opco_id) if vehicle.opco_id is not None else None)
+                for vehicle in vehicles
+            ]), database_adapter)
+
+    def getVehicleBatch(
+        self,
+        fleet_nos: Annotated[list, "The fleet numbers of the desired vehicles"],
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        expand: Annotated[list | None, "Related models to include (i.e. 'operatingCompany')"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict:
+        self.__check_batch_size__(fleet_nos)
+
+        return self.__run__(self.__get_batch__(vehicle_query, fleet_nos, fields, vehicle_query.getExpansions(expand)), database_adapter)
+
     def newVehicle(
         self,
         vehicle: Vehicle,
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
     ) -> Vehicle:
-        return self.__new_vehicle__(vehicle = vehicle, database_adapter = database_adapter)
-    
+        return self.__run__(self.__new_vehicle__(vehicle = vehicle), database_adapter)
+
     def getOperatingCompanies(
         self,
         limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
         offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
-        order_by: Annotated[str, "The field for results to be ordered by"] = "id",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
         order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        cursor: Annotated[str | None, "Opaque cursor from a previous page, used in lieu of the offset"] = None,
+        count: Annotated[str, "How the total should be counted ('exact', 'estimated' or 'none')"] = "exact",
+        filters: Annotated[dict | None, "Field (or field.operator, e.g. created_at.gte) to value filters"] = None,
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        expand: Annotated[list | None, "Related models to include with the results, see QueryDefinition.expansions"] = None,
+        identity: Annotated[str | None, "What else the listing depends on, if provided its validator is read alongside the results and returned with them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
     # ) -> List[OperatingCompany]:
-    ) -> dict:
-        return self.__get_operating_company_with_params__(
-                limit = limit,
-                offset = offset,
+    ) -> dict | tuple[dict, Validator | None]:
+        query = ListQuery(
+            operating_company_query,
+            limit = limit,
+            offset = offset,
+            order_by = order_by,
+            order_by_direction = order_by_direction,
+            cursor = cursor,
+            count = count,
+            filters = filters,
+            fields = fields,
+            expand = expand
+        )
+
+        return self.__run__(self.__validated_list__(query, identity) if identity is not None else self.__list__(query), database_adapter)
+
+    def getOperatingCompaniesValidator(
+        self,
+        identity: Annotated[str, "What else the listing depends on, i.e. the request path and query"],
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Validator | None:
+        return self.__run__(self.__get_table_validator__([operating_company_query.table], identity), database_adapter)
+
+    def exportOperatingCompanies(
+        self,
+        format: Annotated[str, "Format to export in ('ndjson' or 'csv')"] = "ndjson",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
+        order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
+        filters: Annotated[dict | None, "Field (or field.operator, e.g. created_at.gte) to value filters"] = None,
+        fields: Annotated[list | None, "Fields to export, None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> tuple[Iterator[bytes] | AsyncIterator[bytes], ExportEncoder]:
+        return self.__export__(ListQuery(
+                operating_company_query,
                 order_by = order_by,
                 order_by_direction = order_by_direction,
-                database_adapter = database_adapter
-            )
-    
+                filters = filters,
+                fields = fields
+            ), format, database_adapter)
+
     def getOperatingCompany(
         self,
         id: Annotated[str, "The ID of the desired operating company"],
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None,
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        cached: Annotated[bool, "Whether a cached operating company may be returned (i.e. False for Cache-Control: no-cache)"] = True
     ) -> OperatingCompany:
         if not id:
             raise BadRequest("Operating company ID not provided!")
 
-        return self.__get_operating_company_by_id__(id = id, database_adapter = database_adapter)
-    
+        if fields is not None:
+            return self.__run__(self.__cached__("operating_company", "id", id, self.__get_projection__(operating_company_query, "id", id, fields, "No operating company matching specified id..."), cached, store = False), database_adapter)
+
+        return self.__run__(self.__cached__("operating_company", "id", id, self.__get_operating_company_by_id__(id = id), cached), database_adapter)
+
+    def getOperatingCompanyValidator(
+        self,
+        id: Annotated[str, "The ID of the desired operating company"],
+        fields: Annotated[list | None, "Fields returned, None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Validator | None:
+        if not id:
+            raise BadRequest("Operating company ID not provided!")
+
+        return self.__run__(self.__get_entity_validator__(operating_company_query, "id", id, [], fields), database_adapter)
+
+    def importOperatingCompanies(
+        self,
+        body: Annotated[bytes, "NDJSON or CSV (with a header row) of operating companies"],
+        format: Annotated[str, "Format of the body ('ndjson' or 'csv')"] = "ndjson",
+        atomic: Annotated[bool, "Whether to import nothing if any row conflicts"] = False,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> JSONResponse:
+        return self.__run__(self.__bulk_import__(operating_company_import, *self.__parse_import__(operating_company_import, body, format), atomic = atomic), database_adapter)
+
+    def upsertOperatingCompanies(
+        self,
+        operating_companies: Annotated[List[OperatingCompany], "Operating companies to insert, or update where the NOC exists"],
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict:
+        self.__check_batch_size__(operating_companies)
+
+        if any(not operating_company.noc or not operating_company.short_code for operating_company in operating_companies):
+            raise BadRequest("Operating company NOC and short code must be provided!")
+
+        return self.__run__(self.__upsert__(operating_company_upsert, [
+                (str(operating_company.noc), str(operating_company.short_code), operating_company.name)
+                for operating_company in operating_companies
+            ]), database_adapter)
+
+    def getOperatingCompanyBatch(
+        self,
+        ids: Annotated[list, "The IDs of the desired operating companies"],
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict:
+        self.__check_batch_size__(ids)
+
+        return self.__run__(self.__get_batch__(operating_company_query, ids, fields, []), database_adapter)
+
     def setOperatingCompany(
         self,
         operating_company: OperatingCompany,
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        version: Annotated[str | None, "Version the operating company must still be at (from If-Match), None for any"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
     ) -> OperatingCompany:
         if not operating_company.id:
             raise BadRequest("Operating company ID not provided!")
 
-        return self.__set_operating_company_by_id__(id = id, operating_company = operating_company, database_adapter = database_adapter)
-    
+        return self.__run__(self.__set_operating_company_by_id__(id = operating_company.id, operating_company = operating_company, version = version), database_adapter)
+
+    def patchOperatingCompany(
+        self,
+        id: Annotated[int, "The ID of the operating company to update"],
+        values: Annotated[dict, "Field to value updates, fields not provided (or None) are left as they are"],
+        version: Annotated[str | None, "Version the operating company must still be at (from If-Match), None for any"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> OperatingCompany:
+        if not id:
+            raise BadRequest("Operating company ID not provided!")
+
+        return self.__run__(self.__patch__(operating_company_patch, int(id), values, "No operating company matching specified id...", version), database_adapter)
+
     def newOperatingCompany(
         self,
         operating_company: OperatingCompany,
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
     ) -> OperatingCompany:
         if operating_company.id:
             raise BadRequest("ID should not be specified for new operating company!")
 
-        return self.__new_operating_company__(operating_company = operating_company, database_adapter = database_adapter)
-    
+        return self.__run__(self.__new_operating_company__(operating_company = operating_company), database_adapter)
+
     def deleteOperatingCompany(
         self,
         id: Annotated[str, "The ID of the desired operating company"],
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None,
-        confirmed: bool = False
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None,
+        confirmed: bool = False,
+        version: Annotated[str | None, "Version the operating company must still be at (from If-Match), None for any"] = None
     ) -> JSONResponse:
         if not id:
             raise BadRequest("Operating company ID not provided!")
 
-        try:
-            records = self.__delete_operating_company__(id = id, database_adapter = database_adapter, confirmed = confirmed)
-
-            return JSONResponse(content = {
-                    "message": f"This operation has deleted {len(records)} record(s)!" if confirmed
-                        else f"This operation will delete {len(records)} item(s), please confirm...",
-                    "result": {
-                        "rows": records,
-                        "length": len(records),
-                    }
-                })
-        except ForeignKeyViolation:
-            return Conflict("Vehicles have been assigned to this operating company so it may not be deleted! You may still edit details...")
-    
-    def handleSerialisation(self, x: OperatingCompany | Vehicle, root: str = ""):
-        return {
-                **(
-                    { **(x.serialise() or {}), **({"links": x.hypermediaLinks(root) or []} if hasattr(x, "hypermediaLinks") else {}) } if hasattr(x, "serialise")
-                    else {}
-                )
-                # **({"result": x.serialise() or {}} if hasattr(x, "serialise") else {}),
-                # **({"links": x.hypermediaLinks(root) or []} if hasattr(x, "hypermediaLinks") else {}),
-            } 
-    
+        return self.__run__(self.__delete_operating_company__(id = id, confirmed = confirmed, version = version), database_adapter)
+
+    def handleSerialisation(self, x: OperatingCompany | Vehicle, root: str = "", fields: list | None = None):
+        if type(x) in SERIALISERS:
+            return SERIALISERS[type(x)].serialise(x, root, fields)
+
+        if not hasattr(x, "serialise"):
+            return {}
+
+        serialised = x.serialise() or {}
+
+        # Narrow to the requested fields, links are only built when requested
+        if fields is not None:
+            serialised = {key: value for key, value in serialised.items() if key in fields}
+
+        if hasattr(x, "hypermediaLinks") and (fields is None or LINKS_FIELD in fields):
+            serialised["links"] = x.hypermediaLinks(root) or []
+
+        return serialised
+
     def createResponseBody(
             self,
             x: dict | OperatingCompany | Vehicle | List[OperatingCompany] | List[Vehicle],
             root: str = "",
-            no_result_key: bool = False
+            no_result_key: bool = False,
+            fields: Annotated[list | None, "Fields to serialise (optionally including 'links'), None for all of them"] = None
         ):
         if isinstance(x, dict) and "result" in x:
-            return { **x, "result": self.createResponseBody(x["result"], no_result_key = True) }
+            return {
+                    **x,
+                    "result": self.createResponseBody(x["result"], root, no_result_key = True, fields = fields),
+                    # Included models are always serialised in full
+                    **({"included": {name: self.createResponseBody(models, root, no_result_key = True) for name, models in x["included"].items()}} if "included" in x else {})
+                }
 
         if isinstance(x, List):
+            # Results are all of one model, so are serialised by one compiled function
+            if x and type(x[0]) in SERIALISERS and all(type(item) is type(x[0]) for item in x):
+                serialised = SERIALISERS[type(x[0])].serialiseMany(x, root, fields)
+            else:
+                serialised = [self.handleSerialisation(item, root, fields) for item in x]
+
             if no_result_key:
-                return map(self.handleSerialisation, x)
-            return { "result": map(self.handleSerialisation, x) }
+                return serialised
+            return { "result": serialised }
 
         if no_result_key:
-            return self.handleSerialisation(x, root)
-        
-        return { "result": self.handleSerialisation(x, root) }
-    
+            return self.handleSerialisation(x, root, fields)
+
+        return { "result": self.handleSerialisation(x, root, fields) }
+
     def getAccount(
         self,
         id: Annotated[str, "The ID of the desired account"] = None,
         uuid: Annotated[str, "The UUID of the desired account"] = None,
         username: Annotated[str, "The username of the desired account"] = None,
-        database_adapter: Annotated[DatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None,
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for every field"] = None,
+        cached: Annotated[bool, "Whether a cached account may be returned (i.e. False for Cache-Control: no-cache)"] = True
     ) -> Account:
+        if id and fields is not None:
+            return self.__run__(self.__cached__("account", "id", id, self.__get_projection__(account_query, "id", id, fields, "No account matching specified id..."), cached, store = False), database_adapter)
+
         if id:
-            return self.__get_account_by_id__(id = id, database_adapter = database_adapter)
-        
+            return self.__run__(self.__cached__("account", "id", id, self.__get_account_by_id__(id = id), cached), database_adapter)
+
         if uuid:
-            return self.__get_account_by_uuid__(uuid = uuid, database_adapter = database_adapter)
-        
+            return self.__run__(self.__cached__("account", "uuid", uuid, self.__get_account_by_uuid__(uuid = uuid), cached), database_adapter)
+
         if username:
-            return self.__get_account_by_username__(username = username, database_adapter = database_adapter)
-        
+            return self.__run__(self.__cached__("account", "username", username, self.__get_account_by_username__(username = username), cached), database_adapter)
+
         raise BadRequest("An account identifier was not provided!")
-    
-    def hashPassword(self, password: Annotated[str, "String value to be BCrypted"]):
-        # Declaring our password
-        password = password.encode("utf-8")
-        
-        # Generate a salt for the password
-        salt = bcrypt.gensalt()
-        
-        # Return the hashed password
-        return bcrypt.hashpw(password, salt).decode("utf-8")
-    
-    def matchAccountPassword(self, account: Account, password: bytes) -> bool:
-        return bcrypt.checkpw(password = password.encode("utf-8"), hashed_password = account.password_hash.encode("utf-8"))
-    
+
+    def getAccountValidator(
+        self,
+        id: Annotated[str, "The ID of the desired account"],
+        fields: Annotated[list | None, "Fields returned, None for all of them"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Validator | None:
+        if not id:
+            raise BadRequest("Account ID not provided!")
+
+        return self.__run__(self.__get_entity_validator__(account_query, "id", id, [], fields), database_adapter)
+
+    def getAccountBatch(
+        self,
+        ids: Annotated[list, "The IDs of the desired accounts"],
+        fields: Annotated[list | None, "Fields to return (optionally including 'links'), None for every field"] = None,
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> dict:
+        self.__check_batch_size__(ids)
+
+        return self.__run__(self.__get_batch__(account_query, ids, fields, []), database_adapter)
+
+    def getAccountSession(
+        self,
+        id: Annotated[str, "The ID of the desired account"],
+        database_adapter: Annotated[DatabaseAdapter | AsyncDatabaseAdapter | None, "A database connection to use in lieu of the default instatiation held adapter"] = None
+    ) -> Account:
+        # Only the id, uuid, name, role and disabled flag are returned, enough to check and issue a token pair
+        if not id:
+            raise BadRequest("Account ID not provided!")
+
+        return self.__run__(self.__get_account_session__(id), database_adapter)
+
+    def getAccountSessionStats(self) -> dict:
+        return self.__account_sessions__.getStats()
+
     def generateTokenPairForAccount(self, account: Account, authorisation: AuthorisationAdapter)-> str:
         return authorisation.generateTokenPair(account)
-    
+
     def generateTokenForAccount(self, account: Account, authorisation: AuthorisationAdapter)-> str:
         return authorisation.generateAccessToken(account)
@@ -1,21 +1,73 @@
+import hashlib
+import json
 import math
 import time
 import uuid
-from jose import jwt
+from jose import jwk, jwt
+from jose.constants import ALGORITHMS
+from jose.exceptions import JWTError
+from jose.utils import base64url_encode
 from typing import Annotated
 
 from ..models.account import Account
 
+# Algorithms tokens may be signed with, asymmetric algorithms allow tokens to be verified without the secret (see getJWKS)
+SIGNING_ALGORITHMS = ALGORITHMS.HMAC | ALGORITHMS.RSA_DS | ALGORITHMS.EC_DS
+
+# Members of each key type's public JWK which identify the key, see RFC 7638
+THUMBPRINT_MEMBERS = {"oct": ("k", "kty"), "RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
 class AuthorisationAdapter:
     # On initialisation of class instance
-    def __init__(self, algorithm: Annotated[str, "Algorithm to use for the JWTs"], secret: Annotated[str, "Secret to use for the JWTs"]):
+    def __init__(
+            self,
+            algorithm: Annotated[str, "Algorithm to use for the JWTs"],
+            secret: Annotated[str, "Secret (HMAC) or PEM private key to sign the JWTs with"],
+            cache_size: Annotated[int, "Maximum number of verified tokens to remember the claims of"] = 4096,
+            previous_keys: Annotated[list | tuple, "Secrets or PEM (public) keys of retired signing keys, whose tokens are still accepted"] = (),
+        ):
+        if algorithm not in SIGNING_ALGORITHMS:
+            raise Exception(f"JWT algorithm {algorithm} is not supported, use one of {', '.join(sorted(SIGNING_ALGORITHMS))}")
+
         self.__algorithm__ = algorithm
-        self.__secret__ = secret
+        self.__cache_size__ = cache_size
+
+        # Key ID to key of every key tokens may be verified with, each token names the key which signed it in its header
+        self.__keys__ = {}
+        self.__kid__, self.__secret__ = self.__add_key__(secret)
+
+        if algorithm not in ALGORITHMS.HMAC and self.__secret__.is_public():
+            raise Exception("JWTs can only be signed with a private key!")
+
+        for key in previous_keys:
+            self.__add_key__(key)
+
+        # Token digest to (claims, exp) of tokens whose signature has been verified, least recently used first
+        self.__cache__ = {}
+        self.__hits__ = 0
+        self.__misses__ = 0
+        self.__evictions__ = 0
 
     # On destruction of class instance
     def __del__(self):
         pass
 
+    def __add_key__(self, key: str) -> tuple:
+        key = jwk.construct(key, self.__algorithm__)
+
+        # Signatures are verified with the public half of asymmetric keys
+        public_key = key if self.__algorithm__ in ALGORITHMS.HMAC else key.public_key()
+        data = public_key.to_dict()
+
+        # The key ID is the key's thumbprint, so is the same on every replica and changes with the key
+        members = {member: data[member] for member in THUMBPRINT_MEMBERS[data["kty"]]}
+        thumbprint = hashlib.sha256(json.dumps(members, separators = (",", ":"), sort_keys = True).encode("utf-8")).digest()
+
+        kid = base64url_encode(thumbprint).decode("ascii")
+        self.__keys__[kid] = public_key
+
+        return (kid, key)
+
     def encode(self, claims: dict, validTime: Annotated[int, "Seconds the token will be valid for"] = 1200) -> str:
         time_now = math.floor(time.time())
 
@@ -26,7 +78,7 @@ class AuthorisationAdapter:
             "exp": time_now + validTime
         }
 
-        return jwt.encode(claims = claims, key = self.__secret__, algorithm = self.__algorithm__)
+        return jwt.encode(claims = claims, key = self.__secret__, algorithm = self.__algorithm__, headers = {"kid": self.__kid__})
     
     # Generate an access token for an account (2 minute life)
     def generateAccessToken(self, account: Account, id: str) -> str:
@@ -62,8 +114,75 @@ class AuthorisationAdapter:
             self.generateRefreshToken(account, id),
         )
     
+    def __verify__(self, token: str, verify_exp: bool) -> dict:
+        # The same access token is presented by every request made within its life, so its verified claims are remembered
+        # (until it expires) rather than the signature being checked again each time
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self.__cache__.get(digest)
+
+        if entry:
+            # Expired to the second, as jose does. Expired tokens are left for jose to reject with the same error as ever
+            if math.floor(time.time()) <= entry[1]:
+                self.__cache__.pop(digest)
+                self.__cache__[digest] = entry
+                self.__hits__ += 1
+
+                return dict(entry[0])
+
+            self.__cache__.pop(digest)
+
+            # Refreshing verifies the signature, but not the expiry
+            if not verify_exp:
+                self.__hits__ += 1
+
+                return dict(entry[0])
+
+        self.__misses__ += 1
+
+        # Tokens issued before keys were identified were signed by the current key
+        kid = jwt.get_unverified_header(token).get("kid", self.__kid__)
+
+        if kid not in self.__keys__:
+            raise JWTError("Token was signed by an unknown key")
+
+        claims = jwt.decode(token = token, key = self.__keys__[kid], algorithms = self.__algorithm__, options = {"verify_exp": verify_exp})
+        exp = claims.get("exp")
+
+        # Only tokens which are yet to expire are worth remembering
+        if self.__cache_size__ > 0 and isinstance(exp, int) and math.floor(time.time()) <= exp:
+            while len(self.__cache__) >= self.__cache_size__:
+                self.__cache__.pop(next(iter(self.__cache__)))
+                self.__evictions__ += 1
+
+            self.__cache__[digest] = (dict(claims), exp)
+
+        return claims
+
     def decode(self, token: str) -> dict:
-        return jwt.decode(token = token, key = self.__secret__, algorithms = self.__algorithm__)
+        return self.__verify__(token, True)
     
     def decode_ignore_expiry(self, token: str) -> dict:
-        return jwt.decode(token = token, key = self.__secret__, algorithms = self.__algorithm__, options={ 'verify_exp': False })
+        return self.__verify__(token, False)
+
+    def getJWKS(self) -> dict:
+        # Public keys of every key tokens may be verified with, HMAC secrets can't be published
+        if self.__algorithm__ in ALGORITHMS.HMAC:
+            return {"keys": []}
+
+        return {
+                "keys": [
+                    {**key.to_dict(), "kid": kid, "use": "sig"}
+                    for kid, key in self.__keys__.items()
+                ]
+            }
+
+    def getStats(self) -> dict:
+        lookups = self.__hits__ + self.__misses__
+
+        return {
+                "entries": len(self.__cache__),
+                "hits": self.__hits__,
+                "misses": self.__misses__,
+                "evictions": self.__evictions__,
+                "hit_rate": (self.__hits__ / lookups) if lookups else 0,
+            }
@@ -0,0 +1,240 @@
+import csv
+import io
+import json
+from typing import Annotated, Any
+
+from .database import Copy, Statement
+from .errors import BadRequest
+
+# A field accepted by a bulk import, validated before anything is sent to the database so COPY never fails part way
+class ImportField:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            name: Annotated[str, "Trusted SQL name of the column, also used as the field name"],
+            type: Annotated[type, "Python type values are parsed as"] = str,
+            required: Annotated[bool, "Whether a value must be provided"] = True,
+            max_length: Annotated[int | None, "Maximum length of string values, as declared by the column"] = None,
+        ):
+        self.name = name
+        self.type = type
+        self.required = required
+        self.max_length = max_length
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def parse(self, value: Any) -> Any:
+        if value is None or value == "":
+            if self.required:
+                raise ValueError(f"'{self.name}' is required")
+
+            return None
+
+        try:
+            value = self.type(str(value))
+        except ValueError:
+            raise ValueError(f"'{self.name}' is not valid")
+
+        if self.max_length and len(value) > self.max_length:
+            raise ValueError(f"'{self.name}' is longer than {self.max_length} characters")
+
+        return value
+
+# Describes how rows are loaded into a table: COPY into a staging table, report conflicts, then merge the rest
+class BulkImport:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            table: Annotated[str, "Trusted SQL name of the table"],
+            fields: Annotated[list, "Fields accepted for each row"],
+            unique: Annotated[list, "Columns which must be unique, the first is used to identify rows in the report"],
+            references: Annotated[dict | None, "Column to (table, column) foreign keys which must exist"] = None,
+        ):
+        self.table = table
+        self.fields = fields
+        self.unique = unique
+        self.references = references or {}
+        self.key = unique[0]
+        self.staging = f"{table}_staging"
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __records__(self, body: bytes, format: str):
+        text = body.decode("utf-8-sig")
+
+        if format == "csv":
+            reader = csv.DictReader(io.StringIO(text))
+
+            for record in reader:
+                yield (reader.line_num, record)
+
+            return
+
+        for line, record in enumerate(text.splitlines(), start = 1):
+            if not record.strip():
+                continue
+
+            try:
+                record = json.loads(record)
+            except ValueError:
+                record = None
+
+            yield (line, record)
+
+    def parse(
+            self,
+            body: Annotated[bytes, "NDJSON or CSV (with a header row) request body"],
+            format: Annotated[str, "Format of the body ('ndjson' or 'csv')"] = "ndjson",
+        ) -> tuple[list, list]:
+        rows = []
+        rejected = []
+
+        try:
+            for line, record in self.__records__(body, format):
+                if not isinstance(record, dict):
+                    rejected.append({"line": line, "key": None, "reason": "Row is not a valid object"})
+                    continue
+
+                try:
+                    rows.append((line, *[field.parse(record.get(field.name)) for field in self.fields]))
+                except ValueError as exception:
+                    rejected.append({"line": line, "key": record.get(self.key), "reason": str(exception)})
+        except (UnicodeDecodeError, csv.Error):
+            raise BadRequest("Body provided could not be read!")
+
+        return (rows, rejected)
+
+    def columns(self) -> str:
+        return ", ".join(field.name for field in self.fields)
+
+    def stagingStatement(self) -> Statement:
+        # Takes the column types (but not the constraints) of the table, and is dropped with the transaction
+        return Statement("""
+                CREATE TEMPORARY TABLE {0} ON COMMIT DROP AS
+                    SELECT
+                        0 AS line, {1}
+                    FROM
+                        {2}
+                WITH NO DATA
+            ;""".format(self.staging, self.columns(), self.table), fetch = None)
+
+    def copyStatement(self, rows: Annotated[list, "Parsed (line, *values) rows"]) -> Copy:
+        return Copy("COPY {0} (line, {1}) FROM STDIN".format(self.staging, self.columns()), rows)
+
+    def conflictStatement(self) -> Statement:
+        reasons = []
+
+        for column in self.unique:
+            reasons.append(f"WHEN EXISTS (SELECT 1 FROM {self.table} WHERE {self.table}.{column} = s.{column}) THEN 'Duplicate value for {column}'")
+            reasons.append(f"WHEN EXISTS (SELECT 1 FROM {self.staging} t WHERE t.{column} = s.{column} AND t.line < s.line) THEN 'Duplicate value for {column} within the import'")
+
+        for column, (table, reference) in self.references.items():
+            reasons.append(f"WHEN s.{column} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {table} WHERE {table}.{reference} = s.{column}) THEN 'Unknown {column}'")
+
+        return Statement("""
+                SELECT
+                    line, conflict_key, reason
+                FROM (
+                    SELECT
+                        s.line, s.{0} AS conflict_key, CASE {1} END AS reason
+                    FROM
+                        {2} s
+                ) conflicts
+                WHERE
+                    reason IS NOT NULL
+                ORDER BY
+                    line
+            ;""".format(self.key, " ".join(reasons), self.staging))
+
+    def mergeStatement(self, skip: Annotated[list, "Lines which conflicted and must not be merged"]) -> Statement:
+        # Rows inserted concurrently since the conflicts were found are skipped, rather than failing the merge
+        return Statement("""
+                INSERT INTO
+                    {0}
+                    ({1})
+                SELECT
+                    {1}
+                FROM
+                    {2}
+                WHERE
+                    NOT (line = ANY(%s::int[]))
+                ORDER BY
+                    line
+                ON CONFLICT DO NOTHING
+                RETURNING
+                    {3}
+            ;""".format(self.table, self.columns(), self.staging, self.key), (skip,))
+
+    def keyOf(self, row: Annotated[tuple, "Parsed (line, *values) row"]) -> Any:
+        return row[1 + [field.name for field in self.fields].index(self.key)]
+
+# Describes an idempotent INSERT ... ON CONFLICT DO UPDATE of many rows at once, which skips rows that would not change
+class Upsert:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            table: Annotated[str, "Trusted SQL name of the table"],
+            key: Annotated[str, "Unique column identifying existing rows, the conflict target"],
+            columns: Annotated[list, "(column, SQL type) written by the upsert, including the key"],
+            returning: Annotated[list, "Columns returned, as taken by the model"],
+            model: Annotated[type, "Model class constructed with a keyword argument per returned column"],
+        ):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.returning = returning
+        self.model = model
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def keyOf(self, row: Annotated[tuple, "Values of the upserted columns"]) -> Any:
+        return row[[column for column, _ in self.columns].index(self.key)]
+
+    def statement(self, rows: Annotated[list, "Values of the upserted columns for each row"]) -> Statement:
+        names = [column for column, _ in self.columns]
+        updated = [column for column in names if column != self.key]
+
+        # Every row is sent as one array per column, xmax is only 0 for freshly inserted rows
+        return Statement("""
+                INSERT INTO
+                    {0}
+                    ({1})
+                SELECT
+                    *
+                FROM
+                    unnest({2})
+                ON CONFLICT ({3}) DO UPDATE SET
+                    {4}
+                WHERE
+                    ({5}) IS DISTINCT FROM ({6})
+                RETURNING
+                    {7}, (xmax = 0) AS inserted
+            ;""".format(
+                    self.table,
+                    ", ".join(names),
+                    ", ".join(f"%s::{type}[]" for _, type in self.columns),
+                    self.key,
+                    ", ".join(f"{column} = EXCLUDED.{column}" for column in updated),
+                    ", ".join(f"{self.table}.{column}" for column in updated),
+                    ", ".join(f"EXCLUDED.{column}" for column in updated),
+                    ", ".join(self.returning)
+                ), tuple([row[index] for row in rows] for index in range(len(self.columns))))
+
+    def selectStatement(self, keys: Annotated[list, "Keys of the rows which were left unchanged"]) -> Statement:
+        return Statement("""
+                SELECT
+                    {0}
+                FROM
+                    {1}
+                WHERE
+                    {2} = ANY(%s)
+            ;""".format(", ".join(self.returning), self.table, self.key), (keys,))
+
+    def response(self, row: Annotated[tuple, "Returned columns"]) -> Any:
+        return self.model(**dict(zip(self.returning, row)))
@@ -0,0 +1,214 @@
+import time
+from typing import Annotated, Any
+
+# Caches single models by each key they can be looked up by (i.e. an account by id, uuid and username), so lookups which
+# repeat constantly (refresh, login) skip the database. Entries expire after a TTL and the least recently used are evicted
+# once full. Writes invalidate every entry of the written model, via its identity, however it was looked up.
+class EntityCache:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            ttl: Annotated[float, "Seconds a model is cached for"] = 30.0,
+            max_entries: Annotated[int, "Maximum number of lookups to cache"] = 1024,
+        ):
+        self.__ttl__ = ttl
+        self.__max_entries__ = max_entries
+        self.__cache__ = {}
+        self.__identities__ = {}
+        self.__generations__ = {}
+        self.__epoch__ = 0
+        self.__hits__ = 0
+        self.__misses__ = 0
+        self.__evictions__ = 0
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __discard__(self, key: tuple) -> None:
+        entry = self.__cache__.pop(key, None)
+
+        if not entry:
+            return
+
+        keys = self.__identities__.get(entry[2])
+
+        if keys is not None:
+            keys.discard(key)
+
+            if not keys:
+                self.__identities__.pop(entry[2], None)
+
+    def generation(self, entity: Annotated[str, "Name of the model, i.e. 'account'"]) -> tuple:
+        return (self.__epoch__, self.__generations__.get(entity, 0))
+
+    def setTTL(self, ttl: Annotated[float, "Seconds models cached from now on are cached for"]) -> None:
+        self.__ttl__ = ttl
+
+    def get(
+            self,
+            entity: Annotated[str, "Name of the model, i.e. 'account'"],
+            key: Annotated[str, "Field the model is looked up by, i.e. 'username'"],
+            value: Any,
+        ) -> Any:
+        cache_key = (entity, key, str(value))
+        entry = self.__cache__.get(cache_key)
+
+        if not entry or entry[1] <= time.monotonic():
+            if entry:
+                self.__discard__(cache_key)
+
+            self.__misses__ += 1
+            return None
+
+        # Move to the end, dicts retain insertion order so the front is always the least recently used
+        self.__cache__.pop(cache_key)
+        self.__cache__[cache_key] = entry
+        self.__hits__ += 1
+
+        return entry[0]
+
+    def put(
+            self,
+            entity: Annotated[str, "Name of the model, i.e. 'account'"],
+            identity: Annotated[Any, "Primary key of the model, used to invalidate it"],
+            lookups: Annotated[dict, "Field to value of every key the model can be looked up by"],
+            model: Any,
+            generation: Annotated[tuple | None, "Generation the model was read at, it is discarded if the entity has since been written"] = None,
+        ) -> None:
+        if self.__max_entries__ < 1 or (generation is not None and generation != self.generation(entity)):
+            return
+
+        identity = (entity, str(identity))
+        expires = time.monotonic() + self.__ttl__
+
+        for key, value in lookups.items():
+            cache_key = (entity, key, str(value))
+            self.__discard__(cache_key)
+
+            while len(self.__cache__) >= self.__max_entries__:
+                self.__discard__(next(iter(self.__cache__)))
+                self.__evictions__ += 1
+
+            self.__cache__[cache_key] = (model, expires, identity)
+            self.__identities__.setdefault(identity, set()).add(cache_key)
+
+    def invalidate(
+            self,
+            entity: Annotated[str, "Name of the model, i.e. 'account'"],
+            identity: Annotated[Any, "Primary key of the written model, None for every model of the entity"] = None,
+        ) -> None:
+        # Reads in flight when the write happened must not repopulate the cache with what they read
+        self.__generations__[entity] = self.__generations__.get(entity, 0) + 1
+
+        if identity is None:
+            keys = [key for key in self.__cache__ if key[0] == entity]
+        else:
+            keys = list(self.__identities__.get((entity, str(identity)), ()))
+
+        for key in keys:
+            self.__discard__(key)
+
+    def clear(self) -> None:
+        # As with invalidate, but for every entity (i.e. when writes may have been missed)
+        self.__epoch__ += 1
+        self.__cache__.clear()
+        self.__identities__.clear()
+
+    def getStats(self) -> dict:
+        return {
+                "entries": len(self.__cache__),
+                "hits": self.__hits__,
+                "misses": self.__misses__,
+                "evictions": self.__evictions__,
+            }
+
+# Holds just what refreshing a token pair needs of each account (its uuid, name, role and disabled flag), so refreshes
+# need no database round trip. Entries live far longer than the entity cache's, as they are only held while writes are
+# being notified (see ./notify.py): written accounts are evicted, and nothing is held while notifications may be missed.
+class AccountSessionCache:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            ttl: Annotated[float, "Seconds an account is held for, even if never written"] = 600.0,
+            max_entries: Annotated[int, "Maximum number of accounts to hold"] = 65536,
+        ):
+        self.__ttl__ = ttl
+        self.__max_entries__ = max_entries
+        self.__cache__ = {}
+        self.__generation__ = 0
+        self.__listening__ = False
+        self.__hits__ = 0
+        self.__misses__ = 0
+        self.__evictions__ = 0
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def generation(self) -> int:
+        return self.__generation__
+
+    def get(self, id: Annotated[Any, "ID of the account"]) -> tuple | None:
+        entry = self.__cache__.get(str(id))
+
+        if not entry or entry[-1] <= time.monotonic():
+            if entry:
+                self.__cache__.pop(str(id))
+
+            self.__misses__ += 1
+            return None
+
+        # Move to the end, dicts retain insertion order so the front is always the least recently used
+        self.__cache__.pop(str(id))
+        self.__cache__[str(id)] = entry
+        self.__hits__ += 1
+
+        return entry[:-1]
+
+    def put(
+            self,
+            id: Annotated[Any, "ID of the account"],
+            session: Annotated[tuple, "(uuid, name, role, disabled) of the account"],
+            generation: Annotated[int, "Generation the account was read at, it is discarded if any account has since been written"],
+        ) -> None:
+        if not self.__listening__ or self.__max_entries__ < 1 or generation != self.__generation__:
+            return
+
+        self.__cache__.pop(str(id), None)
+
+        while len(self.__cache__) >= self.__max_entries__:
+            self.__cache__.pop(next(iter(self.__cache__)))
+            self.__evictions__ += 1
+
+        self.__cache__[str(id)] = (*session, time.monotonic() + self.__ttl__)
+
+    def invalidate(self, id: Annotated[Any, "ID of the written account, None for every account"] = None) -> None:
+        # Reads in flight when the write happened must not repopulate the cache with what they read
+        self.__generation__ += 1
+
+        if id is None:
+            self.__cache__.clear()
+        else:
+            self.__cache__.pop(str(id), None)
+
+    def changed(self, table: Annotated[str, "Table which was written"], keys: Annotated[list | None, "Primary keys written, None for any"]) -> None:
+        if table != "account":
+            return
+
+        for key in keys if keys is not None else [None]:
+            self.invalidate(key)
+
+    def listening(self, listening: Annotated[bool, "Whether changes are being notified"]) -> None:
+        # Anything held may have been written while not listening
+        self.__listening__ = listening
+        self.invalidate()
+
+    def getStats(self) -> dict:
+        return {
+                "entries": len(self.__cache__),
+                "hits": self.__hits__,
+                "misses": self.__misses__,
+                "evictions": self.__evictions__,
+                "listening": self.__listening__,
+            }
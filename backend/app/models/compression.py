@@ -0,0 +1,244 @@
+import mimetypes
+import os
+import zlib
+from typing import Annotated
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content codings the server can produce, in order of preference when a client accepts several equally. The optional
+# ones are only offered if their library is installed
+ENCODINGS = [
+    *(["zstd"] if zstandard else []),
+    *(["br"] if brotli else []),
+    "gzip",
+]
+
+# Extension of the precompressed sibling of a static file for each content coding, i.e. app.js.br
+STATIC_EXTENSIONS = {"zstd": ".zst", "br": ".br", "gzip": ".gz"}
+
+# Media types worth compressing, anything else (i.e. images) is already compressed or too small to matter
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml")
+
+def negotiateEncoding(
+        accept_encoding: Annotated[str | None, "Accept-Encoding request header"],
+        encodings: Annotated[list | tuple, "Content codings available, in order of preference"] = ENCODINGS,
+    ) -> str | None:
+    # The coding the client weights highest, ties going to the server's preference. None for the identity coding
+    weights = {}
+
+    for member in (accept_encoding or "").lower().split(","):
+        coding, _, parameters = member.strip().partition(";")
+        weight = 1.0
+
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.strip().partition("=")
+
+            if name == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+
+        weights[coding.strip()] = weight
+
+    candidates = [(weights.get(encoding, weights.get("*", 0.0)), -position, encoding) for position, encoding in enumerate(encodings)]
+    weight, _, encoding = max(candidates, default = (0.0, 0, None))
+
+    return encoding if weight > 0 else None
+
+def isCompressible(content_type: Annotated[str | None, "Content-Type response header"]) -> bool:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith(("+json", "+xml"))
+
+# Incrementally compresses a response body in one content coding. Each chunk written is flushed, so a streamed response
+# (i.e. an export) reaches the client as it is produced rather than once the compressor's window fills
+class Compressor:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            encoding: Annotated[str, "Content coding to compress with ('gzip', 'br' or 'zstd')"],
+            level: Annotated[int, "Compression level (brotli quality) of the coding"],
+        ):
+        self.encoding = encoding
+
+        if encoding == "zstd":
+            self.__compressor__ = zstandard.ZstdCompressor(level = level).compressobj()
+        elif encoding == "br":
+            self.__compressor__ = brotli.Compressor(quality = level)
+        else:
+            # 16 + the maximum window size selects the gzip container
+            self.__compressor__ = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def write(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+
+        if self.encoding == "zstd":
+            return self.__compressor__.compress(data) + self.__compressor__.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+        if self.encoding == "br":
+            return self.__compressor__.process(data) + self.__compressor__.flush()
+
+        return self.__compressor__.compress(data) + self.__compressor__.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.__compressor__.finish()
+
+        return self.__compressor__.flush()
+
+    def compress(self, data: bytes) -> bytes:
+        # A whole body at once, without flushing in between
+        if self.encoding == "zstd":
+            return self.__compressor__.compress(data) + self.__compressor__.flush()
+
+        if self.encoding == "br":
+            return self.__compressor__.process(data) + self.__compressor__.finish()
+
+        return self.__compressor__.compress(data) + self.__compressor__.flush()
+
+# Compresses responses in the coding negotiated from the request's Accept-Encoding. Complete bodies smaller than
+# `minimum_size` are sent as they are, compressing them costs more than it saves, but streamed bodies (whose size isn't
+# known up front) are always compressed. Responses which are already encoded (i.e. precompressed static files) are left
+# alone. Strong ETags are weakened, as the compressed bytes differ from those the ETag was issued for.
+class CompressionMiddleware:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: Annotated[int, "Bytes below which complete bodies aren't compressed"] = 1024,
+            levels: Annotated[dict | None, "Compression level of each content coding"] = None,
+        ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiateEncoding(Headers(scope = scope).get("accept-encoding"))
+
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor = None
+
+        async def compressed_send(message: Message) -> None:
+            nonlocal start, compressor
+
+            if message["type"] == "http.response.start":
+                # Held until the first body message, which decides whether the response is compressed
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                message_start, start = start, None
+                headers = MutableHeaders(scope = message_start)
+
+                # Precompressed static files already vary by it
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+
+                if (
+                        "content-encoding" in headers
+                        or message_start["status"] in (204, 206, 304)
+                        or not isCompressible(headers.get("content-type"))
+                        or (not more_body and len(body) < self.minimum_size)
+                    ):
+                    await send(message_start)
+                    return await send(message)
+
+                compressor = Compressor(encoding, self.levels[encoding])
+                headers["Content-Encoding"] = encoding
+
+                if headers.get("etag", "").startswith("\""):
+                    headers["ETag"] = f"W/{headers['etag']}"
+
+                if not more_body:
+                    data = compressor.compress(body)
+                    headers["Content-Length"] = str(len(data))
+
+                    await send(message_start)
+                    return await send({"type": "http.response.body", "body": data})
+
+                # The compressed length of a streamed body isn't known until it ends
+                del headers["Content-Length"]
+                await send(message_start)
+
+            if compressor is None:
+                return await send(message)
+
+            data = compressor.write(body) + (b"" if more_body else compressor.finish())
+
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, compressed_send)
+
+# Serves a static file's precompressed sibling (i.e. app.js.br or app.js.gz, built ahead of time) in place of the file
+# when the client accepts its coding, so static assets are never compressed per request
+class PrecompressedStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        request_headers = Headers(scope = scope)
+
+        # Unlike responses compressed per request, every coding may be served whether or not its library is installed
+        encodings = list(STATIC_EXTENSIONS)
+
+        while (encoding := negotiateEncoding(request_headers.get("accept-encoding"), encodings)) is not None:
+            full_path, stat_result = self.lookup_path(path + STATIC_EXTENSIONS[encoding])
+
+            if stat_result and scope["method"] in ("GET", "HEAD") and os.path.isfile(full_path):
+                return self.__precompressed__(path, full_path, stat_result, encoding, request_headers)
+
+            encodings.remove(encoding)
+
+        response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 304):
+            response.headers.add_vary_header("Accept-Encoding")
+
+        return response
+
+    def __precompressed__(self, path: str, full_path: str, stat_result: os.stat_result, encoding: str, request_headers: Headers) -> Response:
+        # Typed as the uncompressed file, the ETag and Last-Modified are those of the precompressed file
+        response = FileResponse(
+                full_path,
+                stat_result = stat_result,
+                media_type = mimetypes.guess_type(path)[0] or "text/plain",
+                headers = {"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        return response
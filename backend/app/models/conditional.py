@@ -0,0 +1,94 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated
+
+from .database import Statement
+
+# Maintained by triggers (see the initialiser), each table's version is bumped by every statement which writes to it
+TABLE_VERSION = "table_version"
+
+def versionStatement(tables: Annotated[list, "Trusted SQL names of the tables"]) -> Statement:
+    return Statement("""
+            SELECT
+                name, version, last_modified
+            FROM
+                {0}
+            WHERE
+                name = ANY(%s)
+            ORDER BY
+                name
+        ;""".format(TABLE_VERSION), (list(tables),))
+
+def representationTag(
+        version: Annotated[str, "Version of the row the representation is read from"],
+        fields: Annotated[list | None, "Fields requested by the client, None for every field"] = None,
+    ) -> str:
+    # The row version alone identifies the full representation, and is what If-Match takes. Each projection of the row is a
+    # different representation, so is told apart by a suffix (which If-Match ignores, see modules/utils.py)
+    if fields is None:
+        return version
+
+    return f"{version}-{hashlib.sha1(','.join(sorted(set(fields))).encode('utf-8')).hexdigest()[:8]}"
+
+def _tags(header: str) -> list:
+    return [tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")]
+
+# The ETag and Last-Modified of a representation, found without reading (or serialising) the representation itself
+class Validator:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            etag: Annotated[str, "Entity tag, without quotes"],
+            last_modified: Annotated[datetime.datetime | None, "When the representation last changed, if known"] = None,
+        ):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    @classmethod
+    def fromVersions(
+            cls,
+            identity: Annotated[str, "What the representation depends on besides the tables, i.e. the request path and query"],
+            versions: Annotated[list, "(name, version, last_modified) of every table the representation is read from"],
+        ) -> "Validator":
+        digest = hashlib.sha1(identity.encode("utf-8"))
+
+        for name, version, _ in versions:
+            digest.update(f"\0{name}:{version}".encode("utf-8"))
+
+        return cls(digest.hexdigest(), max((last_modified for _, _, last_modified in versions), default = None))
+
+    def headers(self) -> dict:
+        headers = {"ETag": f"\"{self.etag}\""}
+
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(datetime.timezone.utc), usegmt = True)
+
+        return headers
+
+    def matches(
+            self,
+            if_none_match: Annotated[str | None, "If-None-Match request header"] = None,
+            if_modified_since: Annotated[str | None, "If-Modified-Since request header"] = None,
+        ) -> bool:
+        # If-Modified-Since is ignored whenever If-None-Match is provided
+        if if_none_match:
+            return "*" in _tags(if_none_match) or self.etag in _tags(if_none_match)
+
+        if not if_modified_since or not self.last_modified:
+            return False
+
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+        if not since.tzinfo:
+            return False
+
+        # HTTP dates only have second precision
+        return self.last_modified.replace(microsecond = 0) <= since
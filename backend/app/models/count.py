@@ -0,0 +1,91 @@
+import time
+from typing import Annotated
+
+from .database import Operation, Statement
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+# Provides the total row counts reported as `meta.max` by the listing endpoints, so the listing query itself never has to
+# materialise the whole table to count it. Counts are operations, so they run on the same connection as the listing.
+class CountProvider:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            ttl: Annotated[float, "Seconds an exact count is cached for"] = 30.0,
+            max_entries: Annotated[int, "Maximum number of counts to cache"] = 256,
+        ):
+        self.__ttl__ = ttl
+        self.__max_entries__ = max_entries
+        self.__cache__ = {}
+        self.__hits__ = 0
+        self.__misses__ = 0
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __exact__(self, table: str, where: str, params: tuple) -> Operation[int]:
+        key = (table, where, params)
+        cached = self.__cache__.get(key)
+
+        if cached and cached[1] > time.monotonic():
+            self.__hits__ += 1
+            return cached[0]
+
+        self.__misses__ += 1
+
+        data = yield Statement("""
+                SELECT
+                    count(*)
+                FROM
+                    {0}
+                {1}
+            ;""".format(table, f"WHERE {where}" if where else ""), params, fetch = "one")
+
+        # Discard the oldest entry once full, dicts retain insertion order
+        self.__cache__.pop(key, None)
+
+        if len(self.__cache__) >= self.__max_entries__:
+            self.__cache__.pop(next(iter(self.__cache__)))
+
+        self.__cache__[key] = (data[0], time.monotonic() + self.__ttl__)
+
+        return data[0]
+
+    def count(
+            self,
+            table: Annotated[str, "Trusted SQL name of the table to count"],
+            mode: Annotated[str, "How to count ('exact', 'estimated' or 'none')"] = "exact",
+            where: Annotated[str, "Trusted SQL condition the count is limited to"] = "",
+            params: Annotated[tuple, "Parameters bound to the condition"] = (),
+        ) -> Operation[int | None]:
+        if mode == "none":
+            return None
+
+        # Planner statistics are only available for the whole table
+        if mode == "estimated" and not where:
+            data = yield Statement("""
+                    SELECT
+                        reltuples::bigint
+                    FROM
+                        pg_class
+                    WHERE
+                        oid = %s::regclass
+                ;""", (table,), fetch = "one")
+
+            # Tables which have never been analysed report no tuples, fall back to an exact count
+            if data and data[0] > 0:
+                return int(data[0])
+
+        return (yield from self.__exact__(table, where, tuple(params)))
+
+    def invalidate(self, table: Annotated[str, "Table whose cached counts should be discarded"]) -> None:
+        for key in [key for key in self.__cache__ if key[0] == table]:
+            self.__cache__.pop(key, None)
+
+    def getStats(self) -> dict:
+        return {
+                "entries": len(self.__cache__),
+                "hits": self.__hits__,
+                "misses": self.__misses__,
+            }
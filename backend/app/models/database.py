@@ -1,13 +1,68 @@
 import psycopg
-from typing import Annotated
+from contextlib import asynccontextmanager, contextmanager
+from psycopg.pq import TransactionStatus
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+from typing import Annotated, Any, AsyncIterator, Generator, Iterator, TypeVar
+
+from .errors import ServiceUnavailable
+
+T = TypeVar("T")
+
+# A single SQL statement (and its parameters) to be executed on behalf of an operation
+class Statement:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            query: Annotated[str, "SQL to execute"],
+            params: Annotated[tuple | dict | None, "Parameters bound to the SQL"] = None,
+            fetch: Annotated[str | None, "Rows to return to the operation ('one', 'all' or None for the row count)"] = "all",
+            row_factory: Annotated[Any, "Row factory (see psycopg.rows) to build each fetched row with, None for tuples"] = None,
+        ):
+        self.query = query
+        self.params = params
+        self.fetch = fetch
+        self.row_factory = row_factory
+
+# Rows to be loaded with COPY ... FROM STDIN on behalf of an operation
+class Copy:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            query: Annotated[str, "COPY ... FROM STDIN statement to execute"],
+            rows: Annotated[list, "Rows (tuples of column values) to write"],
+        ):
+        self.query = query
+        self.rows = rows
+
+# Instructs the adapter to commit the operation's transaction so far
+class Commit:
+    pass
+
+# Operations are generators which yield statements and receive their results, returning the final value.
+# This keeps the SQL and result handling independent of whether a sync or async adapter executes them.
+Operation = Generator[Statement | Copy | Commit, Any, T]
 
 class DatabaseAdapter:
     # On initialisation of class instance
-    def __init__(self, database_host, database_name, database_username, database_password):
+    def __init__(
+            self,
+            database_host,
+            database_name,
+            database_username,
+            database_password,
+            pool_min_size: Annotated[int, "Connections the pool keeps open at all times"] = 1,
+            pool_max_size: Annotated[int, "Maximum connections the pool may open"] = 10,
+            pool_timeout: Annotated[float, "Seconds to wait for a connection to become available"] = 5.0,
+            pool_max_idle: Annotated[float, "Seconds an unused connection may idle before being closed"] = 300.0,
+        ):
         self.database_host = database_host
         self.database_name = database_name
         self.database_username = database_username
         self.database_password = database_password
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_timeout = pool_timeout
+        self.pool_max_idle = pool_max_idle
 
     # On destruction of class instance
     def __del__(self):
@@ -16,20 +71,41 @@ class DatabaseAdapter:
             # Close the open connection
             self._connection.close()
 
+        # If the class instance has an open pool stored
+        if hasattr(self, "_pool") and self._pool and self._pool.closed is not True:
+            # Close the pool and every connection held by it
+            self._pool.close()
+
+    def _conninfo(self, database_name: Annotated[str, "Database name to use in lieu of instantiated default"] = None) -> str:
+        return psycopg.conninfo.make_conninfo(
+                dbname = (database_name or self.database_name),
+                user = self.database_username,
+                host = self.database_host,
+                password = self.database_password,
+            )
+
     def _connect(self, database_name: Annotated[str, "Database name to use in lieu of instantiated default"] = None) -> psycopg.Connection:
         database_host = self.database_host
         database_name = (database_name or self.database_name)
         database_username = self.database_username
-        database_password = self.database_password
                                                       
         print(f"Connecting to: '{database_username}@{database_host}/{database_name}'...")
-        return psycopg.connect(f"""
-                dbname='{database_name}'
-                user='{database_username}'
-                host='{database_host}'
-                password='{database_password}'
-            """)
-    
+        return psycopg.connect(self._conninfo(database_name = database_name))
+
+    def _create_pool(self) -> ConnectionPool:
+        print(f"Opening pool ({self.pool_min_size}-{self.pool_max_size}) to: '{self.database_username}@{self.database_host}/{self.database_name}'...")
+        return ConnectionPool(
+                self._conninfo(),
+                min_size = self.pool_min_size,
+                max_size = self.pool_max_size,
+                timeout = self.pool_timeout,
+                max_idle = self.pool_max_idle,
+                # Ensure a borrowed connection is still alive, broken connections are replaced transparently
+                check = ConnectionPool.check_connection,
+                name = f"{self.database_username}@{self.database_name}",
+                open = True,
+            )
+
     def _get_cursor(self, connection: Annotated[psycopg.Connection, "Connection to use in lieu of instantiated default"] = None) -> psycopg.Cursor:
         return (connection or self.getConnection()).cursor()
 
@@ -51,6 +127,104 @@ class DatabaseAdapter:
         
         return self._cursor
     
+    def getPool(self) -> ConnectionPool:
+        if not hasattr(self, "_pool") or not self._pool or self._pool.closed is True:
+            self._pool = self._create_pool()
+
+        return self._pool
+
+    @contextmanager
+    def borrowConnection(self, timeout: Annotated[float | None, "Seconds to wait in lieu of instantiated default"] = None) -> Iterator[psycopg.Connection]:
+        pool = self.getPool()
+
+        try:
+            connection = pool.getconn(timeout = timeout or self.pool_timeout)
+        except PoolTimeout:
+            raise ServiceUnavailable("Timed out waiting for a database connection!")
+
+        try:
+            yield connection
+        finally:
+            # Anything not explicitly committed by the borrower is discarded before the connection is reused
+            if connection.info.transaction_status != TransactionStatus.IDLE and connection.closed is not True:
+                connection.rollback()
+
+            pool.putconn(connection)
+    
+    def _execute_statement(self, connection: psycopg.Connection, statement: Statement | Copy | Commit) -> Any:
+        if isinstance(statement, Commit):
+            return connection.commit()
+
+        # Rows are built by the cursor as they are fetched, rather than fetched as tuples and then converted
+        with connection.cursor(row_factory = statement.row_factory if isinstance(statement, Statement) else None) as cursor:
+            if isinstance(statement, Copy):
+                with cursor.copy(statement.query) as copy:
+                    for row in statement.rows:
+                        copy.write_row(row)
+
+                return cursor.rowcount
+
+            cursor.execute(statement.query, statement.params)
+
+            if statement.fetch == "one":
+                return cursor.fetchone()
+
+            if statement.fetch == "all":
+                return cursor.fetchall()
+
+            return cursor.rowcount
+
+    def runOperation(self, operation: Operation[T]) -> T:
+        # Operations which need no statements (i.e. validation failures) never borrow a connection
+        try:
+            statement = next(operation)
+        except StopIteration as stop:
+            return stop.value
+
+        with self.borrowConnection() as connection:
+            while True:
+                try:
+                    result = self._execute_statement(connection, statement)
+                except psycopg.Error as exception:
+                    # The failed statement aborted the transaction, the operation may handle the error or let it propagate
+                    connection.rollback()
+
+                    try:
+                        statement = operation.throw(exception)
+                    except StopIteration as stop:
+                        return stop.value
+
+                    continue
+
+                try:
+                    statement = operation.send(result)
+                except StopIteration as stop:
+                    return stop.value
+    
+    def streamStatement(
+            self,
+            statement: Statement,
+            chunk_size: Annotated[int, "Rows fetched from the server per chunk"] = 1000,
+        ) -> Iterator[list]:
+        # The connection is held (and the server-side cursor open) until the stream is exhausted or closed
+        with self.borrowConnection() as connection:
+            with connection.cursor(name = "stream") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(statement.query, statement.params)
+
+                while rows := cursor.fetchmany(chunk_size):
+                    yield rows
+
+    def getPoolStats(self) -> dict:
+        if not hasattr(self, "_pool") or not self._pool:
+            return {}
+
+        return self._pool.get_stats()
+    
+    def closePool(self) -> None:
+        if hasattr(self, "_pool") and self._pool and self._pool.closed is not True:
+            self._pool.close()
+    
     def close(self) -> None:
         return self.getCursor().close()
     
@@ -65,3 +239,135 @@ class DatabaseAdapter:
     
     def execute(self, *args, cursor: Annotated[psycopg.Cursor, "Cursor to use in lieu of instantiated default"] = None, **kwargs) -> psycopg.Cursor:
         return (cursor or self.getCursor()).execute(*args, **kwargs)
+
+class AsyncDatabaseAdapter(DatabaseAdapter):
+    # Pass initialisation of class instance to parent class
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    # Pass destruction of class instance to parent class
+    def __del__(self):
+        # The async pool can only be closed from within the event loop, see closePool()
+        super().__del__()
+
+    def _create_async_pool(self) -> AsyncConnectionPool:
+        print(f"Opening async pool ({self.pool_min_size}-{self.pool_max_size}) to: '{self.database_username}@{self.database_host}/{self.database_name}'...")
+        return AsyncConnectionPool(
+                self._conninfo(),
+                min_size = self.pool_min_size,
+                max_size = self.pool_max_size,
+                timeout = self.pool_timeout,
+                max_idle = self.pool_max_idle,
+                # Ensure a borrowed connection is still alive, broken connections are replaced transparently
+                check = AsyncConnectionPool.check_connection,
+                name = f"{self.database_username}@{self.database_name}",
+                # The pool must be opened from within a running event loop
+                open = False,
+            )
+
+    async def getPool(self) -> AsyncConnectionPool:
+        if not hasattr(self, "_async_pool") or not self._async_pool or self._async_pool.closed is True:
+            self._async_pool = self._create_async_pool()
+
+        # Opening is idempotent, concurrent callers share the same pool
+        await self._async_pool.open()
+
+        return self._async_pool
+
+    async def openPool(self) -> None:
+        await self.getPool()
+
+    async def connect(self) -> psycopg.AsyncConnection:
+        # A dedicated autocommit connection outside of the pool, for sessions which outlive a request (i.e. LISTEN)
+        return await psycopg.AsyncConnection.connect(self._conninfo(), autocommit = True)
+
+    @asynccontextmanager
+    async def borrowConnection(self, timeout: Annotated[float | None, "Seconds to wait in lieu of instantiated default"] = None) -> AsyncIterator[psycopg.AsyncConnection]:
+        pool = await self.getPool()
+
+        try:
+            connection = await pool.getconn(timeout = timeout or self.pool_timeout)
+        except PoolTimeout:
+            raise ServiceUnavailable("Timed out waiting for a database connection!")
+
+        try:
+            yield connection
+        finally:
+            # Anything not explicitly committed by the borrower is discarded before the connection is reused
+            if connection.info.transaction_status != TransactionStatus.IDLE and connection.closed is not True:
+                await connection.rollback()
+
+            await pool.putconn(connection)
+
+    async def _execute_statement(self, connection: psycopg.AsyncConnection, statement: Statement | Copy | Commit) -> Any:
+        if isinstance(statement, Commit):
+            return await connection.commit()
+
+        async with connection.cursor(row_factory = statement.row_factory if isinstance(statement, Statement) else None) as cursor:
+            if isinstance(statement, Copy):
+                async with cursor.copy(statement.query) as copy:
+                    for row in statement.rows:
+                        await copy.write_row(row)
+
+                return cursor.rowcount
+
+            await cursor.execute(statement.query, statement.params)
+
+            if statement.fetch == "one":
+                return await cursor.fetchone()
+
+            if statement.fetch == "all":
+                return await cursor.fetchall()
+
+            return cursor.rowcount
+
+    async def runOperation(self, operation: Operation[T]) -> T:
+        # Operations which need no statements (i.e. validation failures) never borrow a connection
+        try:
+            statement = next(operation)
+        except StopIteration as stop:
+            return stop.value
+
+        async with self.borrowConnection() as connection:
+            while True:
+                try:
+                    result = await self._execute_statement(connection, statement)
+                except psycopg.Error as exception:
+                    # The failed statement aborted the transaction, the operation may handle the error or let it propagate
+                    await connection.rollback()
+
+                    try:
+                        statement = operation.throw(exception)
+                    except StopIteration as stop:
+                        return stop.value
+
+                    continue
+
+                try:
+                    statement = operation.send(result)
+                except StopIteration as stop:
+                    return stop.value
+
+    async def streamStatement(
+            self,
+            statement: Statement,
+            chunk_size: Annotated[int, "Rows fetched from the server per chunk"] = 1000,
+        ) -> AsyncIterator[list]:
+        # The connection is held (and the server-side cursor open) until the stream is exhausted or closed
+        async with self.borrowConnection() as connection:
+            async with connection.cursor(name = "stream") as cursor:
+                cursor.itersize = chunk_size
+                await cursor.execute(statement.query, statement.params)
+
+                while rows := await cursor.fetchmany(chunk_size):
+                    yield rows
+
+    def getPoolStats(self) -> dict:
+        if not hasattr(self, "_async_pool") or not self._async_pool:
+            return {}
+
+        return self._async_pool.get_stats()
+
+    async def closePool(self) -> None:
+        if hasattr(self, "_async_pool") and self._async_pool and self._async_pool.closed is not True:
+            await self._async_pool.close()
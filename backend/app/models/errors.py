@@ -22,10 +22,20 @@ class MethodNotAllowed(Exception):
 class Conflict(Exception):
     pass
 
+# Error 412 (precondition failed, i.e. the resource has been modified since the version provided by If-Match)
+class PreconditionFailed(Exception):
+    pass
+
 # Error 423 (locked resource, i.e. trying to delete an item without confirming)
 class Locked(Exception):
     pass
 
+# Error 429 (too many requests, i.e. too many login attempts, the client may retry after the seconds given)
+class TooManyRequests(Exception):
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 # Error 503 (generic unavailable server error)
 class ServiceUnavailable(Exception):
     pass
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from typing import Annotated, Any
+
+# Formats tables may be exported in, and the media type each is streamed as
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _encode_value(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+
+    return str(value)
+
+# Encodes chunks of rows fetched from a server-side cursor, so only one chunk is ever held in memory
+class ExportEncoder:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            format: Annotated[str, "Format to encode rows in ('ndjson' or 'csv')"],
+            columns: Annotated[list, "Names of the columns, in the order they appear in each row"],
+        ):
+        self.format = format if format in EXPORT_FORMATS else "ndjson"
+        self.columns = columns
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def mediaType(self) -> str:
+        return EXPORT_FORMATS[self.format]
+
+    def header(self) -> bytes:
+        if self.format == "csv":
+            return self.encode([self.columns])
+
+        return b""
+
+    def encode(self, rows: Annotated[list, "Rows (tuples of column values) to encode"]) -> bytes:
+        if self.format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator = "\n").writerows(rows)
+
+            return buffer.getvalue().encode("utf-8")
+
+        return "".join(
+                json.dumps(dict(zip(self.columns, row)), default = _encode_value, separators = (",", ":")) + "\n"
+                for row in rows
+            ).encode("utf-8")
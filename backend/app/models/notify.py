@@ -0,0 +1,164 @@
+import asyncio
+import json
+from typing import Annotated, Any
+
+import psycopg
+
+from .cache import EntityCache
+from .count import CountProvider
+from .database import AsyncDatabaseAdapter, Statement
+
+# Channel every backend LISTENs on, writes NOTIFY it with the table (and primary keys) changed
+CHANGE_CHANNEL = "entity_change"
+
+# Postgres rejects payloads of 8000 bytes or more, larger changes are sent as the whole table having changed
+MAX_PAYLOAD = 7900
+
+def changeStatement(
+        table: Annotated[str, "Table which was written"],
+        keys: Annotated[list | None, "Primary keys of the rows written, None if any row may have been"] = None,
+    ) -> Statement:
+    payload = json.dumps({"t": table, "k": keys}, separators = (",", ":"), default = str)
+
+    if len(payload) > MAX_PAYLOAD:
+        payload = json.dumps({"t": table, "k": None}, separators = (",", ":"))
+
+    # Notifications are only delivered once (and if) the transaction commits
+    return Statement("SELECT pg_notify(%s, %s);", (CHANGE_CHANNEL, payload), fetch = None)
+
+# Keeps the caches of every backend replica consistent with writes made by any of them, by evicting what each NOTIFY
+# describes. While not listening writes may be missed, so the cache is emptied and models are only cached briefly.
+class ChangeListener:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            database_adapter: Annotated[AsyncDatabaseAdapter, "Adapter to open the listening connection with"],
+            entity_cache: Annotated[EntityCache, "Cache to evict changed models from"],
+            count_provider: Annotated[CountProvider | None, "Count provider to evict counts of changed tables from"] = None,
+            ttl: Annotated[float, "Seconds models are cached for while listening"] = 30.0,
+            fallback_ttl: Annotated[float, "Seconds models are cached for while not listening"] = 2.0,
+            retry_interval: Annotated[float, "Seconds to wait before reconnecting"] = 1.0,
+        ):
+        self.database_adapter = database_adapter
+        self.entity_cache = entity_cache
+        self.count_provider = count_provider
+        self.__ttl__ = ttl
+        self.__fallback_ttl__ = fallback_ttl
+        self.__retry_interval__ = retry_interval
+        self.__task__ = None
+        self.__listening__ = False
+        self.__received__ = 0
+        self.__errors__ = 0
+        self.__reconnects__ = 0
+        self.__subscribers__ = []
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __publish__(self, method: str, *args) -> None:
+        for subscriber in self.__subscribers__:
+            try:
+                getattr(subscriber, method)(*args)
+            except Exception as exception:
+                print(f"Change listener subscriber failed: {exception}")
+
+    def __degrade__(self) -> None:
+        self.__listening__ = False
+        self.entity_cache.setTTL(self.__fallback_ttl__)
+        self.entity_cache.clear()
+        self.__publish__("listening", False)
+
+    def __apply__(self, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            table = str(change["t"])
+            keys = change.get("k")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return
+
+        # Well formed JSON of any other shape is ignored, as is anything else not written by changeStatement()
+        if keys is not None and not isinstance(keys, list):
+            return
+
+        self.__received__ += 1
+
+        if keys is None:
+            self.entity_cache.invalidate(table)
+        else:
+            for key in keys:
+                self.entity_cache.invalidate(table, key)
+
+        if self.count_provider:
+            self.count_provider.invalidate(table)
+
+        self.__publish__("changed", table, keys)
+
+    async def __listen__(self) -> None:
+        while True:
+            connection = None
+
+            try:
+                connection = await self.database_adapter.connect()
+                await connection.execute(f"LISTEN {CHANGE_CHANNEL};")
+
+                # Anything written before LISTEN took effect was missed, so nothing cached before it can be trusted
+                self.entity_cache.clear()
+                self.entity_cache.setTTL(self.__ttl__)
+                self.__listening__ = True
+                self.__publish__("listening", True)
+
+                async for notify in connection.notifies():
+                    # A payload which can't be applied mustn't stop every later one from being
+                    try:
+                        self.__apply__(notify.payload)
+                    except Exception as exception:
+                        self.__errors__ += 1
+                        print(f"Change listener could not apply '{notify.payload}': {exception}")
+
+                        # Whatever the payload described may have been left cached
+                        self.entity_cache.clear()
+            except (psycopg.Error, OSError) as exception:
+                print(f"Change listener disconnected, retrying in {self.__retry_interval__}s: {exception}")
+            except Exception as exception:
+                # Anything unexpected reconnects too, rather than ending the task and with it invalidation across replicas
+                print(f"Change listener failed, retrying in {self.__retry_interval__}s: {exception}")
+            finally:
+                self.__degrade__()
+
+                if connection is not None and connection.closed is not True:
+                    await connection.close()
+
+            self.__reconnects__ += 1
+            await asyncio.sleep(self.__retry_interval__)
+
+    def subscribe(self, subscriber: Annotated[Any, "Object with changed(table, keys) and listening(bool) methods, i.e. a Snapshot"]) -> None:
+        self.__subscribers__.append(subscriber)
+
+    def start(self) -> None:
+        if self.__task__ and not self.__task__.done():
+            return
+
+        self.__degrade__()
+        self.__task__ = asyncio.get_running_loop().create_task(self.__listen__())
+
+    async def stop(self) -> None:
+        if not self.__task__:
+            return
+
+        self.__task__.cancel()
+
+        try:
+            await self.__task__
+        except asyncio.CancelledError:
+            pass
+
+        self.__task__ = None
+
+    def getStats(self) -> dict:
+        return {
+                "listening": self.__listening__,
+                "received": self.__received__,
+                "errors": self.__errors__,
+                "reconnects": self.__reconnects__,
+            }
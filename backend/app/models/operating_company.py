@@ -1,5 +1,10 @@
 from pydantic import BaseModel
 
+from .bulk import BulkImport, ImportField, Upsert
+from .patch import Patch
+from .query import Column, QueryDefinition
+from .serialise import LinkTemplate, ModelSerialiser
+
 class BaseOperatingCompany(BaseModel):
     id: int = None
     noc: str = None
@@ -12,16 +17,16 @@ class BaseNewOperatingCompany(BaseModel):
     name: str | None = None
 
 class OperatingCompany:
+    # Held in slots without a __del__, the snapshot and listings build one per row
+    __slots__ = ("id", "noc", "short_code", "name", "version")
+
     # On initialisation of class instance
-    def __init__(self, id: int | None, noc: str, short_code: str | None = None, name: str | None = None):
+    def __init__(self, id: int | None = None, noc: str | None = None, short_code: str | None = None, name: str | None = None, version: str | None = None):
         self.id = id
         self.noc = noc
         self.short_code = short_code
         self.name = name
-
-    # On destruction of class instance
-    def __del__(self):
-        pass
+        self.version = version
 
     def serialise(self):
         return {
@@ -41,3 +46,55 @@ class OperatingCompany:
             })
 
         return links
+
+# Compiled equivalent of serialise() and hypermediaLinks(), used to build responses, see ./serialise.py
+operating_company_serialiser = ModelSerialiser(
+    OperatingCompany,
+    fields = ["id", "noc", "short_code", "name"],
+    links = [
+        LinkTemplate("self", "/api/v1/operating-company/", "id"),
+    ]
+)
+
+# Columns exposed to the listing engine, see ./query.py
+operating_company_query = QueryDefinition(
+    table = "operating_company",
+    key = "id",
+    model = OperatingCompany,
+    path = "/api/v1/operating-company/",
+    columns = [
+        Column("id", int),
+        Column("noc", str, filterable = True),
+        Column("short_code", str, filterable = True),
+        Column("name", str, nullable = True),
+    ]
+)
+
+# Fields accepted by the bulk import, see ./bulk.py
+operating_company_import = BulkImport(
+    table = "operating_company",
+    fields = [
+        ImportField("noc", str, max_length = 4),
+        ImportField("short_code", str, max_length = 3),
+        ImportField("name", str, required = False, max_length = 255),
+    ],
+    unique = ["noc", "short_code"]
+)
+
+# Columns written by upserts (matched on noc), see ./bulk.py
+operating_company_upsert = Upsert(
+    table = "operating_company",
+    key = "noc",
+    columns = [("noc", "varchar"), ("short_code", "varchar"), ("name", "varchar")],
+    returning = ["id", "noc", "short_code", "name"],
+    model = OperatingCompany
+)
+
+# Columns which may be updated by PATCH, see ./patch.py
+operating_company_patch = Patch(
+    table = "operating_company",
+    key = "id",
+    columns = ["noc", "short_code", "name"],
+    returning = ["id", "noc", "short_code", "name"],
+    model = OperatingCompany
+)
@@ -0,0 +1,153 @@
+import base64
+import datetime
+import json
+from typing import Annotated, Any
+from urllib.parse import urlencode
+
+from .errors import BadRequest
+
+# Cursors are opaque to clients, they carry the ordering they were created with and the sort key(s) (plus primary key
+# tiebreaker) of the row to seek from, allowing `WHERE (column, key) > (value, key_value)` instead of OFFSET.
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+
+    if isinstance(value, datetime.date):
+        return {"d": value.isoformat()}
+
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.datetime.fromisoformat(value["dt"])
+
+    if isinstance(value, dict) and "d" in value:
+        return datetime.date.fromisoformat(value["d"])
+
+    return value
+
+def encodeCursor(
+        order: Annotated[list, "(field, direction) pairs the results are ordered by, ending with the primary key"],
+        values: Annotated[list, "Values of the ordered fields for the row to seek from"],
+        backward: Annotated[bool, "Whether to seek to the rows before, rather than after, the row"] = False,
+    ) -> str:
+    payload = {
+        "o": [[column, direction] for column, direction in order],
+        "v": [_encode_value(value) for value in values],
+        "b": backward,
+    }
+
+    return base64.urlsafe_b64encode(json.dumps(payload, separators = (",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decodeCursor(cursor: Annotated[str, "Cursor previously returned by the API"]) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + ("=" * (-len(cursor) % 4))))
+
+        order = [(str(column), "DESC" if direction == "DESC" else "ASC") for column, direction in payload["o"]]
+        values = [_decode_value(value) for value in payload["v"]]
+
+        if len(order) < 1 or len(order) != len(values):
+            raise ValueError("Cursor order and values do not match")
+
+        return {
+            "order": order,
+            "values": values,
+            "backward": bool(payload.get("b", False)),
+        }
+    except Exception:
+        raise BadRequest("Cursor provided is not valid!")
+
+def _after(column: str, direction: str, nullable: bool, value: Any) -> tuple[str | None, list]:
+    # Postgres sorts NULLs last when ascending and first when descending
+    if direction == "ASC":
+        if value is None:
+            return (None, [])
+
+        return ((f"({column} > %s OR {column} IS NULL)" if nullable else f"{column} > %s"), [value])
+
+    if value is None:
+        return (f"{column} IS NOT NULL", [])
+
+    return (f"{column} < %s", [value])
+
+def seekCondition(
+        order: Annotated[list, "Trusted (column, direction, nullable) the rows are read in, ending with the primary key"],
+        values: Annotated[list, "Values of the ordered columns for the row to seek from"],
+    ) -> tuple[str, tuple]:
+    # A uniform direction without NULLs can use a row comparison, which Postgres satisfies from a composite index
+    if len({direction for _, direction, _ in order}) == 1 and not any(nullable for _, _, nullable in order):
+        operator = ">" if order[0][1] == "ASC" else "<"
+
+        if len(order) == 1:
+            return (f"{order[0][0]} {operator} %s", (values[0],))
+
+        return (
+                f"(({', '.join(column for column, _, _ in order)}) {operator} ({', '.join(['%s'] * len(order))}))",
+                tuple(values)
+            )
+
+    # Otherwise expand to (a after x) OR (a = x AND b after y) OR ...
+    conditions = []
+    params = []
+
+    for index, (column, direction, nullable) in enumerate(order):
+        after, after_params = _after(column, direction, nullable, values[index])
+
+        # Nothing sorts after this value
+        if not after:
+            continue
+
+        equal = [f"{previous} IS NULL" if value is None else f"{previous} = %s" for (previous, _, _), value in zip(order[:index], values[:index])]
+
+        conditions.append(f"({' AND '.join([*equal, after])})")
+        params.extend([value for value in values[:index] if value is not None])
+        params.extend(after_params)
+
+    return (f"({' OR '.join(conditions)})" if conditions else "FALSE", tuple(params))
+
+def paginationLinks(
+        path: Annotated[str, "Path of the listing endpoint"],
+        params: Annotated[dict, "Query parameters to carry over to each link (i.e. limit and filters)"],
+        order: Annotated[list, "(field, direction) pairs the results are ordered by, ending with the primary key"],
+        first: Annotated[list | None, "Values of the ordered fields for the first row on the page"],
+        last: Annotated[list | None, "Values of the ordered fields for the last row on the page"],
+        has_next: bool,
+        has_prev: bool,
+        root: str = "",
+    ) -> list:
+    links = []
+
+    def href(cursor: str) -> str:
+        return f"{root}{path}?" + urlencode({**params, "cursor": cursor})
+
+    if has_next and last:
+        links.append({
+            "rel": "next",
+            "href": href(encodeCursor(order, last))
+        })
+
+    if has_prev and first:
+        links.append({
+            "rel": "prev",
+            "href": href(encodeCursor(order, first, backward = True))
+        })
+
+    return links
+
+def trimPage(
+        rows: Annotated[list, "Rows fetched with a limit of one more than requested"],
+        limit: int,
+        offset: int,
+        seeking: Annotated[bool, "Whether the rows were fetched using a cursor"],
+        backward: Annotated[bool, "Whether the rows were fetched in reverse to seek backwards"],
+    ) -> tuple[list, bool, bool]:
+    # The extra row only indicates whether another page exists in the direction read
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if backward:
+        rows.reverse()
+        return (rows, True, has_more)
+
+    return (rows, has_more, seeking or offset > 0)
@@ -0,0 +1,82 @@
+import asyncio
+import bcrypt
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Callable
+
+from .errors import ServiceUnavailable
+
+class PasswordAdapter:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            max_workers: Annotated[int, "Threads available for password hashing/verification"] = 2,
+            queue_limit: Annotated[int, "Operations allowed to wait for a free thread before rejecting"] = 16,
+        ):
+        self.__max_workers__ = max_workers
+        self.__queue_limit__ = queue_limit
+        self.__executor__ = ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "password")
+
+        # Only modified from the event loop thread, so no locking is required
+        self.__pending__ = 0
+        self.__completed__ = 0
+        self.__rejected__ = 0
+        self.__hash_ms_total__ = 0.0
+        self.__hash_ms_max__ = 0.0
+        self.__wait_ms_total__ = 0.0
+
+    # On destruction of class instance
+    def __del__(self):
+        if hasattr(self, "__executor__"):
+            self.__executor__.shutdown(wait = False)
+
+    def hash(self, password: Annotated[str, "String value to be BCrypted"]) -> str:
+        # Generate a salt for the password and return the hashed password
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+    def match(self, password: str, password_hash: str) -> bool:
+        return bcrypt.checkpw(password = password.encode("utf-8"), hashed_password = password_hash.encode("utf-8"))
+
+    async def __submit__(self, function: Callable, *args):
+        # Fail fast rather than letting a flood of logins queue up unbounded work
+        if self.__pending__ >= self.__max_workers__ + self.__queue_limit__:
+            self.__rejected__ += 1
+            raise ServiceUnavailable("Too many password operations in progress, please try again shortly!")
+
+        def timed():
+            start_time = time.perf_counter()
+            return function(*args), (time.perf_counter() - start_time) * 1000
+
+        self.__pending__ += 1
+        submitted_time = time.perf_counter()
+
+        try:
+            result, hash_ms = await asyncio.get_running_loop().run_in_executor(self.__executor__, timed)
+        finally:
+            self.__pending__ -= 1
+
+        self.__completed__ += 1
+        self.__hash_ms_total__ += hash_ms
+        self.__hash_ms_max__ = max(self.__hash_ms_max__, hash_ms)
+        self.__wait_ms_total__ += ((time.perf_counter() - submitted_time) * 1000) - hash_ms
+
+        return result
+
+    async def hashPassword(self, password: Annotated[str, "String value to be BCrypted"]) -> str:
+        return await self.__submit__(self.hash, password)
+
+    async def matchPassword(self, password: str, password_hash: str) -> bool:
+        return await self.__submit__(self.match, password, password_hash)
+
+    def getStats(self) -> dict:
+        return {
+                "workers": self.__max_workers__,
+                "queue_limit": self.__queue_limit__,
+                "running": min(self.__pending__, self.__max_workers__),
+                "queued": max(self.__pending__ - self.__max_workers__, 0),
+                "completed": self.__completed__,
+                "rejected": self.__rejected__,
+                "hash_ms_avg": (self.__hash_ms_total__ / self.__completed__) if self.__completed__ else 0,
+                "hash_ms_max": self.__hash_ms_max__,
+                "wait_ms_avg": (self.__wait_ms_total__ / self.__completed__) if self.__completed__ else 0,
+            }
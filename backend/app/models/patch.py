@@ -0,0 +1,62 @@
+from typing import Annotated, Any
+
+from .database import Statement
+from .query import ROW_VERSION
+
+# Describes a partial update of a single row, applied by one UPDATE ... RETURNING so nothing needs to be read first
+class Patch:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            table: Annotated[str, "Trusted SQL name of the table"],
+            key: Annotated[str, "Column identifying the row to update"],
+            columns: Annotated[list, "Columns which may be updated, those not provided (or None) are left as they are"],
+            returning: Annotated[list, "Columns returned, as taken by the model"],
+            model: Annotated[type, "Model class constructed with a keyword argument per returned column"],
+            stamps: Annotated[dict | None, "Timestamp columns set to now() when the column named (or, if None, anything) is updated"] = None,
+        ):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.returning = returning
+        self.model = model
+        self.stamps = stamps or {}
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def statement(
+            self,
+            key: Annotated[Any, "Value of the key of the row to update"],
+            values: Annotated[dict, "Column to value updates, unknown columns are ignored"],
+            version: Annotated[str | None, "Version the row must still be at (from If-Match), None for any"] = None,
+        ) -> Statement:
+        # The statement is the same whichever columns are provided, so Postgres can reuse its plan
+        assignments = [f"{column} = COALESCE(%s, {column})" for column in self.columns]
+        params = [values.get(column) for column in self.columns]
+
+        for column, source in self.stamps.items():
+            assignments.append(f"{column} = CASE WHEN %s THEN now() ELSE {column} END")
+            params.append(source is None or values.get(source) is not None)
+
+        return Statement("""
+                UPDATE
+                    {0}
+                SET
+                    {1}
+                WHERE
+                    {2} = %s{3}
+                RETURNING
+                    {4}, {5}
+            ;""".format(
+                    self.table,
+                    ", ".join(assignments),
+                    self.key,
+                    " AND xmin = %s::xid" if version else "",
+                    ", ".join(self.returning),
+                    ROW_VERSION
+                ), (*params, key, *([version] if version else [])), fetch = "one")
+
+    def response(self, row: Annotated[tuple, "Returned columns, followed by the row version"]) -> Any:
+        return self.model(**dict(zip([*self.returning, "version"], row)))
@@ -0,0 +1,466 @@
+import datetime
+import inspect
+import operator
+from functools import cmp_to_key
+from pydantic import BaseModel
+from typing import Annotated, Any, Callable, Sequence
+
+from .count import COUNT_MODES
+from .database import Statement
+from .errors import BadRequest
+from .pagination import decodeCursor, paginationLinks, seekCondition, trimPage
+
+RANGE_OPERATORS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# SQL comparison operators, as applied to rows held in memory (see ListQuery.evaluate)
+COMPARISONS = {"=": operator.eq, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+class BaseBatchGet(BaseModel):
+    keys: list[int | str]
+
+# Row version exposed as an ETag, Postgres changes a row's xmin whenever (and however) the row is written
+ROW_VERSION = "xmin::text"
+
+# Requested alongside the columns to include each result's hypermedia links
+LINKS_FIELD = "links"
+
+def parseFields(fields: Annotated[str | None, "Comma separated fields requested by the client"]) -> list | None:
+    # No fields requested means every field (and the links)
+    if fields is None or not str(fields).strip():
+        return None
+
+    return list(dict.fromkeys(field.strip() for field in str(fields).split(",") if field.strip()))
+
+def _compare(a: Any, b: Any) -> int:
+    # As Postgres orders ascending, NULLs sort after every value
+    if a is None or b is None:
+        return (a is None) - (b is None)
+
+    return (a > b) - (a < b)
+
+# A column of a model's table, and what clients may do with it via the listing endpoints
+class Column:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            name: Annotated[str, "Trusted SQL name of the column, also used as the field name"],
+            type: Annotated[type, "Python type client supplied values are parsed as"] = str,
+            sortable: Annotated[bool, "Whether results may be ordered by the column"] = True,
+            filterable: Annotated[bool, "Whether results may be filtered by equality on the column"] = False,
+            range: Annotated[bool, "Whether results may be filtered by a range (.gt/.gte/.lt/.lte) on the column"] = False,
+            projectable: Annotated[bool, "Whether the column may be returned to clients"] = True,
+            nullable: Annotated[bool, "Whether the column may contain NULLs"] = False,
+        ):
+        self.name = name
+        self.type = type
+        self.sortable = sortable
+        self.filterable = filterable
+        self.range = range
+        self.projectable = projectable
+        self.nullable = nullable
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def parse(self, value: str) -> Any:
+        try:
+            if self.type is bool:
+                if value.lower() in ("true", "1", "yes"):
+                    return True
+                if value.lower() in ("false", "0", "no"):
+                    return False
+                raise ValueError(value)
+
+            if self.type is datetime.datetime:
+                return datetime.datetime.fromisoformat(value)
+
+            return self.type(value)
+        except ValueError:
+            raise BadRequest(f"Value provided for '{self.name}' is not valid!")
+
+# A related model which may be fetched alongside results (?expand=), using a single batched query per page
+class Expansion:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            name: Annotated[str, "Name clients request the expansion by, also the key results are included under"],
+            column: Annotated[str, "Trusted SQL name of the column referencing the related model"],
+            definition: Annotated["QueryDefinition", "Definition of the related model, referenced by its key"],
+        ):
+        self.name = name
+        self.column = column
+        self.definition = definition
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def selectStatement(self, values: Annotated[list, "Distinct key values of the related rows to fetch"]) -> Statement:
+        # Fetches the related models themselves, see QueryDefinition.rowFactory()
+        columns = self.definition.selectColumns()
+
+        return Statement("""
+                SELECT
+                    {0}
+                FROM
+                    {1}
+                WHERE
+                    {2} = ANY(%s)
+                ORDER BY
+                    {2}
+            ;""".format(", ".join(columns), self.definition.table, self.definition.key), (values,), row_factory = self.definition.rowFactory(columns))
+
+# Describes a model's table to the listing engine, a new listing only needs one of these and a route
+class QueryDefinition:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            table: Annotated[str, "Trusted SQL name of the table"],
+            key: Annotated[str, "Primary key column, used as the ordering tiebreaker"],
+            model: Annotated[type, "Model class constructed with a keyword argument per column"],
+            path: Annotated[str, "Path of the listing endpoint, used for hypermedia links"],
+            columns: Annotated[list, "Columns of the table"],
+            expansions: Annotated[list, "Related models which may be included with results"] = (),
+        ):
+        self.table = table
+        self.key = key
+        self.model = model
+        self.path = path
+        self.columns = {column.name: column for column in columns}
+        self.expansions = {expansion.name: expansion for expansion in expansions}
+        self.__makers__ = {}
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def getColumn(self, name: str) -> Column | None:
+        return self.columns.get(name)
+
+    def rowMaker(self, columns: Annotated[list | tuple, "Names of the columns each row holds, in order"]) -> Callable[[Sequence], Any]:
+        # Builds a model from a row of values by passing them positionally, in the order the model's initialiser takes its
+        # arguments (anything not selected is None), rather than zipping each row into a dict of keyword arguments
+        columns = tuple(columns)
+
+        # Only a handful of column sets (projections) are ever requested per model
+        if columns in self.__makers__:
+            return self.__makers__[columns]
+
+        parameters = list(inspect.signature(self.model).parameters)
+
+        for column in columns:
+            if column not in parameters:
+                raise ValueError(f"{self.model.__name__} does not take a '{column}' argument!")
+
+        model = self.model
+        arguments = operator.itemgetter(*[columns.index(parameter) if parameter in columns else len(columns) for parameter in parameters])
+
+        def make(values: Sequence) -> Any:
+            return model(*arguments((*values, None)))
+
+        self.__makers__[columns] = make
+
+        return make
+
+    def rowFactory(self, columns: Annotated[list | tuple, "Names of the columns selected, in order"]) -> Callable[[Any], Callable[[Sequence], Any]]:
+        # A psycopg row factory (see Statement), so the cursor builds each model as its row is read
+        make = self.rowMaker(columns)
+
+        return lambda cursor: make
+
+    def getExpansions(self, expand: Annotated[list | None, "Names of the expansions requested by the client"]) -> list:
+        # Only expansions declared by the definition are applied, anything else is ignored
+        return [self.expansions[name] for name in (expand or []) if name in self.expansions]
+
+    def batchStatement(
+            self,
+            keys: Annotated[list, "Parsed key values of the rows to fetch"],
+            columns: Annotated[list, "Trusted SQL names of the columns to select"],
+        ) -> Statement:
+        return Statement("""
+                SELECT
+                    {0}
+                FROM
+                    {1}
+                WHERE
+                    {2} = ANY(%s)
+            ;""".format(", ".join(columns), self.table, self.key), (keys,), row_factory = self.rowFactory(columns))
+
+    def selectColumns(
+            self,
+            fields: Annotated[list | None, "Fields requested by the client, None for every projectable column"] = None,
+            required: Annotated[list | tuple, "Columns which must be selected regardless (i.e. those ordered by)"] = (),
+        ) -> list:
+        return [
+                name for name, column in self.columns.items()
+                if name in required or (column.projectable and (fields is None or name in fields))
+            ]
+
+# A single client request against a QueryDefinition, validated and turned into parameterised SQL
+class ListQuery:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            definition: QueryDefinition,
+            limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
+            offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
+            order_by: Annotated[str, "Comma separated fields for results to be ordered by, each optionally suffixed with ':ASC' or ':DESC'"] = "id",
+            order_by_direction: Annotated[str, "The sort order for fields without an explicit direction"] = "ASC",
+            cursor: Annotated[str | None, "Opaque cursor from a previous page, used in lieu of the offset"] = None,
+            count: Annotated[str, "How the total should be counted ('exact', 'estimated' or 'none')"] = "exact",
+            filters: Annotated[dict | None, "Field (or field.operator) to value filters"] = None,
+            fields: Annotated[list | None, "Fields to return, None for all of them"] = None,
+            expand: Annotated[list | None, "Related models to include with the results"] = None,
+        ):
+        self.definition = definition
+        self.limit = int(limit)
+
+        # Offset cannot be negative so reset to 0
+        self.offset = max(int(offset), 0)
+
+        # Ensure only allowed values make it into the non-prepared statement
+        if not order_by_direction == "ASC" and not order_by_direction == "DESC":
+            order_by_direction = "ASC"
+
+        self.order_by_direction = order_by_direction
+        self.count = count if count in COUNT_MODES else "exact"
+
+        # A cursor carries the ordering it was created with, and replaces the offset
+        seek = decodeCursor(cursor) if cursor else None
+
+        if seek:
+            self.order = self.__parse_order__([f"{column}:{direction}" for column, direction in seek["order"]], order_by_direction)
+            self.offset = 0
+
+            if self.order != seek["order"]:
+                raise BadRequest("Cursor provided is not valid!")
+
+            seek["values"] = self.__parse_seek__(seek["values"])
+        else:
+            self.order = self.__parse_order__(str(order_by).split(","), order_by_direction)
+
+        self.seek = seek
+        self.filters = self.__parse_filters__(filters or {})
+        self.fields = fields
+        self.expansions = definition.getExpansions(expand)
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __parse_seek__(self, values: Annotated[list, "Values decoded from a cursor, one per ordered column"]) -> list:
+        # Cursors are client supplied, so their values are parsed as the ordered columns' types like any other input
+        parsed = []
+
+        for (name, _), value in zip(self.order, values):
+            column = self.definition.getColumn(name)
+
+            if value is None and column.nullable:
+                parsed.append(None)
+                continue
+
+            if value is None or isinstance(value, (dict, list)):
+                raise BadRequest("Cursor provided is not valid!")
+
+            try:
+                parsed.append(column.parse(str(value)))
+            except BadRequest:
+                raise BadRequest("Cursor provided is not valid!")
+
+        return parsed
+
+    def __parse_order__(self, fields: list, default_direction: str) -> list:
+        order = []
+        key_direction = None
+
+        for field in fields:
+            name, _, direction = field.strip().partition(":")
+            direction = direction.upper() if direction.upper() in ("ASC", "DESC") else default_direction
+            column = self.definition.getColumn(name)
+
+            # Ensure ordering is limited only to allowed fields, anything else is ignored
+            if not column or not column.sortable or any(name == existing for existing, _ in order):
+                continue
+
+            # The primary key is unique, nothing after it can affect the ordering
+            if column.name == self.definition.key:
+                key_direction = direction
+                break
+
+            order.append((column.name, direction))
+
+        # Primary key as the tiebreaker (or the default ordering)
+        order.append((self.definition.key, key_direction or (order[-1][1] if order else default_direction)))
+
+        return order
+
+    def __parse_filters__(self, filters: dict) -> list:
+        parsed = []
+
+        for field, value in filters.items():
+            name, _, operator = field.partition(".")
+            column = self.definition.getColumn(name)
+
+            # Only filters declared by the definition are applied, anything else is ignored
+            if not column:
+                continue
+
+            if not operator and column.filterable:
+                parsed.append((field, column, "=", column.parse(value), value))
+            elif operator in RANGE_OPERATORS and column.range:
+                parsed.append((field, column, RANGE_OPERATORS[operator], column.parse(value), value))
+
+        return parsed
+
+    def filterCondition(self) -> tuple[str, tuple]:
+        conditions = [f"{column.name} {operator} %s" for _, column, operator, _, _ in self.filters]
+
+        return (" AND ".join(conditions), tuple(value for _, _, _, value, _ in self.filters))
+
+    def isBackward(self) -> bool:
+        return bool(self.seek and self.seek["backward"])
+
+    def readOrder(self) -> list:
+        # Seeking backwards reads in the opposite direction, the page is reversed afterwards
+        if self.isBackward():
+            return [(column, "DESC" if direction == "ASC" else "ASC") for column, direction in self.order]
+
+        return self.order
+
+    def selectColumns(self) -> list:
+        # The ordered columns are always selected as the page links are built from them, as are those expansions reference
+        return self.definition.selectColumns(self.fields, required = [
+                *[column for column, _ in self.order],
+                *[expansion.column for expansion in self.expansions]
+            ])
+
+    def selectStatement(self) -> Statement:
+        conditions, params = self.filterCondition()
+        conditions = [conditions] if conditions else []
+        params = list(params)
+        read_order = self.readOrder()
+
+        if self.seek:
+            seek, seek_params = seekCondition(
+                    [(column, direction, self.definition.getColumn(column).nullable) for column, direction in read_order],
+                    self.seek["values"]
+                )
+            conditions.append(seek)
+            params.extend(seek_params)
+
+        columns = self.selectColumns()
+
+        return Statement("""
+                SELECT
+                    {0}
+                FROM
+                    {1}
+                {2}
+                ORDER BY
+                    {3}
+                LIMIT
+                    %s
+                OFFSET
+                    %s
+            ;""".format(
+                    ", ".join(columns),
+                    self.definition.table,
+                    f"WHERE {' AND '.join(conditions)}" if conditions else "",
+                    ", ".join(f"{column} {direction}" for column, direction in read_order)
+                # One row beyond the limit is requested to detect whether another page exists
+                ), (*params, self.limit + 1, self.offset,), row_factory = self.definition.rowFactory(columns))
+
+    def evaluate(self, rows: Annotated[list, "Every row of the table, as column to value dicts"]) -> tuple[list, int]:
+        # Applies the same filters, seek, ordering, offset and limit as selectStatement to rows already held in memory,
+        # returning the selected models and how many matched the filters (the total). Strings compare by code point
+        rows = [
+                row for row in rows
+                if all(row.get(column.name) is not None and COMPARISONS[comparison](row[column.name], value) for _, column, comparison, value, _ in self.filters)
+            ]
+        read_order = self.readOrder()
+
+        def compare(a: tuple, b: tuple) -> int:
+            for position, (_, direction) in enumerate(read_order):
+                result = _compare(a[position], b[position])
+
+                if result:
+                    return result if direction == "ASC" else -result
+
+            return 0
+
+        ordered = [(tuple(row.get(column) for column, _ in read_order), row) for row in rows]
+
+        if self.seek:
+            ordered = [(values, row) for values, row in ordered if compare(values, tuple(self.seek["values"])) > 0]
+
+        ordered.sort(key = cmp_to_key(lambda a, b: compare(a[0], b[0])))
+        columns = self.selectColumns()
+        make = self.definition.rowMaker(columns)
+
+        # One row beyond the limit, as with selectStatement
+        return ([make([row.get(column) for column in columns]) for _, row in ordered[self.offset:self.offset + self.limit + 1]], len(rows))
+
+    def exportColumns(self) -> list:
+        # Exports only return the requested fields, ordering doesn't require the columns to be selected
+        return self.definition.selectColumns(self.fields)
+
+    def exportStatement(self) -> Statement:
+        conditions, params = self.filterCondition()
+
+        # Every matching row is read (through a server-side cursor), so no limit, offset or seek applies. The statement is
+        # wrapped in DECLARE ... CURSOR FOR, so must not be terminated
+        return Statement("""
+                SELECT
+                    {0}
+                FROM
+                    {1}
+                {2}
+                ORDER BY
+                    {3}
+            """.format(
+                    ", ".join(self.exportColumns()),
+                    self.definition.table,
+                    f"WHERE {conditions}" if conditions else "",
+                    ", ".join(f"{column} {direction}" for column, direction in self.order)
+                ), params)
+
+    def linkParams(self) -> dict:
+        return {
+                "limit": self.limit,
+                **({"count": self.count} if self.count != "exact" else {}),
+                **({"fields": ",".join(self.fields)} if self.fields is not None else {}),
+                **({"expand": ",".join(expansion.name for expansion in self.expansions)} if self.expansions else {}),
+                **{field: raw for field, _, _, _, raw in self.filters},
+            }
+
+    def orderBy(self) -> str:
+        # The ordering actually applied, excluding the tiebreaker unless it was the only field
+        return ",".join(
+                column if direction == self.order_by_direction else f"{column}:{direction}"
+                for column, direction in (self.order[:-1] or self.order)
+            )
+
+    def response(self, rows: Annotated[list, "Models read by selectStatement (or evaluate)"], full_count: int | None) -> dict:
+        final, has_next, has_prev = trimPage(rows, self.limit, self.offset, seeking = bool(self.seek), backward = self.isBackward())
+
+        return {
+                "result": final,
+                "meta": {
+                    "max": full_count,
+                    "limit": self.limit,
+                    "offset": self.offset,
+                    "orderBy": self.orderBy(),
+                    "orderByDirection": self.order_by_direction,
+                    "count": self.count
+                },
+                "links": paginationLinks(
+                    self.definition.path,
+                    self.linkParams(),
+                    self.order,
+                    first = [getattr(final[0], column) for column, _ in self.order] if final else None,
+                    last = [getattr(final[-1], column) for column, _ in self.order] if final else None,
+                    has_next = has_next,
+                    has_prev = has_prev
+                ) if self.limit > 0 else []
+            }
@@ -0,0 +1,91 @@
+from operator import attrgetter
+from typing import Annotated, Any, Callable
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from .query import LINKS_FIELD
+
+# Model class to the serialiser compiled for it, see ModelSerialiser
+SERIALISERS = {}
+
+# A hypermedia link to the resource identified by one of a model's attributes, only present if the attribute is set
+class LinkTemplate:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            rel: Annotated[str, "Relation of the linked resource, i.e. 'self'"],
+            path: Annotated[str, "Path the attribute's value is appended to, i.e. '/api/v1/vehicle/'"],
+            attribute: Annotated[str, "Attribute of the model identifying the linked resource"],
+        ):
+        self.rel = rel
+        self.path = path
+        self.attribute = attribute
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+# Serialises models exactly as their serialise() and hypermediaLinks() would (field order included), but through functions
+# compiled once per requested set of fields, so a page of results reads each row's attributes without building and
+# merging intermediate dicts
+class ModelSerialiser:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            model: Annotated[type, "Model class serialised"],
+            fields: Annotated[list | tuple, "Fields of serialise(), in order"],
+            links: Annotated[list | tuple, "LinkTemplates of hypermediaLinks(), in order"] = (),
+        ):
+        self.model = model
+        self.fields = tuple(fields)
+        self.links = tuple(links)
+        self.__compiled__ = {}
+
+        SERIALISERS[model] = self
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __compile__(self, root: str, fields: list | None) -> Callable[[Any], dict]:
+        names = self.fields if fields is None else tuple(name for name in self.fields if name in fields)
+        linked = bool(self.links) and (fields is None or LINKS_FIELD in fields)
+        key = (root, names, linked)
+
+        # Only subsets of the model's fields are compiled, so there are only ever a handful per model
+        if key in self.__compiled__:
+            return self.__compiled__[key]
+
+        # attrgetter returns a bare value, rather than a tuple, for a single attribute
+        values = attrgetter(*names) if len(names) > 1 else (lambda model: (getattr(model, names[0]),)) if names else (lambda model: ())
+        links = [(template.rel, f"{root}{template.path}", attrgetter(template.attribute)) for template in self.links]
+
+        if linked:
+            def serialise(model: Any) -> dict:
+                serialised = dict(zip(names, values(model)))
+                serialised[LINKS_FIELD] = [{"rel": rel, "href": f"{path}{value}"} for rel, path, attribute in links if (value := attribute(model))]
+
+                return serialised
+        else:
+            def serialise(model: Any) -> dict:
+                return dict(zip(names, values(model)))
+
+        self.__compiled__[key] = serialise
+
+        return serialise
+
+    def serialise(self, model: Any, root: str = "", fields: list | None = None) -> dict:
+        return self.__compile__(root, fields)(model)
+
+    def serialiseMany(self, models: list, root: str = "", fields: list | None = None) -> list:
+        serialise = self.__compile__(root, fields)
+
+        return [serialise(model) for model in models]
+
+# Renders content straight to bytes with orjson, rather than walking it with jsonable_encoder and then json.dumps. The
+# output is the same bytes JSONResponse would produce, anything orjson can't encode natively is handed to jsonable_encoder
+class JSONBytesResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default = jsonable_encoder, option = orjson.OPT_NON_STR_KEYS)
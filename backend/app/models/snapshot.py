@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+from typing import Annotated, Any
+
+from psycopg.errors import UndefinedTable
+
+from .conditional import TABLE_VERSION, versionStatement
+from .database import AsyncDatabaseAdapter, Operation, Statement
+from .errors import BadRequest
+from .query import ROW_VERSION, QueryDefinition
+
+# Holds every row of a small, frequently read table in memory (i.e. operating companies), so listings and lookups of it
+# need no database round trip. Rows are refreshed by key as changes are notified (see ./notify.py), and the whole table
+# reloaded if its change marker (see ./conditional.py) moved while notifications may have been missed. The snapshot is
+# only served while it is known to be current, otherwise reads fall back to the database.
+class Snapshot:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            definition: Annotated[QueryDefinition, "Definition of the table to hold"],
+            database_adapter: Annotated[AsyncDatabaseAdapter, "Adapter to load the table with"],
+            indexes: Annotated[list | tuple, "Unique columns, besides the key, rows may be found by"] = (),
+        ):
+        self.definition = definition
+        self.database_adapter = database_adapter
+        self.indexes = indexes
+        self.__columns__ = list(definition.columns)
+        self.__rows__ = {}
+        self.__models__ = {}
+        self.__index__ = {column: {} for column in indexes}
+        self.__marker__ = None
+        self.__last_modified__ = None
+        self.__digest__ = None
+        self.__generation__ = 0
+        self.__loaded__ = False
+        self.__listening__ = False
+        self.__session__ = 0
+        self.__writes__ = 0
+        self.__caught_up__ = 0
+        self.__lock__ = None
+        self.__tasks__ = set()
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __statement__(self, keys: list | None) -> Statement:
+        # The change marker is read by the same statement as the rows, so both come from the same snapshot of the database
+        return Statement("""
+                SELECT
+                    {0}.version, {0}.last_modified, {1}, {2}.{3}
+                FROM
+                    {0}
+                LEFT JOIN
+                    {2} ON {4}
+                WHERE
+                    {0}.name = %s
+            ;""".format(
+                    TABLE_VERSION,
+                    ", ".join(f"{self.definition.table}.{column}" for column in self.__columns__),
+                    self.definition.table,
+                    ROW_VERSION,
+                    f"{self.definition.table}.{self.definition.key} = ANY(%s)" if keys is not None else "TRUE"
+                ), (*([keys] if keys is not None else []), self.definition.table))
+
+    def __apply__(self, data: list, keys: list | None) -> None:
+        if keys is None:
+            self.__rows__ = {}
+        else:
+            for key in keys:
+                self.__rows__.pop(key, None)
+
+        key = self.__columns__.index(self.definition.key)
+
+        for row in data:
+            # Keys which no longer exist are joined to nothing
+            if row[2 + key] is None:
+                continue
+
+            self.__rows__[row[2 + key]] = {**dict(zip(self.__columns__, row[2:-1])), "version": row[-1]}
+
+        # Only a full load is known to hold every write up to the marker, keyed refreshes may be ahead of notifications
+        if data and keys is None:
+            self.__marker__ = data[0][0]
+
+        if data:
+            self.__last_modified__ = data[0][1]
+
+        self.__models__ = {key: self.definition.model(**row) for key, row in self.__rows__.items()}
+        self.__index__ = {column: {row[column]: key for key, row in self.__rows__.items()} for column in self.indexes}
+
+        # Responses served from the snapshot are validated by its content, so every replica holding the same rows agrees
+        digest = hashlib.sha1()
+
+        for key in sorted(self.__rows__):
+            digest.update(f"\0{key}:{self.__rows__[key]['version']}".encode("utf-8"))
+
+        self.__digest__ = digest.hexdigest()
+        self.__generation__ += 1
+        self.__loaded__ = True
+
+    def __load__(self, keys: list | None = None) -> Operation[bool]:
+        try:
+            data = yield self.__statement__(keys)
+        except UndefinedTable:
+            # Databases initialised before change markers were kept can't be kept current
+            return False
+
+        if not data:
+            return False
+
+        self.__apply__(data, keys)
+
+        return True
+
+    def __sync__(self) -> Operation[bool]:
+        try:
+            data = yield versionStatement([self.definition.table])
+        except UndefinedTable:
+            return False
+
+        # Nothing has been written since the snapshot was taken
+        if self.__loaded__ and data and data[0][1] == self.__marker__:
+            return True
+
+        return (yield from self.__load__())
+
+    async def __run__(self, operation: Operation[bool]) -> bool:
+        if self.__lock__ is None:
+            self.__lock__ = asyncio.Lock()
+
+        # Refreshes are applied one at a time, in the order changes were notified
+        async with self.__lock__:
+            try:
+                return await self.database_adapter.runOperation(operation)
+            except Exception as exception:
+                print(f"Could not refresh the {self.definition.table} snapshot: {exception}")
+                return False
+
+    def __schedule__(self, operation: Operation[bool], session: int | None = None, writes: int | None = None) -> None:
+        async def refresh():
+            current = await self.__run__(operation)
+
+            # Holds every write this replica made up to the one which scheduled the refresh
+            if current and writes is not None:
+                self.__caught_up__ = max(self.__caught_up__, writes)
+
+            # Only served once caught up with everything written since listening began (unless it has since stopped)
+            if session is not None and session == self.__session__:
+                self.__listening__ = current
+
+            # A refresh which failed may have missed a change, stop serving until the next reconnection catches up
+            elif not current:
+                self.__listening__ = False
+
+        task = asyncio.get_running_loop().create_task(refresh())
+
+        # Held until done, the event loop only keeps a weak reference to tasks
+        self.__tasks__.add(task)
+        task.add_done_callback(self.__tasks__.discard)
+
+    async def load(self) -> bool:
+        return await self.__run__(self.__load__())
+
+    def __keys__(self, keys: list | None) -> list | None:
+        key = self.definition.getColumn(self.definition.key)
+
+        # Only a loaded snapshot can be refreshed by key
+        try:
+            return [key.parse(str(value)) for value in keys] if keys is not None and self.__loaded__ else None
+        except BadRequest:
+            return None
+
+    def changed(self, table: Annotated[str, "Table which was written"], keys: Annotated[list | None, "Primary keys written, None for any"]) -> None:
+        if table != self.definition.table:
+            return
+
+        self.__schedule__(self.__load__(self.__keys__(keys)))
+
+    def written(self, keys: Annotated[list | None, "Primary keys this replica wrote (and committed), None for any"]) -> None:
+        # Not served until the write has been read back, the write's own NOTIFY only refreshes other replicas in time
+        self.__writes__ += 1
+        self.__schedule__(self.__load__(self.__keys__(keys)), writes = self.__writes__)
+
+    def listening(self, listening: Annotated[bool, "Whether changes are being notified"]) -> None:
+        self.__session__ += 1
+        self.__listening__ = False
+
+        # Anything written while not listening is caught up on via the change marker
+        if listening:
+            self.__schedule__(self.__sync__(), session = self.__session__, writes = self.__writes__)
+
+    def isCurrent(self) -> bool:
+        return self.__loaded__ and self.__listening__ and self.__caught_up__ >= self.__writes__
+
+    def isIndexed(self, column: str) -> bool:
+        return column == self.definition.key or column in self.__index__
+
+    def __find__(self, column: str, value: Any) -> Any:
+        return value if column == self.definition.key else self.__index__[column].get(value)
+
+    def rows(self, column: Annotated[str | None, "Key or indexed column to find rows by, None for every row"] = None, value: Any = None) -> list:
+        if column is None:
+            return list(self.__rows__.values())
+
+        row = self.__rows__.get(self.__find__(column, value))
+
+        return [row] if row else []
+
+    def get(self, key: Any) -> Any:
+        return self.__models__.get(key)
+
+    def find(self, column: Annotated[str, "Key or indexed column"], value: Any) -> Any:
+        return self.__models__.get(self.__find__(column, value))
+
+    def getVersion(self) -> tuple:
+        # As the (name, version, last_modified) of a change marker, see Validator.fromVersions
+        return (self.definition.table, self.__digest__, self.__last_modified__)
+
+    def getStats(self) -> dict:
+        return {
+                "generation": self.__generation__,
+                "rows": len(self.__rows__),
+                "marker": self.__marker__,
+                "current": self.isCurrent(),
+                "pending_writes": self.__writes__ - self.__caught_up__,
+            }
@@ -0,0 +1,177 @@
+import math
+import time
+from typing import Annotated
+
+from psycopg.errors import UndefinedTable
+
+from .database import AsyncDatabaseAdapter, Commit, Operation, Statement
+from .errors import TooManyRequests
+
+# Buckets shared between backend replicas (see the initialiser), one row per throttled key
+LOGIN_THROTTLE = "login_throttle"
+
+# Fully refilled buckets are deleted from the shared table once every this many checks
+PRUNE_INTERVAL = 1000
+
+# Token buckets kept in memory, each key (i.e. a username) may make `burst` attempts at once and is refilled at `rate`
+# attempts per second. Buckets are forgotten, least recently used first, once there are more than `max_keys`.
+class Throttle:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            rate: Annotated[float, "Attempts per second each key is refilled with"],
+            burst: Annotated[int, "Attempts each key may make at once, 0 to not throttle"],
+            max_keys: Annotated[int, "Maximum number of keys to hold buckets for"] = 10000,
+        ):
+        self.rate = rate
+        self.burst = burst
+        self.__max_keys__ = max_keys
+        self.__buckets__ = {}
+        self.__evictions__ = 0
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def isEnabled(self) -> bool:
+        return self.burst > 0 and self.rate > 0
+
+    def take(self, key: Annotated[str, "Key attempting, i.e. 'username:admin'"]) -> float:
+        # Returns 0 if the attempt may be made, otherwise the seconds until it may be
+        if not self.isEnabled():
+            return 0
+
+        now = time.monotonic()
+        tokens, updated = self.__buckets__.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        retry_after = 0
+
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / self.rate
+
+        while len(self.__buckets__) >= max(self.__max_keys__, 1):
+            self.__buckets__.pop(next(iter(self.__buckets__)))
+            self.__evictions__ += 1
+
+        # Reinserted at the end, dicts retain insertion order so the front is always the least recently used
+        self.__buckets__[key] = (tokens, now)
+
+        return retry_after
+
+    def sharedStatement(self, key: Annotated[str, "Key attempting, i.e. 'username:admin'"]) -> Statement:
+        # The same bucket as take(), refilled and taken from by a single statement so replicas can't race each other
+        tokens = "LEAST(%(burst)s, bucket.tokens + EXTRACT(EPOCH FROM now() - bucket.updated) * %(rate)s)"
+
+        return Statement("""
+                INSERT INTO {0} AS bucket (
+                    key, tokens, allowed, updated
+                ) VALUES (
+                    %(key)s, %(burst)s - 1, TRUE, now()
+                ) ON CONFLICT (key) DO UPDATE SET
+                    tokens = CASE WHEN {1} >= 1 THEN {1} - 1 ELSE {1} END,
+                    allowed = {1} >= 1,
+                    updated = now()
+                RETURNING
+                    allowed, tokens
+            ;""".format(LOGIN_THROTTLE, tokens), {"key": key, "burst": self.burst, "rate": self.rate}, fetch = "one")
+
+    def getStats(self) -> dict:
+        return {
+                "keys": len(self.__buckets__),
+                "evictions": self.__evictions__,
+            }
+
+# Limits login attempts per client address and per username, before any account is read or password hashed, so a flood
+# of attempts is turned away cheaply. Attempts are first limited by each replica alone, then (if a database adapter is
+# provided) by buckets shared between every replica. The shared buckets fail open, leaving each replica's own limits.
+class LoginThrottle:
+    # On initialisation of class instance
+    def __init__(
+            self,
+            address_throttle: Annotated[Throttle, "Buckets per client address"],
+            username_throttle: Annotated[Throttle, "Buckets per username"],
+            database_adapter: Annotated[AsyncDatabaseAdapter | None, "Adapter to share buckets between replicas through, None to not share"] = None,
+        ):
+        self.address_throttle = address_throttle
+        self.username_throttle = username_throttle
+        self.database_adapter = database_adapter
+        self.__allowed__ = 0
+        self.__limited__ = {"address": 0, "username": 0, "shared": 0}
+        self.__shared_errors__ = 0
+        self.__checks__ = 0
+
+    # On destruction of class instance
+    def __del__(self):
+        pass
+
+    def __shared__(self, keys: list) -> Operation[float]:
+        retry_after = 0
+
+        try:
+            for throttle, key in keys:
+                allowed, tokens = yield throttle.sharedStatement(key)
+
+                # Later keys are left untouched, as they would be by take()
+                if not allowed:
+                    retry_after = (1 - tokens) / throttle.rate
+                    break
+
+            self.__checks__ += 1
+
+            if self.__checks__ % PRUNE_INTERVAL == 0:
+                yield Statement("DELETE FROM {0} WHERE updated < now() - make_interval(secs => %s);".format(LOGIN_THROTTLE), (
+                        max(throttle.burst / throttle.rate for throttle, _ in keys),
+                    ), fetch = None)
+        except UndefinedTable:
+            # Databases initialised before buckets were shared only have each replica's limits
+            return 0
+
+        yield Commit()
+
+        return retry_after
+
+    def __limit__(self, name: str, retry_after: float):
+        self.__limited__[name] += 1
+
+        raise TooManyRequests("Too many login attempts, please try again later!", math.ceil(retry_after))
+
+    async def check(
+            self,
+            username: Annotated[str, "Username being logged in to"],
+            address: Annotated[str | None, "Address of the client logging in, if known"],
+        ) -> None:
+        keys = [
+                *([("address", self.address_throttle, f"address:{address}")] if address else []),
+                ("username", self.username_throttle, f"username:{username.strip().lower()}"),
+            ]
+        keys = [(name, throttle, key) for name, throttle, key in keys if throttle.isEnabled()]
+
+        # An address turned away doesn't use up the username's attempts
+        for name, throttle, key in keys:
+            if (retry_after := throttle.take(key)):
+                self.__limit__(name, retry_after)
+
+        if self.database_adapter and keys:
+            try:
+                retry_after = await self.database_adapter.runOperation(self.__shared__([(throttle, key) for _, throttle, key in keys]))
+            except Exception as exception:
+                self.__shared_errors__ += 1
+                print(f"Could not check shared login throttle: {exception}")
+                retry_after = 0
+
+            if retry_after:
+                self.__limit__("shared", retry_after)
+
+        self.__allowed__ += 1
+
+    def getStats(self) -> dict:
+        return {
+                "allowed": self.__allowed__,
+                "limited": dict(self.__limited__),
+                "shared": self.database_adapter is not None,
+                "shared_errors": self.__shared_errors__,
+                "address": self.address_throttle.getStats(),
+                "username": self.username_throttle.getStats(),
+            }
@@ -1,18 +1,24 @@
 from pydantic import BaseModel
 
+from .bulk import BulkImport, ImportField, Upsert
+from .operating_company import operating_company_query
+from .query import Column, Expansion, QueryDefinition
+from .serialise import LinkTemplate, ModelSerialiser
+
 class BaseVehicle(BaseModel):
     fleet_no: int | str
     opco_id: int
 
 class Vehicle:
+    # Held in slots rather than a dict per instance, pages of results are thousands of these. There's no __del__, a
+    # finalizer on every instance only slows freeing them
+    __slots__ = ("fleet_no", "opco_id", "version")
+
     # On initialisation of class instance
-    def __init__(self, fleet_no, opco_id):
+    def __init__(self, fleet_no = None, opco_id = None, version: str | None = None):
         self.fleet_no = fleet_no
         self.opco_id = opco_id
-
-    # On destruction of class instance
-    def __del__(self):
-        pass
+        self.version = version
 
     def serialise(self):
         return {
@@ -36,3 +42,50 @@ class Vehicle:
             })
 
         return links
+
+# Compiled equivalent of serialise() and hypermediaLinks(), used to build responses, see ./serialise.py
+vehicle_serialiser = ModelSerialiser(
+    Vehicle,
+    fields = ["fleet_no", "opco_id"],
+    links = [
+        LinkTemplate("self", "/api/v1/vehicle/", "fleet_no"),
+        LinkTemplate("operatingCompany", "/api/v1/operating-company/", "opco_id"),
+    ]
+)
+
+# Columns exposed to the listing engine, see ./query.py
+vehicle_query = QueryDefinition(
+    table = "vehicle",
+    key = "fleet_no",
+    model = Vehicle,
+    path = "/api/v1/vehicle/",
+    columns = [
+        Column("fleet_no", str, filterable = True),
+        Column("opco_id", int, filterable = True, nullable = True),
+    ],
+    expansions = [
+        Expansion("operatingCompany", "opco_id", operating_company_query),
+    ]
+)
+
+# Fields accepted by the bulk import, see ./bulk.py
+vehicle_import = BulkImport(
+    table = "vehicle",
+    fields = [
+        ImportField("fleet_no", str, max_length = 5),
+        ImportField("opco_id", int, required = False),
+    ],
+    unique = ["fleet_no"],
+    references = {
+        "opco_id": ("operating_company", "id"),
+    }
+)
+
+# Columns written by upserts, see ./bulk.py
+vehicle_upsert = Upsert(
+    table = "vehicle",
+    key = "fleet_no",
+    columns = [("fleet_no", "varchar"), ("opco_id", "int")],
+    returning = ["fleet_no", "opco_id"],
+    model = Vehicle
+)
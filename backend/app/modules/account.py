@@ -1,22 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import Annotated
 
 from ..models.account import Account, BaseAccount, BaseNewAccount
 from ..models.errors import BadRequest
+from ..models.query import BaseBatchGet, parseFields
 from .application import application_read, application_write
-from .utils import get_current_account, is_admin_user
+from .password import password_adapter
+from .utils import get_current_account, is_admin_user, conditional_response, export_parameters, export_response, if_match, is_conditional, json_response, list_parameters, request_identity, set_etag, use_cache
 
 router = APIRouter(prefix="/account")
 
 @router.get("/", tags=["account"])
 async def get_account(
+        request: Request,
+        response: Response,
         is_admin_user: Annotated[bool, Depends(is_admin_user)],
-        limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
-        offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
-        order_by: Annotated[str, "The field for results to be ordered by"] = "id",
-        order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
+        parameters: Annotated[dict, Depends(list_parameters)],
     ) -> dict:
-    return application_read.createResponseBody(application_read.getAccounts(limit, offset, order_by, order_by_direction))
+    identity = request_identity(request)
+
+    # Only a conditional request may be answered without the results, otherwise the validator is read alongside them
+    if not is_conditional(request):
+        result, validator = await application_read.getAccounts(**parameters, identity = identity)
+        conditional_response(request, response, validator)
+    elif (not_modified := conditional_response(request, response, await application_read.getAccountsValidator(identity))):
+        return not_modified
+    else:
+        result = await application_read.getAccounts(**parameters)
+
+    return json_response(response, application_read.createResponseBody(result, fields = parameters["fields"]))
 
 @router.post("/", tags=["account"])
 async def new_account(
@@ -28,27 +41,79 @@ async def new_account(
             username = account.username,
             name = account.name,
             role = account.role,
-            password_hash = application_read.hashPassword(account.password),
+            password_hash = await password_adapter.hashPassword(account.password),
             disabled = account.disabled
         )
 
-    return application_write.createResponseBody(application_write.newAccount(newAccount))
+    return application_write.createResponseBody(await application_write.newAccount(newAccount))
+
+@router.get("/export", tags=["account"])
+async def export_account(
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        parameters: Annotated[dict, Depends(export_parameters)],
+    ) -> StreamingResponse:
+    return export_response(application_read.exportAccounts(**parameters), "account")
+
+@router.post("/_batch_get", tags=["account"])
+async def get_account_batch(
+        batch: BaseBatchGet,
+        response: Response,
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+    ) -> dict:
+    fields = parseFields(fields)
+
+    return json_response(response, application_read.createResponseBody(await application_read.getAccountBatch(batch.keys, fields = fields), fields = fields))
 
 @router.get("/{id}", tags=["account"])
-async def get_account_by_id(id: int | str, is_admin_user: Annotated[bool, Depends(is_admin_user)]) -> dict:
-    return application_read.createResponseBody(application_read.getAccount(id = id))
+async def get_account_by_id(
+        id: int | str,
+        request: Request,
+        response: Response,
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        cached: Annotated[bool, Depends(use_cache)],
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+    ) -> dict:
+    fields = parseFields(fields)
+
+    # The account carries its own version, so the validator is only read ahead of it when it may answer the request
+    if is_conditional(request) and (not_modified := conditional_response(request, response, await application_read.getAccountValidator(id, fields = fields))):
+        return not_modified
+
+    return json_response(response, application_read.createResponseBody(set_etag(response, await application_read.getAccount(id = id, fields = fields, cached = cached), fields), fields = fields))
+
+@router.patch("/{id}", tags=["account"])
+async def patch_account_by_id(
+        id: int,
+        account: BaseAccount,
+        response: Response,
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        version: Annotated[str | None, Depends(if_match)],
+    ) -> dict:
+    # Only the fields present in the body are updated
+    values = account.model_dump(exclude_unset = True)
+
+    if values.get("id") and not id == values["id"]:
+        raise BadRequest("Mismatch between ID and ID in body provided")
+
+    if values.get("password"):
+        values["password_hash"] = await password_adapter.hashPassword(values["password"])
+
+    return application_write.createResponseBody(set_etag(response, await application_write.patchAccount(id, values, version = version)))
 
 @router.put("/{id}", tags=["account"])
 async def edit_account_by_id(
         id: int,
         account: BaseAccount,
-        is_admin_user: Annotated[bool, Depends(is_admin_user)]
+        response: Response,
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        version: Annotated[str | None, Depends(if_match)],
     ) -> dict:
 
     if account.id and not id == account.id:
         raise BadRequest("Mismatch between ID and ID in body provided")
 
-    existingAccount = application_read.getAccount(id = id)
+    existingAccount = await application_read.getAccount(id = id, cached = False)
 
     newAccount = Account(
             id = existingAccount.id,
@@ -63,4 +128,5 @@ async def edit_account_by_id(
             last_modified = existingAccount.last_modified,
         )
 
-    return application_write.createResponseBody(application_write.setAccount(newAccount))
+    # The write is conditional on If-Match rather than the version just read, so it fails if the client's copy is stale
+    return application_write.createResponseBody(set_etag(response, await application_write.setAccount(newAccount, version = version)))
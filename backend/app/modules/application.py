@@ -1,5 +1,55 @@
+import os
+
 from ..models.application import Application
+from ..models.cache import AccountSessionCache, EntityCache
+from ..models.count import CountProvider
+from ..models.notify import ChangeListener
+from ..models.operating_company import operating_company_query
+from ..models.snapshot import Snapshot
 from ..modules.database import database_read_only, database_read_write
 
-application_read = Application(database_adapter = database_read_only)
-application_write = Application(database_adapter = database_read_write, write_enabled = True)
+# Shared so that writes through application_write invalidate the counts cached for application_read
+count_provider = CountProvider(ttl = float(os.environ.get("COUNT_CACHE_TTL", 30.0)))
+
+# Shared so that writes through application_write invalidate the models cached for application_read
+entity_cache_ttl = float(os.environ.get("ENTITY_CACHE_TTL", 30.0))
+entity_cache = EntityCache(ttl = entity_cache_ttl, max_entries = int(os.environ.get("ENTITY_CACHE_SIZE", 1024)))
+
+# Writes made by other backend replicas are learnt of over LISTEN/NOTIFY, see lifespan in ../api.py
+change_listener = ChangeListener(
+        database_read_only,
+        entity_cache,
+        count_provider,
+        ttl = entity_cache_ttl,
+        fallback_ttl = float(os.environ.get("ENTITY_CACHE_FALLBACK_TTL", 2.0)),
+        retry_interval = float(os.environ.get("CHANGE_LISTENER_RETRY_INTERVAL", 1.0))
+    )
+
+# Operating companies are few and read by nearly every listing, so are served from memory (kept current by change_listener)
+operating_company_snapshot = Snapshot(operating_company_query, database_read_only, indexes = ("noc", "short_code"))
+change_listener.subscribe(operating_company_snapshot)
+
+# Held for refreshing token pairs while change_listener keeps it current, so refreshes (most of the traffic) skip the database
+account_sessions = AccountSessionCache(
+        ttl = float(os.environ.get("ACCOUNT_SESSION_TTL", 600.0)),
+        max_entries = int(os.environ.get("ACCOUNT_SESSION_CACHE_SIZE", 65536))
+    )
+change_listener.subscribe(account_sessions)
+
+batch_max_size = int(os.environ.get("BATCH_MAX_SIZE", 500))
+export_chunk_size = int(os.environ.get("EXPORT_CHUNK_SIZE", 1000))
+bulk_max_size = int(os.environ.get("BULK_MAX_SIZE", 10000))
+bulk_max_bytes = int(os.environ.get("BULK_MAX_BYTES", 16 * 1024 * 1024))
+
+application_options = {
+    "count_provider": count_provider,
+    "entity_cache": entity_cache,
+    "snapshots": [operating_company_snapshot],
+    "account_sessions": account_sessions,
+    "batch_max_size": batch_max_size,
+    "export_chunk_size": export_chunk_size,
+    "bulk_max_size": bulk_max_size,
+}
+
+application_read = Application(database_adapter = database_read_only, **application_options)
+application_write = Application(database_adapter = database_read_write, write_enabled = True, **application_options)
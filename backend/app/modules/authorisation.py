@@ -1,19 +1,84 @@
+import ipaddress
 import os
-from fastapi import APIRouter, HTTPException, Depends, Form
+from fastapi import APIRouter, HTTPException, Depends, Form, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import Annotated
 
 from ..modules.application import application_read
+from ..modules.database import database_read_write
 from ..models.authorisation import AuthorisationAdapter
-from ..models.errors import Unauthorised
+from ..models.throttle import LoginThrottle, Throttle
+from ..models.errors import NotFound, ServiceUnavailable, Unauthorised
+from ..modules.password import password_adapter
     
+def read_key_file(path: Annotated[str, "Path of a file holding a PEM key or secret"]) -> str:
+    with open(path.strip(), "r") as file:
+        return file.read()
+
 jwt_algorithm = os.environ.get("JWT_ALGORITHM", "HS256")
-jwt_secret = os.environ.get("JWT_SECRET", None)
 
-if not jwt_secret:
-    raise Exception("$JWT_SECRET is required and must be specified!")
+# HMAC algorithms (HS*) sign with $JWT_SECRET, asymmetric algorithms (RS*, ES*) with the PEM private key at $JWT_PRIVATE_KEY_FILE
+if jwt_algorithm.startswith("HS"):
+    jwt_secret = os.environ.get("JWT_SECRET", None)
+
+    if not jwt_secret:
+        raise Exception("$JWT_SECRET is required and must be specified!")
+else:
+    if not os.environ.get("JWT_PRIVATE_KEY_FILE"):
+        raise Exception(f"$JWT_PRIVATE_KEY_FILE is required and must be specified for {jwt_algorithm}!")
+
+    jwt_secret = read_key_file(os.environ["JWT_PRIVATE_KEY_FILE"])
+
+# Keys are rotated by signing with a new key, while tokens signed by retired keys (listed here) remain valid until they expire
+jwt_previous_keys = [read_key_file(path) for path in os.environ.get("JWT_PREVIOUS_KEY_FILES", "").split(",") if path.strip()]
+
+# Verified claims of this many tokens are remembered until they expire, see ../models/authorisation.py
+jwt_cache_size = int(os.environ.get("JWT_CACHE_SIZE", 4096))
+
+authorisation = AuthorisationAdapter(jwt_algorithm, jwt_secret, cache_size = jwt_cache_size, previous_keys = jwt_previous_keys)
+
+# Login attempts allowed at once (burst) and per minute thereafter, per client address and per username. 0 disables either
+login_throttle = LoginThrottle(
+        Throttle(
+            rate = float(os.environ.get("LOGIN_ADDRESS_RATE", 20)) / 60,
+            burst = int(os.environ.get("LOGIN_ADDRESS_BURST", 20)),
+            max_keys = int(os.environ.get("LOGIN_THROTTLE_MAX_KEYS", 10000))
+        ),
+        Throttle(
+            rate = float(os.environ.get("LOGIN_USERNAME_RATE", 5)) / 60,
+            burst = int(os.environ.get("LOGIN_USERNAME_BURST", 10)),
+            max_keys = int(os.environ.get("LOGIN_THROTTLE_MAX_KEYS", 10000))
+        ),
+        # Shared between replicas through the database, otherwise each replica limits attempts alone
+        database_read_write if os.environ.get("LOGIN_THROTTLE_SHARED", "false").lower() == "true" else None
+    )
+
+# Proxies (i.e. the frontend) trusted to report the client's address in X-Forwarded-For. Only loopback is trusted unless
+# deployments list their proxies' addresses, trusting a whole private range would let any client within it claim to be
+# forwarding for whichever address it likes (and so dodge the per address login limit)
+trusted_proxies = [
+        ipaddress.ip_network(network.strip())
+        for network in os.environ.get("TRUSTED_PROXIES", "127.0.0.0/8,::1/128").split(",")
+        if network.strip()
+    ]
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        return any(ipaddress.ip_address(address) in network for network in trusted_proxies)
+    except ValueError:
+        return False
+
+def client_address(request: Request) -> str | None:
+    address = request.client.host if request.client else None
 
-authorisation = AuthorisationAdapter(jwt_algorithm, jwt_secret)
+    # Each trusted proxy appends the address it received the request from, the first untrusted one is the client
+    for forwarded in reversed(request.headers.get("X-Forwarded-For", "").split(",")):
+        if not address or not is_trusted_proxy(address) or not forwarded.strip():
+            break
+
+        address = forwarded.strip()
+
+    return address
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/authorisation/token")
 
@@ -31,17 +96,23 @@ async def get_current_account_ignore_expiry(token: Annotated[str, Depends(oauth2
     return claims
 
 @router.post("/token", tags=["authorisation"])
-async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+async def login(request: Request, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+    # Turned away before the account is read or the password hashed, so floods of attempts cost next to nothing
+    await login_throttle.check(form_data.username, client_address(request))
+
     try:
-        account = application_read.getAccount(username = form_data.username)
+        account = await application_read.getAccount(username = form_data.username)
 
         if not account:
             raise Unauthorised("Incorrect username")
         
-        passwordMatches = application_read.matchAccountPassword(account = account, password = form_data.password)
+        passwordMatches = await password_adapter.matchPassword(password = form_data.password, password_hash = account.password_hash)
 
         if not passwordMatches:
             raise Unauthorised("Incorrect password")
+    except ServiceUnavailable:
+        # Password workers are saturated, the client should retry rather than be told the credentials are wrong
+        raise
     except:
         # Don't confirm existence of an account to the user, for security reasons this is reset to a generic message
         raise Unauthorised("Incorrect username or password")
@@ -62,17 +133,30 @@ async def refresh(current_account: Annotated[dict, Depends(get_current_account_i
     if current_account["jti"] != refresh_claims["jti"]:
         raise Unauthorised("Access/refresh pair mismatch!")
     
-    # Query account data by account ID
-    account = application_read.getAccount(id = refresh_claims["sub"])
+    # Only what's needed to check (and issue) the pair is read, and is held in memory between refreshes
+    try:
+        account = await application_read.getAccountSession(id = refresh_claims["sub"])
+    except NotFound:
+        raise Unauthorised("Token no longer valid!")
 
     # Ensure the account UUID has not changed, otherwise refresh token is no longer valid
     if authorisation.generateCurrentJTI(account) != refresh_claims["jti"]:
         raise Unauthorised("Token no longer valid!")
+
+    if account.disabled:
+        raise Unauthorised("Account has been disabled")
     
     accessToken, refreshToken = application_read.generateTokenPairForAccount(account, authorisation)
 
     return {"access_token": accessToken, "refresh_token": refreshToken, "token_type": "bearer"}
 
+@router.get("/jwks", tags=["authorisation"])
+async def jwks(response: Response):
+    # Public keys only change when keys are rotated, so verifiers (i.e. the frontend) may hold onto them for a while
+    response.headers["Cache-Control"] = "public, max-age=300"
+
+    return authorisation.getJWKS()
+
 @router.get("/claims", tags=["authorisation"])
 async def read_items(token: Annotated[str, Depends(oauth2_scheme)]):
     return authorisation.decode(token)
@@ -1,6 +1,6 @@
 import os
 
-from ..models.database import DatabaseAdapter
+from ..models.database import AsyncDatabaseAdapter
 
 database_host = os.environ.get("POSTGRES_HOST", "localhost")
 database_name = os.environ.get("POSTGRES_DB", "postgres")
@@ -10,5 +10,18 @@ database_pass = os.environ.get("POSTGRES_PASSWORD", None)
 database_read_user = os.environ.get("POSTGRES_READ_USER", database_user)
 database_read_pass = os.environ.get("POSTGRES_READ_PASSWORD", database_pass)
 
-database_read_only = DatabaseAdapter(database_host, database_name, database_read_user, database_read_pass)
-database_read_write = DatabaseAdapter(database_host, database_name, database_user, database_pass)
+# Connection pool sizing, applied to each adapter (per backend replica)
+database_pool_min_size = int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 1))
+database_pool_max_size = int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10))
+database_pool_timeout = float(os.environ.get("POSTGRES_POOL_TIMEOUT", 5.0))
+database_pool_max_idle = float(os.environ.get("POSTGRES_POOL_MAX_IDLE", 300.0))
+
+database_pool_options = {
+    "pool_min_size": database_pool_min_size,
+    "pool_max_size": database_pool_max_size,
+    "pool_timeout": database_pool_timeout,
+    "pool_max_idle": database_pool_max_idle,
+}
+
+database_read_only = AsyncDatabaseAdapter(database_host, database_name, database_read_user, database_read_pass, **database_pool_options)
+database_read_write = AsyncDatabaseAdapter(database_host, database_name, database_user, database_pass, **database_pool_options)
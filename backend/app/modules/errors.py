@@ -1,6 +1,6 @@
 from fastapi.responses import JSONResponse
 
-from ..models.errors import BadRequest, Conflict, Forbidden, Locked, MethodNotAllowed, NotFound, ServiceUnavailable, Unauthorised
+from ..models.errors import BadRequest, Conflict, Forbidden, Locked, MethodNotAllowed, NotFound, PreconditionFailed, ServiceUnavailable, TooManyRequests, Unauthorised
 
 def exceptionToHTTPResponse(exception: Exception):
     if isinstance(exception, BadRequest):
@@ -15,9 +15,13 @@ def exceptionToHTTPResponse(exception: Exception):
         return JSONResponse(content={"message": str(exception)}, status_code = 405)
     elif isinstance(exception, Conflict):
         return JSONResponse(content={"message": str(exception)}, status_code = 409)
+    elif isinstance(exception, PreconditionFailed):
+        return JSONResponse(content={"message": str(exception)}, status_code = 412)
     elif isinstance(exception, Locked):
         return JSONResponse(content={"message": str(exception)}, status_code = 423)
+    elif isinstance(exception, TooManyRequests):
+        return JSONResponse(content={"message": str(exception)}, status_code = 429, headers = {"Retry-After": str(exception.retry_after)})
     elif isinstance(exception, ServiceUnavailable):
-        return JSONResponse(status_code = 503)
+        return JSONResponse(content={"message": str(exception)}, status_code = 503)
     else:
         return JSONResponse(content={"message": "Oops! An unknown error occured..."}, status_code = 500)
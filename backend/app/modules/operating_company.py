@@ -1,22 +1,34 @@
-from fastapi import APIRouter, Depends
-from typing import Annotated
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Annotated, List
 
 from .application import application_read, application_write
 from ..models.errors import BadRequest
 from ..models.operating_company import BaseOperatingCompany, BaseNewOperatingCompany, OperatingCompany
-from .utils import is_authenticated, is_admin_user
+from ..models.query import BaseBatchGet, parseFields
+from .utils import is_authenticated, is_admin_user, conditional_response, export_parameters, export_response, if_match, import_body, import_format, is_conditional, json_response, list_parameters, request_identity, set_etag, use_cache
 
 router = APIRouter(prefix="/operating-company")
 
 @router.get("/", tags=["operating-company"])
 async def get_operating_company(
+        request: Request,
+        response: Response,
         current_user: Annotated[dict, Depends(is_authenticated)],
-        limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
-        offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
-        order_by: Annotated[str, "The field for results to be ordered by"] = "id",
-        order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
+        parameters: Annotated[dict, Depends(list_parameters)],
     ) -> dict:
-    return application_read.createResponseBody(application_read.getOperatingCompanies(limit, offset, order_by, order_by_direction))
+    identity = request_identity(request)
+
+    # Only a conditional request may be answered without the results, otherwise the validator is read alongside them
+    if not is_conditional(request):
+        result, validator = await application_read.getOperatingCompanies(**parameters, identity = identity)
+        conditional_response(request, response, validator)
+    elif (not_modified := conditional_response(request, response, await application_read.getOperatingCompaniesValidator(identity))):
+        return not_modified
+    else:
+        result = await application_read.getOperatingCompanies(**parameters)
+
+    return json_response(response, application_read.createResponseBody(result, fields = parameters["fields"]))
 
 @router.post("/", tags=["operating-company"])
 async def new_operating_company(operating_company: BaseNewOperatingCompany, is_admin_user: Annotated[dict, Depends(is_admin_user)]) -> dict:
@@ -27,22 +39,96 @@ async def new_operating_company(operating_company: BaseNewOperatingCompany, is_a
             name = operating_company.name
         )
 
-    return application_write.createResponseBody(application_write.newOperatingCompany(newOperatingCompany))
+    return application_write.createResponseBody(await application_write.newOperatingCompany(newOperatingCompany))
+
+@router.get("/export", tags=["operating-company"])
+async def export_operating_company(
+        is_admin_user: Annotated[dict, Depends(is_admin_user)],
+        parameters: Annotated[dict, Depends(export_parameters)],
+    ) -> StreamingResponse:
+    return export_response(application_read.exportOperatingCompanies(**parameters), "operating-company")
+
+@router.post("/_bulk", tags=["operating-company"])
+async def import_operating_company(
+        request: Request,
+        is_admin_user: Annotated[dict, Depends(is_admin_user)],
+        atomic: Annotated[bool, "Import nothing if any row conflicts (default: import every row which doesn't)"] = False,
+    ) -> JSONResponse:
+    return await application_write.importOperatingCompanies(await import_body(request), format = import_format(request), atomic = atomic)
+
+@router.post("/_upsert", tags=["operating-company"])
+async def upsert_operating_company(
+        operating_companies: BaseNewOperatingCompany | List[BaseNewOperatingCompany],
+        is_admin_user: Annotated[dict, Depends(is_admin_user)]
+    ) -> dict:
+    operating_companies = [
+            OperatingCompany(
+                id = None,
+                noc = operating_company.noc,
+                short_code = operating_company.short_code,
+                name = operating_company.name
+            )
+            for operating_company in (operating_companies if isinstance(operating_companies, list) else [operating_companies])
+        ]
+
+    return application_write.createResponseBody(await application_write.upsertOperatingCompanies(operating_companies))
+
+@router.post("/_batch_get", tags=["operating-company"])
+async def get_operating_company_batch(
+        batch: BaseBatchGet,
+        response: Response,
+        current_user: Annotated[dict, Depends(is_authenticated)],
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+    ) -> dict:
+    fields = parseFields(fields)
+
+    return json_response(response, application_read.createResponseBody(await application_read.getOperatingCompanyBatch(batch.keys, fields = fields), fields = fields))
 
 @router.get("/{id}", tags=["operating-company"])
-async def get_operating_company_by_id(id: int | str, current_user: Annotated[dict, Depends(is_authenticated)]) -> dict:
-    return application_read.createResponseBody(application_read.getOperatingCompany(id = id))
+async def get_operating_company_by_id(
+        id: int | str,
+        request: Request,
+        response: Response,
+        current_user: Annotated[dict, Depends(is_authenticated)],
+        cached: Annotated[bool, Depends(use_cache)],
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+    ) -> dict:
+    fields = parseFields(fields)
+
+    # The operating company carries its own version, so the validator is only read ahead of it when it may answer the request
+    if is_conditional(request) and (not_modified := conditional_response(request, response, await application_read.getOperatingCompanyValidator(id, fields = fields))):
+        return not_modified
+
+    return json_response(response, application_read.createResponseBody(set_etag(response, await application_read.getOperatingCompany(id = id, fields = fields, cached = cached), fields), fields = fields))
+
+@router.patch("/{id}", tags=["operating-company"])
+async def patch_operating_company_by_id(
+        id: int,
+        operating_company: BaseOperatingCompany,
+        response: Response,
+        is_admin_user: Annotated[dict, Depends(is_admin_user)],
+        version: Annotated[str | None, Depends(if_match)],
+    ) -> dict:
+    # Only the fields present in the body are updated
+    values = operating_company.model_dump(exclude_unset = True)
+
+    if values.get("id") and not id == values["id"]:
+        raise BadRequest("Mismatch between ID and ID in body provided")
+
+    return application_write.createResponseBody(set_etag(response, await application_write.patchOperatingCompany(id, values, version = version)))
 
 @router.put("/{id}", tags=["operating-company"])
 async def edit_operating_company_by_id(
         id: int | str,
         operating_company: BaseOperatingCompany | BaseNewOperatingCompany,
-        is_admin_user: Annotated[dict, Depends(is_admin_user)]
+        response: Response,
+        is_admin_user: Annotated[dict, Depends(is_admin_user)],
+        version: Annotated[str | None, Depends(if_match)],
     ) -> dict:
     if operating_company.id and not id == operating_company.id:
         raise BadRequest("Mismatch between ID and ID in body provided")
 
-    existingOperatingCompany = application_read.getOperatingCompany(id = id)
+    existingOperatingCompany = await application_read.getOperatingCompany(id = id, cached = False)
 
     newOperatingCompany = OperatingCompany(
             id = existingOperatingCompany.id,
@@ -51,12 +137,14 @@ async def edit_operating_company_by_id(
             name = operating_company.name or existingOperatingCompany.name
         )
 
-    return application_write.createResponseBody(application_write.setOperatingCompany(newOperatingCompany))
+    # The write is conditional on If-Match rather than the version just read, so it fails if the client's copy is stale
+    return application_write.createResponseBody(set_etag(response, await application_write.setOperatingCompany(newOperatingCompany, version = version)))
 
 @router.delete("/{id}", tags=["operating-company"])
 async def delete_operating_company_by_id(
         id: int | str,
         is_admin_user: Annotated[dict, Depends(is_admin_user)],
+        version: Annotated[str | None, Depends(if_match)],
         confirmed: bool = False
     ) -> dict:
-    return application_write.deleteOperatingCompany(id = id, confirmed = confirmed)
+    return await application_write.deleteOperatingCompany(id = id, confirmed = confirmed, version = version)
@@ -0,0 +1,9 @@
+import os
+
+from ..models.password import PasswordAdapter
+
+# bcrypt is CPU bound, keep the workers at or below the cores available to each backend replica
+password_workers = int(os.environ.get("PASSWORD_WORKERS", 2))
+password_queue_limit = int(os.environ.get("PASSWORD_QUEUE_LIMIT", 16))
+
+password_adapter = PasswordAdapter(max_workers = password_workers, queue_limit = password_queue_limit)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
 from .account import router as router_account
-from .application import application_read, application_write
-from .authorisation import router as router_authorisation
+from .application import application_read, application_write, change_listener
+from .authorisation import authorisation, login_throttle, router as router_authorisation
 from .errors import ServiceUnavailable
+from .password import password_adapter
 from .operating_company import router as router_operating_company
 from .vehicle import router as router_vehicle
     
@@ -16,11 +17,27 @@ async def head_status() -> dict:
 @router.get("/status", tags=["status"])
 async def status() -> dict:
     # Ensure databases are reachable, status check will otherwise throw an internal error
-    if not application_read.testDatabaseConnection() or not application_write.testDatabaseConnection():
-        return ServiceUnavailable("Database connection is not ready!")
+    if not await application_read.testDatabaseConnection() or not await application_write.testDatabaseConnection():
+        raise ServiceUnavailable("Database connection is not ready!")
 
     # Database is available, service is available!
-    return {"status": 200, "message": "Up"}
+    return {
+            "status": 200,
+            "message": "Up",
+            "database": {
+                "read": application_read.getDatabaseStats(),
+                "write": application_write.getDatabaseStats(),
+            },
+            "cache": {
+                **application_read.getCacheStats(),
+                "listener": change_listener.getStats(),
+                "sessions": application_read.getAccountSessionStats(),
+            },
+            "snapshot": application_read.getSnapshotStats(),
+            "password": password_adapter.getStats(),
+            "authorisation": authorisation.getStats(),
+            "login": login_throttle.getStats(),
+        }
 
 # Include account routes
 router.include_router(router_account)
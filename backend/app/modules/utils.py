@@ -1,8 +1,14 @@
-from fastapi import Depends, HTTPException
-from typing import Annotated
+from fastapi import Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Any
 from jose.exceptions import ExpiredSignatureError
 
 from ..modules.authorisation import authorisation, oauth2_scheme
+from ..models.conditional import Validator, representationTag
+from ..models.errors import BadRequest, PreconditionFailed
+from ..models.query import parseFields
+from ..models.serialise import JSONBytesResponse
+from .application import bulk_max_bytes, bulk_max_size
 from .errors import Forbidden, Unauthorised
 
 async def get_current_account(token: Annotated[str, Depends(oauth2_scheme)]) -> dict:
@@ -33,3 +39,147 @@ async def is_authenticated(claims: Annotated[dict, Depends(get_current_account)]
 async def is_admin_user(claims: Annotated[None, Depends(is_authenticated)]) -> None:
     if not claims.get("role") == "ADM":
         raise Forbidden("Access forbidden for current account")
+
+EXPORT_PARAMETERS = ("format", "order_by", "order_by_direction", "fields")
+LIST_PARAMETERS = ("limit", "offset", "order_by", "order_by_direction", "cursor", "count", "fields", "expand")
+
+async def list_parameters(
+        request: Request,
+        limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
+        offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
+        order_by_direction: Annotated[str, "The sort order for fields without an explicit direction"] = "ASC",
+        cursor: Annotated[str | None, "Opaque cursor from a previous page's next/prev link (used in lieu of offset)"] = None,
+        count: Annotated[str, "How the total is counted: 'exact' (cached briefly), 'estimated' or 'none'"] = "exact",
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+        expand: Annotated[str | None, "Comma separated related models to include, i.e. 'operatingCompany' for vehicles"] = None,
+    ) -> dict:
+    # Any other query parameter is treated as a filter, the query definition decides which are applied
+    filters = {key: value for key, value in request.query_params.items() if key not in LIST_PARAMETERS}
+
+    return {
+        "limit": limit,
+        "offset": offset,
+        "order_by": order_by,
+        "order_by_direction": order_by_direction,
+        "cursor": cursor,
+        "count": count,
+        "filters": filters,
+        "fields": parseFields(fields),
+        "expand": parseFields(expand),
+    }
+
+async def export_parameters(
+        request: Request,
+        format: Annotated[str, "Format to export in: 'ndjson' or 'csv'"] = "ndjson",
+        order_by: Annotated[str, "The field(s) for results to be ordered by, comma separated and optionally suffixed with ':ASC'/':DESC'"] = "id",
+        order_by_direction: Annotated[str, "The sort order for fields without an explicit direction"] = "ASC",
+        fields: Annotated[str | None, "Comma separated fields to export (default: every field)"] = None,
+    ) -> dict:
+    # Filters are taken from the remaining query parameters, as with the listing endpoints
+    filters = {key: value for key, value in request.query_params.items() if key not in EXPORT_PARAMETERS}
+
+    return {
+        "format": format,
+        "order_by": order_by,
+        "order_by_direction": order_by_direction,
+        "filters": filters,
+        "fields": parseFields(fields),
+    }
+
+def export_response(export: Annotated[tuple, "Stream and encoder returned by an Application export"], name: Annotated[str, "Name of the exported file, without extension"]) -> StreamingResponse:
+    stream, encoder = export
+
+    return StreamingResponse(stream, media_type = encoder.mediaType(), headers = {
+            "Content-Disposition": f"attachment; filename=\"{name}.{encoder.format}\""
+        })
+
+def import_format(request: Request) -> str:
+    return "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+async def import_body(request: Request) -> bytes:
+    # Read as it arrives, and refused as soon as it holds more rows (or bytes) than may be imported at once rather than
+    # once it has all been buffered. The exact row count is still checked when the body is parsed
+    chunks = []
+    size = 0
+    lines = 0
+    quoted = False
+    csv = import_format(request) == "csv"
+
+    async for chunk in request.stream():
+        size += len(chunk)
+
+        if size > bulk_max_bytes:
+            raise BadRequest(f"No more than {bulk_max_bytes} bytes may be imported at once!")
+
+        # Line breaks within quoted CSV values don't end a row, quotes are counted across chunks to tell them apart
+        for position, part in enumerate(chunk.split(b"\"") if csv else [chunk]):
+            quoted = quoted != (position > 0)
+
+            if not quoted:
+                lines += part.count(b"\n")
+
+        # Allowing for a CSV header row
+        if lines > bulk_max_size + 1:
+            raise BadRequest(f"No more than {bulk_max_size} rows may be imported at once!")
+
+        chunks.append(chunk)
+
+    return b"".join(chunks)
+
+async def if_match(if_match: Annotated[str | None, Header(description = "ETag the resource must still have for the write to be applied")] = None) -> str | None:
+    # '*' matches any existing resource, which every write already requires
+    if not if_match or if_match.strip() == "*":
+        return None
+
+    # Projections of a version are tagged with a suffix, see representationTag()
+    version = if_match.strip().removeprefix("W/").strip('"').partition("-")[0]
+
+    # Versions are only ever issued as numbers, anything else can never match
+    if not version.isdigit():
+        raise PreconditionFailed("The resource has been modified since the version provided, please fetch it and try again!")
+
+    return version
+
+def json_response(response: Response, content: Annotated[Any, "Body built by Application.createResponseBody"]) -> Response:
+    # Encoded straight to bytes rather than through FastAPI's jsonable_encoder, which is skipped for returned responses,
+    # so headers already set on the injected response (i.e. ETag) are carried over
+    result = JSONBytesResponse(content, status_code = response.status_code or 200)
+    result.raw_headers.extend(response.headers.raw)
+
+    return result
+
+def set_etag(
+        response: Response,
+        result: Annotated[Any, "Model (or expanded result) returned by an Application"],
+        fields: Annotated[list | None, "Fields returned, None for all of them"] = None,
+    ) -> Any:
+    # Expanded results also depend on the related models, their ETag is set by conditional_response
+    if getattr(result, "version", None):
+        response.headers["ETag"] = f"\"{representationTag(result.version, fields)}\""
+
+    return result
+
+async def use_cache(cache_control: Annotated[str | None, Header(description = "'no-cache' to read the resource from the database rather than any cached copy")] = None) -> bool:
+    return not cache_control or not any(directive.strip().lower() in ("no-cache", "no-store") for directive in cache_control.split(","))
+
+def request_identity(request: Request) -> str:
+    return f"{request.url.path}?{request.url.query}"
+
+def is_conditional(request: Request) -> bool:
+    # Only conditional requests can be answered with a 304, so only they need the validator ahead of the representation
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def conditional_response(request: Request, response: Response, validator: Annotated[Validator | None, "Validator of the representation about to be read"]) -> Response | None:
+    if not validator:
+        return None
+
+    # Responses may be stored, but must be revalidated as they are per account
+    headers = {**validator.headers(), "Cache-Control": "private, no-cache"}
+
+    if validator.matches(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code = 304, headers = headers)
+
+    response.headers.update(headers)
+
+    return None
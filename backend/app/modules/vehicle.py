@@ -1,25 +1,93 @@
-from fastapi import APIRouter, Depends
-from typing import Annotated
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Annotated, List
 
 from .application import application_read, application_write
-from .utils import is_authenticated, is_admin_user
+from .utils import is_authenticated, is_admin_user, conditional_response, export_parameters, export_response, import_body, import_format, is_conditional, json_response, list_parameters, request_identity, set_etag, use_cache
+from ..models.query import BaseBatchGet, parseFields
 from ..models.vehicle import Vehicle, BaseVehicle
 
 router = APIRouter(prefix="/vehicle")
 
 @router.get("/", tags=["vehicle"])
 async def get_vehicle(
+        request: Request,
+        response: Response,
         is_authenticated: Annotated[dict, Depends(is_authenticated)],
-        limit: Annotated[int, "The cap for results (useful for pagination)"] = 10,
-        offset: Annotated[int, "The offset for results (useful for pagination)"] = 0,
-        order_by: Annotated[str, "The field for results to be ordered by"] = "id",
-        order_by_direction: Annotated[str, "The sort order for the results"] = "ASC",
+        parameters: Annotated[dict, Depends(list_parameters)],
     ) -> dict:
-    return application_read.createResponseBody(application_read.getVehicles(limit, offset, order_by, order_by_direction))
+    identity = request_identity(request)
+
+    # Only a conditional request may be answered without the results, otherwise the validator is read alongside them
+    if not is_conditional(request):
+        result, validator = await application_read.getVehicles(**parameters, identity = identity)
+        conditional_response(request, response, validator)
+    elif (not_modified := conditional_response(request, response, await application_read.getVehiclesValidator(identity, expand = parameters["expand"]))):
+        return not_modified
+    else:
+        result = await application_read.getVehicles(**parameters)
+
+    return json_response(response, application_read.createResponseBody(result, fields = parameters["fields"]))
+
+@router.get("/export", tags=["vehicle"])
+async def export_vehicle(
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        parameters: Annotated[dict, Depends(export_parameters)],
+    ) -> StreamingResponse:
+    return export_response(application_read.exportVehicles(**parameters), "vehicle")
+
+@router.post("/_bulk", tags=["vehicle"])
+async def import_vehicle(
+        request: Request,
+        is_admin_user: Annotated[bool, Depends(is_admin_user)],
+        atomic: Annotated[bool, "Import nothing if any row conflicts (default: import every row which doesn't)"] = False,
+    ) -> JSONResponse:
+    return await application_write.importVehicles(await import_body(request), format = import_format(request), atomic = atomic)
+
+@router.post("/_upsert", tags=["vehicle"])
+async def upsert_vehicle(
+        vehicles: BaseVehicle | List[BaseVehicle],
+        is_admin_user: Annotated[bool, Depends(is_admin_user)]
+    ) -> dict:
+    vehicles = [
+            Vehicle(
+                fleet_no = vehicle.fleet_no,
+                opco_id = vehicle.opco_id,
+            )
+            for vehicle in (vehicles if isinstance(vehicles, list) else [vehicles])
+        ]
+
+    return application_write.createResponseBody(await application_write.upsertVehicles(vehicles))
+
+@router.post("/_batch_get", tags=["vehicle"])
+async def get_vehicle_batch(
+        batch: BaseBatchGet,
+        response: Response,
+        is_authenticated: Annotated[dict, Depends(is_authenticated)],
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+        expand: Annotated[str | None, "Comma separated related models to include, i.e. 'operatingCompany'"] = None,
+    ) -> dict:
+    fields = parseFields(fields)
+
+    return json_response(response, application_read.createResponseBody(await application_read.getVehicleBatch(batch.keys, fields = fields, expand = parseFields(expand)), fields = fields))
 
 @router.get("/{fleet_no}", tags=["vehicle"])
-async def get_vehicle_by_fleet_number(fleet_no: int | str, is_authenticated: Annotated[dict, Depends(is_authenticated)]) -> dict:
-    return application_read.createResponseBody(application_read.getVehicle(fleet_no = fleet_no))
+async def get_vehicle_by_fleet_number(
+        fleet_no: int | str,
+        request: Request,
+        response: Response,
+        is_authenticated: Annotated[dict, Depends(is_authenticated)],
+        cached: Annotated[bool, Depends(use_cache)],
+        fields: Annotated[str | None, "Comma separated fields to return, include 'links' for hypermedia links (default: every field and links)"] = None,
+        expand: Annotated[str | None, "Comma separated related models to include, i.e. 'operatingCompany'"] = None,
+    ) -> dict:
+    fields = parseFields(fields)
+
+    # Unexpanded results carry their own version, so the validator is only read ahead of them when it may answer the request
+    if (parseFields(expand) or is_conditional(request)) and (not_modified := conditional_response(request, response, await application_read.getVehicleValidator(fleet_no, expand = parseFields(expand), fields = fields))):
+        return not_modified
+
+    return json_response(response, application_read.createResponseBody(set_etag(response, await application_read.getVehicle(fleet_no = fleet_no, fields = fields, expand = parseFields(expand), cached = cached), fields), fields = fields))
 
 @router.post("/", tags=["account"])
 async def new_account(
@@ -32,4 +100,4 @@ async def new_account(
             opco_id = vehicle.opco_id,
         )
 
-    return application_write.createResponseBody(application_write.newVehicle(newVehicle))
+    return application_write.createResponseBody(await application_write.newVehicle(newVehicle))
@@ -0,0 +1,79 @@
+import datetime
+import time
+import tracemalloc
+import uuid
+from typing import Annotated, Callable
+
+from app.models.account import account_query
+from app.models.operating_company import operating_company_query
+from app.models.query import QueryDefinition
+from app.models.vehicle import vehicle_query
+
+# Compares building a page of models the way listings used to (every row fetched as a tuple, then zipped into keyword
+# arguments of a model holding its attributes in a dict, with a no-op __del__) against models held in slots, without a
+# __del__, built by the cursor's row factory as each row is read. Reports the time per row (freeing the page included,
+# which is where __del__ costs), the memory allocated per row and the peak while the page is built.
+# Run from the backend directory with: python -m benchmarks.models [rows]
+
+def legacyModel(definition: QueryDefinition) -> type:
+    # The same initialiser, without slots and with the __del__ the models used to have
+    return type(f"Legacy{definition.model.__name__}", (), {"__init__": definition.model.__init__, "__del__": lambda self: None})
+
+def legacyPage(model: type, columns: list, values: list) -> list:
+    # fetchall() returned every row as a tuple before any model was built
+    rows = [tuple(row) for row in values]
+
+    return [model(**dict(zip(columns, row))) for row in rows]
+
+def currentPage(definition: QueryDefinition, columns: list, values: list) -> list:
+    # The cursor hands each row's values to the row maker as they are loaded
+    make = definition.rowFactory(columns)(None)
+
+    return [make(list(row)) for row in values]
+
+def measure(function: Callable[[], list], repeat: int) -> tuple[float, int, int]:
+    # Best time of several runs in seconds, then the bytes still held by the page and the peak while it was built
+    best = None
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time) if best is not None else time.perf_counter() - start_time
+
+    tracemalloc.start()
+    page = function()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del page
+
+    return best, held, peak
+
+def benchmark(name: str, definition: QueryDefinition, values: Annotated[list, "Rows of column values, in selectColumns() order"], repeat: int = 5) -> None:
+    columns = definition.selectColumns()
+    model = legacyModel(definition)
+
+    legacy_time, legacy_held, legacy_peak = measure(lambda: legacyPage(model, columns, values), repeat)
+    current_time, current_held, current_peak = measure(lambda: currentPage(definition, columns, values), repeat)
+
+    print("{0:<18} {1:>7.2f} {2:>7.2f} us/row {3:>6} {4:>6} B/row {5:>6} {6:>6} B/row peak".format(
+            name,
+            legacy_time / len(values) * 1e6,
+            current_time / len(values) * 1e6,
+            legacy_held // len(values),
+            current_held // len(values),
+            legacy_peak // len(values),
+            current_peak // len(values),
+        ))
+
+if __name__ == "__main__":
+    import sys
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    print(f"{rows} rows per page, best of 5 runs (legacy then current)")
+
+    benchmark("vehicle", vehicle_query, [[str(100000 + i), (i % 50) + 1] for i in range(rows)])
+    benchmark("operating_company", operating_company_query, [[i + 1, f"N{i:03}", f"S{i % 100:02}", f"Operator {i}"] for i in range(rows)])
+    benchmark("account", account_query, [[i + 1, uuid.uuid4(), "STD", f"user{i}", f"User {i}", now, bool(i % 2), now, now] for i in range(rows)])
@@ -0,0 +1,101 @@
+import datetime
+import time
+import uuid
+from typing import Annotated, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.account import Account
+from app.models.application import Application
+from app.models.operating_company import OperatingCompany
+from app.models.query import LINKS_FIELD
+from app.models.serialise import JSONBytesResponse
+from app.models.vehicle import Vehicle
+
+# Compares the cost per row of serialising a page of results the way responses used to be built (serialise() merged with
+# hypermediaLinks() per row, then jsonable_encoder and json.dumps) against the compiled serialisers and orjson, checking
+# both produce the same bytes. Run from the backend directory with: python -m benchmarks.serialisation [rows]
+
+def legacySerialisation(x, root: str = "", fields: list | None = None) -> dict:
+    serialised = x.serialise() or {}
+
+    if fields is not None:
+        serialised = {key: value for key, value in serialised.items() if key in fields}
+
+    if fields is None or LINKS_FIELD in fields:
+        serialised["links"] = x.hypermediaLinks(root) or []
+
+    return serialised
+
+def legacyResponse(page: dict, fields: list | None) -> bytes:
+    body = {**page, "result": [legacySerialisation(item, fields = fields) for item in page["result"]]}
+
+    return JSONResponse(jsonable_encoder(body)).body
+
+def currentResponse(application: Application, page: dict, fields: list | None) -> bytes:
+    return JSONBytesResponse(application.createResponseBody(page, fields = fields)).body
+
+def page(models: list) -> dict:
+    return {
+            "result": models,
+            "meta": {"max": len(models), "limit": len(models), "offset": 0, "orderBy": "id", "orderByDirection": "ASC", "count": "exact"},
+            "links": [{"rel": "next", "href": "/api/v1/resource/?limit=10000&after=abc"}],
+        }
+
+def timed(function: Callable[[], bytes], repeat: int) -> float:
+    # Best of several runs, in seconds
+    best = None
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time) if best is not None else time.perf_counter() - start_time
+
+    return best
+
+def benchmark(name: str, models: list, fields: Annotated[list | None, "Fields requested, None for all of them"] = None, repeat: int = 5) -> None:
+    application = Application(database_adapter = None)
+    results = page(models)
+
+    legacy = legacyResponse(results, fields)
+    current = currentResponse(application, results, fields)
+
+    if legacy != current:
+        raise Exception(f"{name} responses differ!")
+
+    legacy_time = timed(lambda: legacyResponse(results, fields), repeat)
+    current_time = timed(lambda: currentResponse(application, results, fields), repeat)
+
+    print("{0:<34} {1:>9.2f} us/row {2:>9.2f} us/row {3:>7.1f}x {4:>9} bytes".format(
+            f"{name} ({'all' if fields is None else ','.join(fields)})",
+            legacy_time / len(models) * 1e6,
+            current_time / len(models) * 1e6,
+            legacy_time / current_time,
+            len(current),
+        ))
+
+if __name__ == "__main__":
+    import sys
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    vehicles = [Vehicle(fleet_no = str(100000 + i), opco_id = (i % 50) + 1 if i % 7 else None) for i in range(rows)]
+    operating_companies = [OperatingCompany(id = i + 1, noc = f"N{i:03}", short_code = f"S{i % 100:02}", name = f"Operator {i} é" if i % 3 else None) for i in range(rows)]
+    accounts = [
+            Account(
+                id = i + 1, uuid = uuid.uuid4(), role = "STD", username = f"user{i}", name = f"User \"{i}\"", password_hash = "x",
+                disabled = bool(i % 2), password_last_modified = now, created_at = now, last_modified = now
+            )
+            for i in range(rows)
+        ]
+
+    print(f"{rows} rows per page, best of 5 runs")
+    print("{0:<34} {1:>16} {2:>16} {3:>8} {4:>15}".format("", "legacy", "current", "speedup", "size"))
+
+    benchmark("vehicle", vehicles)
+    benchmark("vehicle", vehicles, ["fleet_no"])
+    benchmark("operating_company", operating_companies)
+    benchmark("operating_company", operating_companies, ["id", "noc", LINKS_FIELD])
+    benchmark("account", accounts)
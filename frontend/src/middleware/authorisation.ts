@@ -10,7 +10,25 @@ export const accessTokenCookieName = "ACSS_TOKN_COOKIE",
     refreshTokenCookieName = "RFSH_TOKN_COOKIE",
     cookieOptions: AstroCookieSetOptions = { expires: addMonths(new Date(), 1), httpOnly: true, path: "/", sameSite: "strict", secure: true }
 
-const extractClaims = (token: string): Claims => {
+// Algorithm the backend signs tokens with (see JWT_ALGORITHM), HMAC (HS*) signed tokens can only be verified by the backend
+const signingAlgorithm: string = import.meta.env.JWT_ALGORITHM || "HS256",
+    asymmetricSigning = !signingAlgorithm.startsWith("HS")
+
+let jwks: ReturnType<typeof jose.createRemoteJWKSet> | null = null
+
+// Public keys tokens are signed with, fetched from the backend and cached (until a token names a key not yet seen)
+const getJWKS = () => {
+    if(!jwks) jwks = jose.createRemoteJWKSet(new URL("/api/v1/authorisation/jwks", import.meta.env.BACKEND_BASE))
+
+    return jwks
+}
+
+const extractClaims = async (token: string): Promise<Claims> => {
+    // Whether the signature is verified is decided by configuration, never by the token's own (unverified) header. With
+    // asymmetric signing only the configured algorithm is accepted, so a token claiming to be HS* signed is rejected
+    // Only the signature is verified, expiry is handled below so expired tokens can still be refreshed
+    if(asymmetricSigning) await jose.compactVerify(token, getJWKS(), { algorithms: [signingAlgorithm] })
+
     return jose.decodeJwt(token)
 }
 
@@ -35,8 +53,8 @@ export const onRequest: MiddlewareHandler = defineMiddleware(async (context, nex
 
         context.locals.token = accessToken
 
-        // Just get the claims, we only do basic validation here as the backend handles security on the endpoints
-        const claims = extractClaims(accessToken)
+        // Get the (verified, where possible) claims, the backend still handles security on the endpoints
+        const claims = await extractClaims(accessToken)
 
         if(!claims || Object.values(claims).length < 1) throw new Error("Token has no claims, skipping auth...")
 
@@ -21,13 +21,16 @@ import { type Vehicle } from '@type/Vehicle.types'
 
 const api = axios.create({ baseURL: import.meta.env.BACKEND_BASE })
 
-export async function login(username: string, password: string): Promise<LoginResponse> {
+// forwardedFor is the X-Forwarded-For chain of the browser's request, the backend limits login attempts per client address
+export async function login(username: string, password: string, forwardedFor: string | null = null): Promise<LoginResponse> {
     // const loginResponse: LoginResponse =
     //     await api("/api/v1/authorisation/token", { method: "POST", body: `username=${username}&password=${password}`, headers: { "Content-Type": "application/x-www-form-urlencoded" } })
 
     try {
         const loginResponse: AxiosResponse<LoginResponse> =
-            await api.post("/api/v1/authorisation/token", `username=${username}&password=${password}`)
+            await api.post("/api/v1/authorisation/token", `username=${username}&password=${password}`, {
+                headers: forwardedFor ? { "X-Forwarded-For": forwardedFor } : {}
+            })
 
         return loginResponse.data
     } catch(e: any) {
@@ -266,7 +266,78 @@ class ApplicationDatabaseAdapter(DatabaseAdapter):
                     CREATE INDEX IF NOT EXISTS vehicle_location_id_index ON vehicle_location (id);
                     CREATE INDEX IF NOT EXISTS vehicle_location_fleet_no_index ON vehicle_location (fleet_no);
                 """)
-            
+
+            # Composite indexes (ending with the primary key tiebreaker) for the filters and orderings offered by the listing endpoints
+            cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS vehicle_opco_id_fleet_no_index ON vehicle (opco_id, fleet_no);
+
+                    CREATE INDEX IF NOT EXISTS operating_company_name_id_index ON operating_company (name, id);
+
+                    CREATE INDEX IF NOT EXISTS account_role_id_index ON account (role, id);
+                    CREATE INDEX IF NOT EXISTS account_created_at_id_index ON account (created_at, id);
+                    CREATE INDEX IF NOT EXISTS account_last_modified_id_index ON account (last_modified, id);
+                """)
+
+            # Create the table version table, a change counter per table used by the API for ETags without reading the rows
+            cursor.execute("""CREATE TABLE IF NOT EXISTS table_version (
+                    name VARCHAR(63) PRIMARY KEY,
+                    version BIGINT NOT NULL DEFAULT 0,
+                    last_modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+                );""")
+
+            # Statements which affected no rows (i.e. an upsert which changed nothing) leave the version as it was, the
+            # rows written are read from the statement's transition table (TRUNCATE has none, so always bumps)
+            cursor.execute("""
+                    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+                    BEGIN
+                        IF TG_OP <> 'TRUNCATE' THEN
+                            IF NOT EXISTS (SELECT 1 FROM changed_rows) THEN
+                                RETURN NULL;
+                            END IF;
+                        END IF;
+
+                        UPDATE table_version SET version = version + 1, last_modified = now() WHERE name = TG_TABLE_NAME;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+                """)
+
+            # Bumped once per statement (rather than per row) so bulk writes cost a single update. Transition tables can only
+            # be declared by triggers on a single event, so there is a trigger per event
+            for table in ("account", "operating_company", "vehicle"):
+                cursor.execute("INSERT INTO table_version (name) VALUES (%s) ON CONFLICT (name) DO NOTHING;", (table,))
+                cursor.execute(f"""
+                        DROP TRIGGER IF EXISTS {table}_table_version ON {table};
+                        DROP TRIGGER IF EXISTS {table}_table_version_insert ON {table};
+                        DROP TRIGGER IF EXISTS {table}_table_version_update ON {table};
+                        DROP TRIGGER IF EXISTS {table}_table_version_delete ON {table};
+                        DROP TRIGGER IF EXISTS {table}_table_version_truncate ON {table};
+
+                        CREATE TRIGGER {table}_table_version_insert
+                            AFTER INSERT ON {table} REFERENCING NEW TABLE AS changed_rows
+                            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+                        CREATE TRIGGER {table}_table_version_update
+                            AFTER UPDATE ON {table} REFERENCING NEW TABLE AS changed_rows
+                            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+                        CREATE TRIGGER {table}_table_version_delete
+                            AFTER DELETE ON {table} REFERENCING OLD TABLE AS changed_rows
+                            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+                        CREATE TRIGGER {table}_table_version_truncate
+                            AFTER TRUNCATE ON {table}
+                            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+                    """)
+
+            # Create the login throttle table, token buckets shared by the API's replicas (unlogged, losing them is harmless)
+            cursor.execute("""CREATE UNLOGGED TABLE IF NOT EXISTS login_throttle (
+                    key TEXT PRIMARY KEY,
+                    tokens DOUBLE PRECISION NOT NULL,
+                    allowed BOOLEAN NOT NULL,
+                    updated TIMESTAMP WITH TIME ZONE NOT NULL
+                );""")
+
         # Commit the changes to the database
         connection.commit()
 